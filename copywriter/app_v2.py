@@ -60,12 +60,15 @@ from supabase_storage import (
     create_artist,
     get_style_guide,
     save_style_guide,
+    get_style_guide_version,
     get_documents,
     upload_document,
     delete_document,
     save_generated_copy,
     get_generated_copy,
     delete_generated_copy,
+    save_llm_calls,
+    get_llm_calls,
 )
 
 SUPPORTED_EXTENSIONS = {'.docx', '.pdf', '.html', '.htm', '.doc', '.txt'}
@@ -85,6 +88,66 @@ def get_api_key():
     return None
 
 
+def get_session_id():
+    """This browser session's id, so the shared request scheduler can queue users fairly."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else 'default'
+
+
+def prepare_uploaded_images(uploaded_images, details):
+    """
+    Resize and re-encode uploaded images for the vision model.
+
+    Returns:
+        (image dicts for the generator, size / token report)
+    """
+    from src.image_prep import prepare_images
+
+    return prepare_images([
+        {'bytes': img.getvalue(), 'name': img.name, 'detail': details.get(i)}
+        for i, img in enumerate(uploaded_images or [])
+    ])
+
+
+def image_report_caption(report):
+    """One-line summary of what image preparation saved."""
+    return (
+        f"{report['images']} image(s): {report['original_bytes'] / 1e6:.1f} MB → "
+        f"{report['bytes'] / 1e6:.1f} MB, ~{report['original_tokens']:,} → "
+        f"~{report['tokens']:,} vision tokens"
+    )
+
+
+def get_response_cache():
+    """Cache for generated copy, or None unless switched on in Settings."""
+    if not st.session_state.response_cache_enabled:
+        return None
+    from src.response_cache import ResponseCache
+    return ResponseCache()
+
+
+def get_call_recorder(artist):
+    """Recorder that saves per-call latency and token metrics for this artist."""
+    from src.telemetry import CallRecorder
+    return CallRecorder(save_llm_calls, artist_id=artist['id'])
+
+
+def find_exemplars(artist, brief):
+    """
+    Passages from the artist's documents closest to the brief, from the
+    local exemplar index. The index is synced with the stored documents
+    first (only added or removed documents are re-indexed), so uploads and
+    deletions from any session are picked up.
+    """
+    from src.exemplar_index import ArtistExemplarIndex
+
+    index = ArtistExemplarIndex(artist['id'])
+    index.sync(get_documents(artist['id']))
+    return index.search(brief)
+
+
 def init_session_state():
     """Initialize session state variables."""
     if 'current_artist' not in st.session_state:
@@ -94,6 +157,12 @@ def init_session_state():
         st.session_state.style_guide_v2 = None
     if 'generated_copy_v2' not in st.session_state:
         st.session_state.generated_copy_v2 = None
+    if 'generated_formats_v2' not in st.session_state:
+        st.session_state.generated_formats_v2 = None
+    if 'corpus_report' not in st.session_state:
+        st.session_state.corpus_report = None
+    if 'response_cache_enabled' not in st.session_state:
+        st.session_state.response_cache_enabled = False
 
 
 # Initialize
@@ -137,6 +206,8 @@ if artists:
         st.session_state.current_artist = selected
         st.session_state.style_guide_v2 = get_style_guide(selected['id'])
         st.session_state.generated_copy_v2 = None
+        st.session_state.generated_formats_v2 = None
+        st.session_state.corpus_report = None
         st.rerun()
 else:
     st.sidebar.warning("No artists found. Add one in Settings.")
@@ -164,6 +235,9 @@ if page == "Style Guide":
         st.warning("Please configure your OpenAI API key in Settings.")
     else:
         # --- Document management ---
+        from src.dedupe import ArtistDuplicateIndex
+        from src.exemplar_index import ArtistExemplarIndex
+
         st.markdown("### Source Documents")
 
         docs = get_documents(artist['id'])
@@ -178,6 +252,8 @@ if page == "Style Guide":
                 with col2:
                     if st.button("Remove", key=f"del_{doc['id']}"):
                         delete_document(doc['id'], doc.get('storage_path'))
+                        ArtistDuplicateIndex(artist['id']).remove(doc['id'])
+                        ArtistExemplarIndex(artist['id']).remove(doc['id'])
                         st.rerun()
         else:
             st.info("No documents yet. Upload some below.")
@@ -190,24 +266,63 @@ if page == "Style Guide":
             accept_multiple_files=True,
         )
 
+        from src.parse_cache import get_parse_cache
+        cache_stats = get_parse_cache().stats()
+        if cache_stats['hits'] or cache_stats['misses']:
+            st.caption(
+                f"Parse cache: {cache_stats['hits']} hits, "
+                f"{cache_stats['misses']} misses this session"
+            )
+
+        skip_duplicates = st.checkbox(
+            "Skip near-duplicates of existing documents",
+            value=True,
+            help="e.g. the same press release saved as both PDF and DOCX",
+        )
+
         if uploaded_files and st.button("Process Uploads", type="primary"):
-            from src.document_parser import parse_document_bytes
-
-            for f in uploaded_files:
-                with st.spinner(f"Processing {f.name}..."):
-                    try:
-                        file_bytes = f.getvalue()
-                        parsed = parse_document_bytes(f.name, file_bytes)
-                        upload_document(
-                            artist_id=artist['id'],
-                            artist_slug=artist['slug'],
-                            filename=f.name,
-                            file_bytes=file_bytes,
-                            extracted_text=parsed['full_text'],
+            from src.document_parser import parse_documents_batch
+
+            items = [(f.name, f.getvalue()) for f in uploaded_files]
+            progress = st.progress(0.0, text=f"Parsing {len(items)} files...")
+
+            dup_index = ArtistDuplicateIndex(artist['id'])
+            dup_index.sync(docs)
+            exemplar_index = ArtistExemplarIndex(artist['id'])
+            exemplar_index.sync(docs)
+
+            # Files are parsed in parallel; each is uploaded as soon as it's ready
+            for done, result in enumerate(parse_documents_batch(items), start=1):
+                filename, file_bytes = items[result['index']]
+                if result['error']:
+                    st.warning(f"Could not process {filename}: {result['error']}")
+                else:
+                    full_text = result['document']['full_text']
+                    matches = dup_index.query(full_text)
+                    if matches and skip_duplicates:
+                        st.info(
+                            f"Skipped {filename}: near-duplicate of {matches[0]['filename']} "
+                            f"({matches[0]['similarity']:.0%} similar)"
                         )
-                        st.write(f"Uploaded: {f.name}")
-                    except Exception as e:
-                        st.warning(f"Could not process {f.name}: {e}")
+                    else:
+                        if matches:
+                            st.warning(
+                                f"{filename} looks like a near-duplicate of {matches[0]['filename']}"
+                            )
+                        try:
+                            record = upload_document(
+                                artist_id=artist['id'],
+                                artist_slug=artist['slug'],
+                                filename=filename,
+                                file_bytes=file_bytes,
+                                extracted_text=full_text,
+                            )
+                            dup_index.add(record['id'], filename, full_text)
+                            exemplar_index.add(record['id'], filename, full_text)
+                            st.write(f"Uploaded: {filename}")
+                        except Exception as e:
+                            st.warning(f"Could not upload {filename}: {e}")
+                progress.progress(done / len(items), text=f"Processed {done}/{len(items)}")
             st.rerun()
 
         st.markdown("---")
@@ -217,6 +332,42 @@ if page == "Style Guide":
             st.markdown("### Current Style Guide")
             st.info("Style guide has been generated. You can regenerate it below if needed.")
 
+            report = st.session_state.corpus_report
+            if report:
+                trimmed = [d['filename'] for d in report['included'] if d['trimmed']]
+                if report.get('mode') == 'incremental':
+                    changed = report.get('changed_sections')
+                    notes = [
+                        f"Updated from {len(report['included'])} new documents "
+                        f"(~{report['tokens']:,} estimated tokens); "
+                        + (
+                            f"sections changed: {', '.join(map(str, changed))}" if changed
+                            else "no sections changed" if changed is not None
+                            else "guide rewritten"
+                        )
+                    ]
+                elif report.get('mode') == 'map_reduce':
+                    notes = [
+                        f"Analysed {len(report['included'])} documents in "
+                        f"{report['batches']} batches (~{report['tokens']:,} estimated tokens, "
+                        f"{report['cached_batches']} batches from cache)"
+                    ]
+                else:
+                    notes = [
+                        f"Analysed {len(report['included'])} documents "
+                        f"(~{report['tokens']:,} of {report['budget']:,} estimated tokens)"
+                    ]
+                if trimmed:
+                    notes.append(f"trimmed to fit: {', '.join(trimmed)}")
+                if report['excluded']:
+                    notes.append(f"over budget: {', '.join(report['excluded'])}")
+                if report['duplicates']:
+                    notes.append(
+                        "near-duplicates left out: "
+                        + ', '.join(d['filename'] for d in report['duplicates'])
+                    )
+                st.caption("; ".join(notes))
+
             with st.expander("View Full Style Guide", expanded=True):
                 st.markdown(st.session_state.style_guide_v2)
 
@@ -238,14 +389,60 @@ if page == "Style Guide":
         docs = get_documents(artist['id'])
         has_docs = len(docs) > 0
 
-        button_label = (
-            "Regenerate Style Guide"
-            if st.session_state.style_guide_v2
-            else "Generate Style Guide"
-        )
+        from src.corpus_assembler import DEFAULT_CORPUS_TOKEN_BUDGET, estimate_tokens
+
+        # Documents the current guide was built from, so an update can send
+        # only the ones added since
+        version = get_style_guide_version(artist['id']) if st.session_state.style_guide_v2 else None
+        built_from = set(version['document_ids']) if version else set()
+        new_docs = [d for d in docs if d.get('extracted_text') and d['id'] not in built_from]
+        removed = built_from - {d['id'] for d in docs}
+
+        incremental = False
+        if version:
+            new_tokens = sum(estimate_tokens(d['extracted_text']) for d in new_docs)
+            incremental = st.radio(
+                "Regenerate from",
+                ["new", "full"],
+                format_func=lambda m: (
+                    f"New documents only ({len(new_docs)}, ~{new_tokens:,} tokens)"
+                    if m == "new" else "All documents (full rebuild)"
+                ),
+                horizontal=True,
+                help="An update sends the current guide and the documents added "
+                "since it was built, and rewrites only the sections that change",
+            ) == "new"
+            if removed:
+                st.caption(
+                    f"{len(removed)} document(s) removed since this guide was built; "
+                    "only a full rebuild leaves them out"
+                )
+        elif st.session_state.style_guide_v2:
+            st.caption("This guide was built before document tracking; regenerate it once to enable updates.")
 
-        if st.button(button_label, type="primary", disabled=not has_docs):
+        if incremental:
+            button_label = "Update Style Guide"
+            map_reduce = False
+        else:
+            button_label = (
+                "Regenerate Style Guide"
+                if st.session_state.style_guide_v2
+                else "Generate Style Guide"
+            )
+            corpus_tokens = sum(estimate_tokens(doc.get('extracted_text') or '') for doc in docs)
+            map_reduce = st.checkbox(
+                "Analyse in batches (map-reduce)",
+                value=corpus_tokens > DEFAULT_CORPUS_TOKEN_BUDGET,
+                help=(
+                    f"~{corpus_tokens:,} tokens of source text. Batches are analysed in "
+                    "parallel and merged, so the whole corpus is used instead of the "
+                    f"~{DEFAULT_CORPUS_TOKEN_BUDGET:,} tokens that fit in one prompt."
+                ),
+            )
+
+        if st.button(button_label, type="primary", disabled=not has_docs or (incremental and not new_docs)):
             with st.spinner("Analysing documents... This may take a moment."):
+                from src.document_parser import collapse_near_duplicates
                 from src.generator_v2 import StyleAnalyzerV2
 
                 # Build document list from extracted text in DB
@@ -253,21 +450,69 @@ if page == "Style Guide":
                 for doc in docs:
                     if doc.get('extracted_text'):
                         documents.append({
+                            'id': doc['id'],
                             'filename': doc['filename'],
                             'full_text': doc['extracted_text'],
+                            'created_at': doc.get('created_at'),
                         })
 
-                if documents:
-                    analyzer = StyleAnalyzerV2(get_api_key())
-                    style_guide = analyzer.analyze(
-                        documents,
-                        artist_name=artist['name'],
+                # Re-saved copies would only repeat the same text in the prompt
+                dup_index = ArtistDuplicateIndex(artist['id'])
+                dup_index.sync(docs)
+                documents, duplicates = collapse_near_duplicates(
+                    documents, signatures=dup_index.signatures(),
+                )
+
+                document_ids = [d['id'] for d in docs if d.get('extracted_text')]
+                if incremental:
+                    documents = [d for d in documents if d['id'] not in built_from]
+                    document_ids = sorted(built_from | set(document_ids))
+
+                if incremental and not documents:
+                    # Every new document repeats one the guide already covers
+                    save_style_guide(
+                        artist['id'], st.session_state.style_guide_v2, document_ids, mode="incremental",
+                    )
+                    st.info("The new documents are near-duplicates of ones already analysed; guide unchanged.")
+                elif documents:
+                    analyzer = StyleAnalyzerV2(
+                        get_api_key(),
+                        session_id=get_session_id(),
+                        telemetry=get_call_recorder(artist),
+                    )
+                    if incremental:
+                        st.write_stream(analyzer.update_stream(
+                            st.session_state.style_guide_v2,
+                            documents,
+                            artist_name=artist['name'],
+                        ))
+                        style_guide = analyzer.last_update['guide']
+                    elif map_reduce:
+                        progress = st.progress(0.0, text="Taking style notes...")
+                        style_guide = analyzer.analyze_map_reduce(
+                            documents,
+                            artist_name=artist['name'],
+                            on_progress=lambda done, total: progress.progress(
+                                done / total, text=f"Style notes: {done}/{total} batches"
+                            ),
+                        )
+                    else:
+                        style_guide = st.write_stream(analyzer.analyze_stream(
+                            documents,
+                            artist_name=artist['name'],
+                        )).strip()
+                    st.session_state.corpus_report = dict(
+                        analyzer.last_corpus_report, duplicates=duplicates,
+                        changed_sections=(analyzer.last_update or {}).get('changed_sections'),
                     )
 
                     st.session_state.style_guide_v2 = style_guide
-                    save_style_guide(artist['id'], style_guide)
+                    save_style_guide(
+                        artist['id'], style_guide, document_ids,
+                        mode="incremental" if incremental else "full",
+                    )
 
-                    st.success("Style guide generated!")
+                    st.success("Style guide updated!" if incremental else "Style guide generated!")
                     st.rerun()
                 else:
                     st.error("No documents could be read.")
@@ -327,11 +572,18 @@ elif page == "Generate Copy":
             help="Upload images of the artworks you're writing about",
         )
 
+        image_details = {}
         if uploaded_images:
             cols = st.columns(min(len(uploaded_images), 4))
             for i, img in enumerate(uploaded_images):
                 with cols[i % 4]:
                     st.image(img, caption=img.name, use_container_width=True)
+                    image_details[i] = st.selectbox(
+                        "Detail",
+                        ["high", "low"],
+                        key=f"image_detail_{i}_{img.name}",
+                        help="Low detail costs far fewer tokens; enough for colour and composition",
+                    )
 
         st.markdown("---")
 
@@ -343,45 +595,177 @@ elif page == "Generate Copy":
             'general': 'General',
         }
 
+        use_exemplars = st.checkbox(
+            "Include example passages from past documents",
+            value=True,
+            help="Shows the model a few passages from this artist's own documents "
+            "that match the brief, alongside the style guide",
+        )
+
+        fresh = False
+        if st.session_state.response_cache_enabled:
+            fresh = st.checkbox(
+                "Fresh variant",
+                help="Write a new version even if this exact brief was generated before",
+            )
+
         if st.button("Generate Copy", type="primary", use_container_width=True):
             if not context.strip():
                 st.error("Please describe what you want to write.")
             else:
-                with st.spinner("Generating copy..."):
-                    from src.generator_v2 import CopyGeneratorV2
+                from src.generator_v2 import CopyGeneratorV2
 
-                    generator = CopyGeneratorV2(get_api_key())
+                generator = CopyGeneratorV2(
+                    get_api_key(),
+                    response_cache=get_response_cache(),
+                    session_id=get_session_id(),
+                    telemetry=get_call_recorder(artist),
+                )
 
-                    images = []
-                    if uploaded_images:
-                        for img in uploaded_images:
-                            images.append({
-                                'bytes': img.getvalue(),
-                                'name': img.name,
-                            })
+                images, image_report = prepare_uploaded_images(uploaded_images, image_details)
 
-                    full_context = (
-                        f"Document type: {doc_type.replace('_', ' ')}\n\n{context}"
-                    )
+                full_context = (
+                    f"Document type: {doc_type.replace('_', ' ')}\n\n{context}"
+                )
+                exemplars = find_exemplars(artist, context) if use_exemplars else []
 
-                    result = generator.generate(
+                # Show the copy as it is written; the saved version replaces it below
+                stream_area = st.empty()
+                with stream_area.container():
+                    st.markdown("### Generating...")
+                    streamed = st.write_stream(generator.generate_stream(
                         style_guide=st.session_state.style_guide_v2,
                         doc_type=doc_type,
                         context=full_context,
                         images=images,
-                    )
+                        fresh=fresh,
+                        exemplars=exemplars,
+                    ))
+                stream_area.empty()
+                result = streamed.strip()
+
+                # Save to database once the stream has finished
+                save_generated_copy(
+                    artist_id=artist['id'],
+                    doc_type=doc_type,
+                    user_brief=context,
+                    content=result,
+                )
 
-                    # Save to database
-                    save_generated_copy(
-                        artist_id=artist['id'],
-                        doc_type=doc_type,
-                        user_brief=context,
-                        content=result,
+                st.session_state.generated_copy_v2 = result
+
+                timing = generator.last_timing
+                st.success("Copy generated and saved!")
+                if timing.get('cached'):
+                    st.caption(
+                        f"Reused copy from an identical earlier request "
+                        f"(saved {timing['saved_time']:.1f}s). Tick Fresh variant for a new version."
                     )
+                else:
+                    # None when the stream carried no text (e.g. filtered or empty)
+                    first_words = timing.get('time_to_first_token')
+                    st.caption(
+                        (f"First words after {first_words:.1f}s, " if first_words is not None
+                         else "No text streamed, ")
+                        + f"finished in {timing['total_time']:.1f}s"
+                    )
+                    if timing.get('prompt_tokens'):
+                        st.caption(
+                            f"Prompt: {timing['prompt_tokens']:,} tokens, "
+                            f"{timing['cached_tokens']:,} served from OpenAI's prompt cache"
+                        )
+                if images:
+                    st.caption(image_report_caption(image_report))
+                if exemplars:
+                    with st.expander(f"Example passages used ({len(exemplars)})"):
+                        for e in exemplars:
+                            st.markdown(f"**{e['filename']}**")
+                            st.text(e['text'])
+
+        # Several formats for the same brief, requested concurrently
+        formats = st.multiselect(
+            "Formats to generate together",
+            [t for t in DOC_TYPE_LABELS if t != 'general'],
+            default=['press_release', 'collection_overview', 'paid_ads'],
+            format_func=lambda x: DOC_TYPE_LABELS[x],
+        )
+        if st.button("Generate All Formats", use_container_width=True, disabled=not formats):
+            if not context.strip():
+                st.error("Please describe what you want to write.")
+            else:
+                from src.generator_v2 import CopyGeneratorV2
 
-                    st.session_state.generated_copy_v2 = result
+                generator = CopyGeneratorV2(
+                    get_api_key(),
+                    response_cache=get_response_cache(),
+                    session_id=get_session_id(),
+                    telemetry=get_call_recorder(artist),
+                )
 
-                st.success("Copy generated and saved!")
+                images, image_report = prepare_uploaded_images(uploaded_images, image_details)
+                briefs = {
+                    t: f"Document type: {t.replace('_', ' ')}\n\n{context}"
+                    for t in formats
+                }
+                # One search: every format is written from the same brief
+                exemplars = find_exemplars(artist, context) if use_exemplars else []
+
+                results, done = {}, 0
+                progress = st.progress(0, text=f"Generating {len(formats)} formats...")
+                for item in generator.generate_formats(
+                    style_guide=st.session_state.style_guide_v2,
+                    briefs=briefs,
+                    images=images,
+                    fresh=fresh,
+                    exemplars={t: exemplars for t in formats},
+                ):
+                    label = DOC_TYPE_LABELS[item['doc_type']]
+                    if item['error']:
+                        st.error(f"{label} failed: {item['error']}")
+                    else:
+                        save_generated_copy(
+                            artist_id=artist['id'],
+                            doc_type=item['doc_type'],
+                            user_brief=context,
+                            content=item['copy'],
+                        )
+                        results[item['doc_type']] = item['copy']
+                    done += 1
+                    progress.progress(
+                        done / len(formats),
+                        text=f"{label} reused from cache" if item['cached']
+                        else f"{label} finished in {item['total_time']:.1f}s",
+                    )
+                progress.empty()
+
+                # Keep the selection order for display
+                st.session_state.generated_formats_v2 = {
+                    t: results[t] for t in formats if t in results
+                }
+                if results:
+                    st.success(
+                        f"{len(results)} of {len(formats)} formats generated and saved "
+                        f"in {generator.last_timing['total_time']:.1f}s"
+                    )
+                if images:
+                    st.caption(image_report_caption(image_report))
+
+        if st.session_state.generated_formats_v2:
+            st.markdown("---")
+            st.markdown("### Generated Formats")
+            generated = st.session_state.generated_formats_v2
+            for tab, (t, copy) in zip(
+                st.tabs([DOC_TYPE_LABELS[t] for t in generated]), generated.items()
+            ):
+                with tab:
+                    st.markdown(copy)
+                    st.text_area(
+                        "Copy to clipboard",
+                        value=copy,
+                        height=300,
+                        key=f"format_copy_{t}",
+                        label_visibility="collapsed",
+                    )
 
         if st.session_state.generated_copy_v2:
             st.markdown("---")
@@ -490,6 +874,84 @@ elif page == "Settings":
 
     st.markdown("---")
 
+    # Response cache
+    st.markdown("### Response Cache")
+    # Kept in session state (not a widget key) so it survives page switches
+    st.session_state.response_cache_enabled = st.checkbox(
+        "Reuse copy for repeated requests",
+        value=st.session_state.response_cache_enabled,
+        help="An identical brief, style guide, format and images returns the "
+        "earlier copy instead of calling the API again",
+    )
+
+    from src.response_cache import ResponseCache
+
+    response_cache = ResponseCache()
+    cache_stats = response_cache.stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+    col2.metric("Time saved", f"{cache_stats['saved_seconds']:.0f}s")
+    col3.metric("Cached responses", cache_stats['entries'])
+    if st.button("Clear Response Cache", disabled=not cache_stats['entries']):
+        response_cache.clear()
+        st.rerun()
+
+    st.markdown("---")
+
+    # Call metrics
+    st.markdown("### API Usage")
+    from datetime import datetime, timedelta, timezone
+    from src.telemetry import summarize_calls
+
+    days = st.selectbox("Period", [1, 7, 30, 90], index=2, format_func=lambda d: f"Last {d} days")
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    calls = get_llm_calls(since=since)
+    if not calls:
+        st.caption("No API calls recorded in this period.")
+    else:
+        ok_calls = [c for c in calls if c['status'] == 'ok']
+        overall = summarize_calls(calls, ())[0]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Calls", f"{overall['calls']:,}", help=f"{overall['errors']} failed or cancelled")
+        col2.metric(
+            "p50 / p95 latency",
+            f"{overall['p50_latency'] or 0:.1f}s / {overall['p95_latency'] or 0:.1f}s",
+        )
+        col3.metric("Tokens", f"{overall['prompt_tokens'] + overall['completion_tokens']:,}")
+        col4.metric("Est. cost", f"${overall['cost_usd']:.2f}")
+        if ok_calls:
+            cached_share = overall['cached_tokens'] / max(1, overall['prompt_tokens'])
+            retries = sum(c['retries'] for c in calls)
+            st.caption(f"{cached_share:.0%} of prompt tokens from OpenAI's prompt cache; {retries} retries")
+
+        artist_names = {a['id']: a['name'] for a in artists}
+        columns = [
+            'calls', 'errors', 'p50_latency', 'p95_latency', 'p50_first_token',
+            'p95_first_token', 'prompt_tokens', 'cached_tokens', 'completion_tokens', 'cost_usd',
+        ]
+        st.markdown("**By artist**")
+        st.dataframe(
+            [
+                {'artist': artist_names.get(row['artist_id'], 'Unknown'), **{c: row[c] for c in columns}}
+                for row in summarize_calls(calls, ('artist_id',))
+            ],
+            hide_index=True,
+        )
+        st.markdown("**By operation and format**")
+        st.dataframe(
+            [
+                {
+                    'operation': row['operation'],
+                    'format': (row['doc_type'] or '—').replace('_', ' ').title(),
+                    **{c: row[c] for c in columns},
+                }
+                for row in summarize_calls(calls, ('operation', 'doc_type'))
+            ],
+            hide_index=True,
+        )
+
+    st.markdown("---")
+
     st.markdown("### About")
     st.markdown("""
     **CopyWriter V2** reverse-engineers an artist's writing voice from existing
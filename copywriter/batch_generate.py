@@ -0,0 +1,157 @@
+"""
+Generate copy for a file of briefs without the Streamlit page.
+
+Each line of a CSV (header: artist, doc_type, context, images, optionally
+id) or JSONL file is one brief for an artist with a saved style guide.
+Copy is saved with the same storage as the app. Progress is checkpointed
+next to the brief file, so running the same command again after an
+interruption picks up where it stopped.
+
+Usage:
+    python batch_generate.py briefs.csv [--concurrency 4] [--save-batch 10]
+        [--checkpoint PATH] [--no-exemplars] [--response-cache]
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from supabase_storage import (  # noqa: E402
+    get_artists,
+    get_documents,
+    get_style_guide,
+    save_generated_copies,
+    save_llm_calls,
+)
+
+
+def get_api_key():
+    """OpenAI API key: Streamlit secrets > env var (as in the app)."""
+    import streamlit as st
+
+    try:
+        return st.secrets["OPENAI_API_KEY"]
+    except Exception:
+        return os.getenv('OPENAI_API_KEY')
+
+
+def resolve_artists(briefs):
+    """
+    Set artist_id on every brief, matching its artist against artist ids,
+    slugs and names (case-insensitive). Exits listing any that don't match.
+    """
+    lookup = {}
+    for artist in get_artists():
+        for value in (artist['id'], artist['slug'], artist['name']):
+            lookup[str(value).lower()] = artist
+    unknown = sorted({b['artist'] for b in briefs if b['artist'].lower() not in lookup})
+    if unknown:
+        sys.exit(f"Unknown artist(s): {', '.join(unknown)}")
+    for brief in briefs:
+        brief['artist_id'] = lookup[brief['artist'].lower()]['id']
+    return {b['artist_id']: lookup[b['artist'].lower()] for b in briefs}
+
+
+def sync_exemplar_indexes(artist_ids):
+    """
+    Bring each artist's exemplar index in line with their stored documents,
+    once per job, so briefs (run from worker threads) only search it.
+    """
+    from src.exemplar_index import ArtistExemplarIndex
+
+    for artist_id in artist_ids:
+        ArtistExemplarIndex(artist_id).sync(get_documents(artist_id))
+
+
+def find_exemplars(artist_id, brief):
+    """
+    Passages matching the brief from the artist's documents (as on the
+    Generate page), from an index synced by sync_exemplar_indexes().
+    """
+    from src.exemplar_index import ArtistExemplarIndex
+
+    return ArtistExemplarIndex(artist_id).search(brief)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('briefs', help="CSV or JSONL file of briefs")
+    parser.add_argument('--concurrency', type=int, default=None, help="briefs generated at once")
+    parser.add_argument('--save-batch', type=int, default=None, help="briefs saved per insert")
+    parser.add_argument('--checkpoint', default=None, help="checkpoint file (default: next to the briefs)")
+    parser.add_argument('--no-exemplars', action='store_true', help="don't include example passages")
+    parser.add_argument('--response-cache', action='store_true', help="reuse copy for identical earlier requests")
+    args = parser.parse_args()
+
+    from src.batch_jobs import BatchCheckpoint, default_checkpoint_path, load_briefs, run_batch
+    from src.generator_v2 import CopyGeneratorV2
+    from src.response_cache import ResponseCache
+    from src.telemetry import CallRecorder
+
+    api_key = get_api_key()
+    if not api_key:
+        sys.exit("No OpenAI API key: set OPENAI_API_KEY")
+
+    try:
+        briefs = load_briefs(args.briefs)
+    except ValueError as e:
+        sys.exit(str(e))
+    artists = resolve_artists(briefs)
+
+    style_guides = {}
+    for artist_id, artist in artists.items():
+        style_guides[artist_id] = get_style_guide(artist_id)
+        if not style_guides[artist_id]:
+            sys.exit(f"{artist['name']} has no style guide yet; generate one in the app first")
+
+    def make_generator(artist_id):
+        return CopyGeneratorV2(
+            api_key,
+            response_cache=ResponseCache() if args.response_cache else None,
+            session_id='batch',
+            telemetry=CallRecorder(save_llm_calls, artist_id=artist_id),
+        )
+
+    if not args.no_exemplars:
+        sync_exemplar_indexes(artists)
+
+    checkpoint = BatchCheckpoint(args.checkpoint or default_checkpoint_path(args.briefs))
+    already = len(checkpoint.succeeded() & {b['key'] for b in briefs})
+    print(f"{len(briefs)} briefs for {len(artists)} artist(s); {already} already done")
+
+    done, failed = already, 0
+    try:
+        for result in run_batch(
+            briefs,
+            make_generator,
+            style_guides,
+            save_generated_copies,
+            checkpoint,
+            max_concurrency=args.concurrency,
+            save_batch_size=args.save_batch,
+            find_exemplars=None if args.no_exemplars else find_exemplars,
+        ):
+            label = f"line {result['line']} ({artists[result['artist_id']]['name']}, {result['doc_type']})"
+            if result['error']:
+                failed += 1
+                print(f"  failed  {label}: {result['error']}")
+            else:
+                done += 1
+                how = "reused from cache" if result['cached'] else f"{result['total_time']:.1f}s"
+                print(f"  [{done}/{len(briefs)}] {label}: {how}")
+    except KeyboardInterrupt:
+        print("Interrupted; finished briefs are saved. Run the same command to resume.")
+        sys.exit(130)
+
+    stats = checkpoint.stats()
+    print(f"Done: {done} of {len(briefs)} briefs generated, {stats['saved']} saved in total")
+    if failed:
+        sys.exit(f"{failed} brief(s) failed; run again to retry them")
+
+
+if __name__ == '__main__':
+    main()
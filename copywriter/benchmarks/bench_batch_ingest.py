@@ -0,0 +1,49 @@
+"""
+Benchmark: serial parsing vs parse_documents_batch on a synthetic archive.
+
+Usage:
+    python benchmarks/bench_batch_ingest.py [--files 40] [--workers 4]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import write_corpus
+from src.document_parser import parse_document, parse_documents_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [str(p) for p in write_corpus(Path(tmp), files=args.files)]
+        total_mb = sum(Path(p).stat().st_size for p in paths) / 1e6
+        print(f"Corpus: {len(paths)} files, {total_mb:.1f} MB")
+
+        start = time.perf_counter()
+        serial_words = sum(parse_document(p)['word_count'] for p in paths)
+        serial = time.perf_counter() - start
+        print(f"Serial:   {serial:6.2f}s")
+
+        start = time.perf_counter()
+        batch_words = 0
+        first_result = None
+        for result in parse_documents_batch(paths, max_workers=args.workers):
+            if first_result is None:
+                first_result = time.perf_counter() - start
+            assert result['error'] is None, result['error']
+            batch_words += result['document']['word_count']
+        batch = time.perf_counter() - start
+        print(f"Batch:    {batch:6.2f}s (first result after {first_result:.2f}s)")
+
+        assert serial_words == batch_words
+        print(f"Speed-up: {serial / batch:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark: a batch of briefs one at a time versus src.batch_jobs.run_batch.
+
+Writes a CSV of briefs (some with images) and runs it twice against a fake
+client with --latency seconds per reply: first one brief after another
+with an insert per brief, as clicking through the Generate page would,
+then through run_batch with bounded concurrency and batched saves. Saves
+go to an in-memory sink costing --insert-latency seconds per call,
+standing in for a Supabase round trip. Also checks that:
+  - each brief sends the same request generate() would
+  - a job stopped part way resumes without generating or saving anything twice
+  - failed briefs are retried on the next run
+  - a JSONL file loads the same briefs as the CSV
+
+Usage:
+    python benchmarks/bench_batch_jobs.py [--briefs 40] [--concurrency 4]
+        [--latency 0.2] [--insert-latency 0.05]
+"""
+
+import argparse
+import csv
+import io
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from fake_openai import FakeCompletions, fake_client
+from PIL import Image
+from src.batch_jobs import BatchCheckpoint, load_briefs, run_batch
+from src.generator_v2 import CopyGeneratorV2
+from src.image_prep import prepare_images
+from src.rate_limiter import RequestScheduler
+
+STYLE_GUIDES = {'a1': "Write in short, confident sentences.", 'a2': "Lyrical, slow, sensory."}
+DOC_TYPES = ['press_release', 'collection_overview', 'paid_ads', 'bio']
+
+
+class Sink:
+    """save callback: keeps every row and pays insert_latency per call."""
+
+    def __init__(self, insert_latency: float):
+        self.insert_latency = insert_latency
+        self.rows, self.calls = [], 0
+        self._lock = threading.Lock()
+
+    def __call__(self, records: list[dict]) -> None:
+        time.sleep(self.insert_latency)
+        with self._lock:
+            self.calls += 1
+            self.rows.extend(records)
+
+
+def write_briefs(directory: Path, count: int) -> Path:
+    image = io.BytesIO()
+    Image.new('RGB', (1600, 1200), (40, 90, 140)).save(image, 'JPEG')
+    (directory / 'lamp.jpg').write_bytes(image.getvalue())
+
+    path = directory / 'briefs.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, ['artist', 'doc_type', 'context', 'images'])
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow({
+                'artist': 'a1' if i % 3 else 'a2',
+                'doc_type': DOC_TYPES[i % len(DOC_TYPES)],
+                'context': f"Launch {i}: ceramic lamp no. {i} inspired by coastal light",
+                'images': 'lamp.jpg' if i % 5 == 0 else '',
+            })
+    return path
+
+
+def prepare(briefs: list[dict]) -> list[dict]:
+    for brief in briefs:
+        brief['artist_id'] = brief['artist']
+    return briefs
+
+
+def make_factory(completions: FakeCompletions):
+    scheduler = RequestScheduler(0, 0)
+
+    def make_generator(artist_id: str) -> CopyGeneratorV2:
+        generator = CopyGeneratorV2('sk-fake', scheduler=scheduler)
+        generator.openai = fake_client(completions)
+        return generator
+    return make_generator
+
+
+def run_sequential(briefs: list[dict], completions: FakeCompletions, sink: Sink) -> None:
+    generator = make_factory(completions)('a1')
+    for brief in briefs:
+        images, _ = prepare_images([{'bytes': Path(p).read_bytes()} for p in brief['images']])
+        copy = generator.generate(
+            STYLE_GUIDES[brief['artist_id']], brief['doc_type'],
+            f"Document type: {brief['doc_type'].replace('_', ' ')}\n\n{brief['context']}", images,
+        )
+        sink([{'artist_id': brief['artist_id'], 'doc_type': brief['doc_type'],
+               'user_brief': brief['context'], 'content': copy}])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--briefs', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.2, help="seconds per reply")
+    parser.add_argument('--insert-latency', type=float, default=0.05, help="seconds per save call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        briefs = prepare(load_briefs(write_briefs(tmp, args.briefs)))
+
+        # JSONL gives the same briefs (and keys) as CSV
+        jsonl = tmp / 'briefs.jsonl'
+        jsonl.write_text(''.join(
+            json.dumps({'artist': b['artist'], 'doc_type': b['doc_type'], 'context': b['context'],
+                        'images': [Path(p).name for p in b['images']]}) + '\n'
+            for b in briefs
+        ))
+        assert [b['key'] for b in load_briefs(jsonl)] == [b['key'] for b in briefs]
+
+        sequential_client, sequential_sink = FakeCompletions(first_token_latency=args.latency), Sink(args.insert_latency)
+        start = time.perf_counter()
+        run_sequential(briefs, sequential_client, sequential_sink)
+        sequential = time.perf_counter() - start
+
+        batch_client, batch_sink = FakeCompletions(first_token_latency=args.latency), Sink(args.insert_latency)
+        start = time.perf_counter()
+        results = list(run_batch(
+            briefs, make_factory(batch_client), STYLE_GUIDES, batch_sink,
+            BatchCheckpoint(tmp / 'full.db'), max_concurrency=args.concurrency,
+        ))
+        batch = time.perf_counter() - start
+        assert not any(r['error'] for r in results) and len(batch_sink.rows) == len(briefs)
+        sent = sorted(json.dumps(r, sort_keys=True, default=str) for r in batch_client.requests)
+        assert sent == sorted(json.dumps(r, sort_keys=True, default=str) for r in sequential_client.requests)
+
+        print(f"{len(briefs)} briefs, {args.latency * 1e3:.0f} ms per reply, "
+              f"{args.insert_latency * 1e3:.0f} ms per save call")
+        print(f"  one at a time          {sequential:6.2f}s, {sequential_sink.calls} save calls")
+        print(f"  run_batch ({args.concurrency} at once)  {batch:6.2f}s, {batch_sink.calls} save calls")
+        print(f"Speed-up: {sequential / batch:.1f}x; same requests as generate()")
+        assert batch < sequential
+
+        # Stop part way, then resume: nothing generated or saved twice
+        client, sink = FakeCompletions(first_token_latency=args.latency), Sink(0)
+        checkpoint = BatchCheckpoint(tmp / 'resume.db')
+        job = run_batch(briefs, make_factory(client), STYLE_GUIDES, sink, checkpoint,
+                        max_concurrency=args.concurrency, save_batch_size=5)
+        first_run = [next(job) for _ in range(len(briefs) // 3)]
+        job.close()  # as if interrupted: in-flight briefs finish and are kept, queued ones dropped
+        stopped = checkpoint.stats()
+        assert stopped['succeeded'] == stopped['saved'] == len(sink.rows) >= len(first_run)
+        assert client.calls == stopped['succeeded'] < len(briefs)
+        resumed = list(run_batch(briefs, make_factory(client), STYLE_GUIDES, sink, checkpoint,
+                                 max_concurrency=args.concurrency, save_batch_size=5))
+        assert len(resumed) == len(briefs) - stopped['succeeded']
+        assert client.calls == len(briefs) == len(sink.rows)
+        assert len({(r['doc_type'], r['user_brief']) for r in sink.rows}) == len(briefs)
+        print(f"Stopped after {stopped['succeeded']} briefs, resumed with the other {len(resumed)}: "
+              f"{client.calls} calls and {len(sink.rows)} saved rows for {len(briefs)} briefs")
+
+        # A failing brief is recorded and retried on the next run
+        failing = FakeCompletions(fail_marker='Launch 7:')
+        sink, checkpoint = Sink(0), BatchCheckpoint(tmp / 'failures.db')
+        results = list(run_batch(briefs, make_factory(failing), STYLE_GUIDES, sink, checkpoint))
+        assert [r['line'] for r in results if r['error']] == [briefs[7]['line']]
+        assert checkpoint.stats()['failed'] == 1 and len(sink.rows) == len(briefs) - 1
+        retried = list(run_batch(briefs, make_factory(FakeCompletions()), STYLE_GUIDES, sink, checkpoint))
+        assert [r['key'] for r in retried] == [briefs[7]['key']] and len(sink.rows) == len(briefs)
+        print("A failed brief is reported without stopping the job and retried on the next run")
+
+
+if __name__ == '__main__':
+    main()
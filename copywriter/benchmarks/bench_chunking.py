@@ -0,0 +1,95 @@
+"""
+Benchmark: offset-based chunking vs the previous copy-per-window chunk_text.
+
+Checks that iter_chunk_spans produces exactly the old chunks, then times
+both on a ~5 MB corpus.
+
+Usage:
+    python benchmarks/bench_chunking.py [--mb 5]
+"""
+
+import argparse
+import random
+import time
+
+from corpus import make_paragraph
+from src.document_parser import chunk_text, iter_chunk_spans
+
+
+def chunk_text_rfind(text: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
+    """The previous chunk_text, kept here as the baseline."""
+    if len(text) <= chunk_size:
+        return [text]
+
+    chunks = []
+    start = 0
+
+    while start < len(text):
+        end = start + chunk_size
+
+        if end < len(text):
+            para_break = text.rfind('\n\n', start, end)
+            if para_break > start + chunk_size // 2:
+                end = para_break
+            else:
+                sentence_break = max(
+                    text.rfind('. ', start, end),
+                    text.rfind('! ', start, end),
+                    text.rfind('? ', start, end)
+                )
+                if sentence_break > start + chunk_size // 2:
+                    end = sentence_break + 1
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+
+        start = end - overlap if end < len(text) else len(text)
+
+    return chunks
+
+
+def make_corpus(megabytes: float, seed: int = 0) -> str:
+    """Paragraphs of varied length, with some questions and exclamations."""
+    rng = random.Random(seed)
+    paragraphs = []
+    size = 0
+    while size < megabytes * 1e6:
+        para = make_paragraph(rng, rng.randint(20, 400))
+        if rng.random() < 0.2:
+            para = para.replace('.', '?', 1)
+        if rng.random() < 0.1:
+            para = para.replace('.', '!', 2)
+        paragraphs.append(para)
+        size += len(para) + 2
+    return '\n\n'.join(paragraphs)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mb', type=float, default=5)
+    args = parser.parse_args()
+
+    text = make_corpus(args.mb)
+    print(f"Corpus: {len(text) / 1e6:.1f} MB")
+
+    for chunk_size, overlap in ((500, 50), (1000, 200), (200, 0)):
+        assert chunk_text(text, chunk_size, overlap) == chunk_text_rfind(text, chunk_size, overlap)
+    print("Chunks match the previous implementation")
+
+    rfind = min(timed(lambda: chunk_text_rfind(text)) for _ in range(3))
+    spans = min(timed(lambda: sum(1 for _ in iter_chunk_spans(text))) for _ in range(3))
+    strings = min(timed(lambda: chunk_text(text)) for _ in range(3))
+    print(f"rfind + copies (old):   {rfind * 1000:7.1f} ms")
+    print(f"Spans only:             {spans * 1000:7.1f} ms ({rfind / spans:.2f}x)")
+    print(f"Spans -> chunk strings: {strings * 1000:7.1f} ms ({rfind / strings:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: a new OpenAI client per button press versus the shared,
+pooled client from src.openai_clients.
+
+Runs generate() calls one after another against a local server whose new
+connections cost --connect-delay seconds (standing in for the TCP and
+TLS handshakes with api.openai.com), first building a new client for
+each call as the app used to, then through the client registry. Also
+checks the registry's keying (per API key, hashed, least recently used
+dropped) and that concurrent calls stay within the pool size.
+
+Usage:
+    python benchmarks/bench_client_pool.py [--calls 40] [--connect-delay 0.05] [--latency 0.02]
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_openai import FakeOpenAIServer
+from openai import OpenAI
+from src.generator_v2 import CopyGeneratorV2
+from src.openai_clients import ClientRegistry, get_client_registry, new_openai_client
+from src.rate_limiter import RequestScheduler
+
+STYLE_GUIDE = "Write in short, confident sentences. Lead with the collection name."
+
+
+def timed_calls(make_generator, calls: int) -> list[float]:
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        make_generator().generate(STYLE_GUIDE, 'bio', f'Brief {i}')
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def check_registry(base_url: str):
+    registry = ClientRegistry(max_clients=2)
+    a = registry.get('sk-key-a', base_url)
+    assert registry.get('sk-key-a', base_url) is a
+    b = registry.get('sk-key-b', base_url)
+    assert b is not a and b.api_key == 'sk-key-b'
+    assert not any('sk-key' in key for key in registry._clients)
+    registry.get('sk-key-a', base_url)  # a is now most recently used
+    registry.get('sk-key-c', base_url)  # drops b
+    assert registry.get('sk-key-a', base_url) is a and registry.get('sk-key-b', base_url) is not b
+    print("One client per API key, held under a hash of the key; least recently used key dropped")
+
+
+def check_pool_limit(server: FakeOpenAIServer, pool_size: int, threads: int):
+    client = new_openai_client('sk-fake', server.base_url, pool_size=pool_size)
+    before = server.connections
+    in_flight, peak, lock = 0, 0, threading.Lock()
+
+    def call(i):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        client.chat.completions.create(model='gpt-4o', messages=[{'role': 'user', 'content': f'Brief {i}'}])
+        with lock:
+            in_flight -= 1
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(threads * 4)))
+    opened = server.connections - before
+    assert opened <= pool_size
+    print(f"{threads} threads sharing a pool of {pool_size}: {opened} connections opened for {threads * 4} calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=40)
+    parser.add_argument('--connect-delay', type=float, default=0.05)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(10 ** 6, burst=1000, latency=args.latency, connect_delay=args.connect_delay) as server:
+        os.environ['OPENAI_BASE_URL'] = server.base_url
+        scheduler = RequestScheduler(0, 0)
+
+        def per_click() -> CopyGeneratorV2:
+            generator = CopyGeneratorV2('sk-fake', scheduler=scheduler)
+            generator.openai = OpenAI(api_key='sk-fake', max_retries=0)  # as before the registry
+            return generator
+
+        def shared() -> CopyGeneratorV2:
+            return CopyGeneratorV2('sk-fake', scheduler=scheduler)
+
+        start = time.perf_counter()
+        for _ in range(20):
+            OpenAI(api_key='sk-fake', max_retries=0)
+        construct = (time.perf_counter() - start) / 20
+
+        connections = server.connections
+        old = timed_calls(per_click, args.calls)
+        old_connections = server.connections - connections
+
+        connections = server.connections
+        new = timed_calls(shared, args.calls)
+        new_connections = server.connections - connections
+        assert get_client_registry().stats()['created'] == 1
+        assert new_connections == 1
+
+        print(f"{args.calls} sequential calls, {args.latency * 1e3:.0f} ms server time, "
+              f"{args.connect_delay * 1e3:.0f} ms per new connection")
+        print(f"Building a client: {construct * 1e3:.1f} ms")
+        for label, latencies, opened in (
+            ('client per call', old, old_connections),
+            ('shared client', new, new_connections),
+        ):
+            print(f"  {label:<16} mean {statistics.mean(latencies) * 1e3:6.1f} ms, "
+                  f"p50 {statistics.median(latencies) * 1e3:6.1f} ms, {opened} connections")
+        saved = statistics.mean(old) - statistics.mean(new)
+        print(f"Saved per call: {saved * 1e3:.1f} ms")
+        assert saved > 0
+
+        check_registry(server.base_url)
+        check_pool_limit(server, pool_size=4, threads=8)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: token-budgeted corpus assembly for StyleAnalyzerV2.analyze.
+
+Checks that with an unlimited budget assemble_corpus reproduces the old
++= concatenation, and that with a budget it stays within it, keeps press
+releases ahead of product copy and training notes, and trims at paragraph
+boundaries. Then compares prompt size and assembly time on a large artist.
+
+Usage:
+    python benchmarks/bench_corpus_assembly.py [--documents 400] [--budget 60000]
+"""
+
+import argparse
+import random
+import time
+
+from corpus import make_paragraph
+from src.corpus_assembler import assemble_corpus, document_tier, estimate_tokens
+
+KINDS = ('Press Release', 'Product Description', 'Training Notes', 'Studio Visit')
+
+
+def concatenate(documents: list[dict]) -> str:
+    """The previous analyze() corpus construction, kept here as the baseline."""
+    combined_text = ""
+    for doc in documents:
+        combined_text += f"\n\n--- {doc['filename']} ---\n"
+        combined_text += doc['full_text']
+    return combined_text
+
+
+def make_documents(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        paragraphs = [make_paragraph(rng, rng.randint(30, 120)) for _ in range(rng.randint(4, 40))]
+        documents.append({
+            'filename': f'{KINDS[i % len(KINDS)]} {i:03d}.docx',
+            'full_text': '\n\n'.join(paragraphs),
+            'created_at': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00+00:00',
+        })
+    return documents
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=400)
+    parser.add_argument('--budget', type=int, default=60000)
+    args = parser.parse_args()
+
+    documents = make_documents(args.documents)
+
+    # Unlimited budget, one tier, no dates: identical to the old text
+    plain = [{'filename': f'Doc {i}.docx', 'full_text': d['full_text']} for i, d in enumerate(documents[:50])]
+    text, _ = assemble_corpus(plain, token_budget=10**9, per_document_tokens=10**9)
+    assert text == concatenate(plain)
+
+    text, report = assemble_corpus(documents, token_budget=args.budget)
+    assert estimate_tokens(text) <= args.budget and report['tokens'] <= args.budget
+    tiers = [d['tier'] for d in report['included']]
+    assert tiers == sorted(tiers, key=['press_release', 'product', 'other', 'training'].index)
+    press = [d for d in documents if document_tier(d['filename']) == 'press_release']
+    newest = max(press, key=lambda d: d['created_at'])['filename']
+    assert report['included'][0]['filename'] == newest
+    by_name = {d['filename']: d['full_text'] for d in documents}
+    for entry in report['included']:
+        if entry['trimmed']:
+            paragraphs = by_name[entry['filename']].split('\n\n')
+            assert '\n\n'.join(paragraphs[:entry['paragraphs']]) in text
+    print("Budgeted corpus respects budget, priority, recency and paragraph boundaries")
+
+    full = concatenate(documents)
+    print(f"Corpus: {args.documents} documents, ~{estimate_tokens(full):,} tokens")
+    print(
+        f"Budgeted: ~{report['tokens']:,} tokens, {len(report['included'])} documents "
+        f"({sum(d['trimmed'] for d in report['included'])} trimmed), "
+        f"{len(report['excluded'])} left out"
+    )
+
+    old = min(timed(lambda: concatenate(documents)) for _ in range(5))
+    new = min(timed(lambda: assemble_corpus(documents, token_budget=args.budget)) for _ in range(5))
+    print(f"Assembly: += concatenation {old * 1000:.1f} ms, budgeted {new * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: near-duplicate detection on an artist archive.
+
+Builds an archive where some press releases were re-saved as PDF, DOCX and
+HTML (with small edits), checks that collapse_near_duplicates keeps exactly
+one copy of each, and that the persisted per-artist index flags a fresh
+re-upload but never matches documents with no text (scanned PDFs). Reports signature cost and how much text the analysis prompt
+no longer carries.
+
+Usage:
+    python benchmarks/bench_dedupe.py [--originals 60] [--copies 2]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+
+from corpus import make_docx, make_html, make_paragraphs, make_pdf
+from src.dedupe import ArtistDuplicateIndex, minhash_signature
+from src.document_parser import collapse_near_duplicates, parse_document_bytes
+
+
+def wrap_lines(paragraphs: list[str], width: int = 85) -> list[list[str]]:
+    """Lay paragraphs out as PDF pages of wrapped lines."""
+    lines = []
+    for para in paragraphs:
+        line = []
+        for word in para.split():
+            line.append(word)
+            if len(' '.join(line)) > width:
+                lines.append(' '.join(line))
+                line = []
+        if line:
+            lines.append(' '.join(line))
+    return [lines[i:i + 60] for i in range(0, len(lines), 60)]
+
+
+def make_copy(paragraphs: list[str], kind: str, rng: random.Random) -> bytes:
+    """A re-saved copy with a line or two edited."""
+    edited = list(paragraphs)
+    edited[rng.randrange(len(edited))] += ' Now showing at the gallery.'
+    if kind == 'docx':
+        return make_docx(edited)
+    if kind == 'html':
+        return make_html(edited)
+    return make_pdf(wrap_lines(edited))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--originals', type=int, default=60)
+    parser.add_argument('--copies', type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents, originals = [], []
+    for i in range(args.originals):
+        paragraphs = make_paragraphs(rng.randint(10, 40), seed=i)
+        originals.append(paragraphs)
+        documents.append(parse_document_bytes(f'Press Release {i}.docx', make_docx(paragraphs), use_cache=False))
+        if i % 3 == 0:
+            for c, kind in zip(range(args.copies), ('pdf', 'html', 'docx')):
+                data = make_copy(paragraphs, kind, rng)
+                documents.append(parse_document_bytes(f'Press Release {i} copy {c}.{kind}', data, use_cache=False))
+    documents = [dict(doc, id=str(i)) for i, doc in enumerate(documents)]
+
+    expected_dupes = sum(1 for i in range(args.originals) if i % 3 == 0) * args.copies
+    words = sum(doc['word_count'] for doc in documents)
+    print(f"Archive: {len(documents)} documents, {words} words, {expected_dupes} re-saved copies")
+
+    start = time.perf_counter()
+    signatures = {doc['id']: minhash_signature(doc['full_text']) for doc in documents}
+    elapsed = time.perf_counter() - start
+    print(f"Signatures: {elapsed * 1000:.0f} ms ({elapsed / len(documents) * 1000:.1f} ms/document)")
+
+    start = time.perf_counter()
+    kept, duplicates = collapse_near_duplicates(documents, signatures=signatures)
+    print(f"Collapse: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    assert len(duplicates) == expected_dupes, duplicates
+    original = lambda name: name.rsplit('.', 1)[0].split(' copy')[0]
+    for dupe in duplicates:
+        assert original(dupe['filename']) == original(dupe['duplicate_of']), dupe
+    kept_words = sum(doc['word_count'] for doc in kept)
+    print(f"Kept {len(kept)} documents; analysis text shrinks by {1 - kept_words / words:.0%}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ArtistDuplicateIndex('artist-1', index_dir=tmp)
+        stored = [
+            {'id': doc['id'], 'filename': doc['filename'], 'extracted_text': doc['full_text']}
+            for doc in kept
+        ]
+        start = time.perf_counter()
+        index.sync(stored)
+        print(f"Index sync (first time): {(time.perf_counter() - start) * 1000:.0f} ms")
+        start = time.perf_counter()
+        index.sync(stored)
+        print(f"Index sync (unchanged):  {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        reupload = make_copy(originals[4], 'pdf', rng)
+        text = parse_document_bytes('Reupload.pdf', reupload, use_cache=False)['full_text']
+        start = time.perf_counter()
+        matches = index.query(text)
+        print(f"Upload check: {(time.perf_counter() - start) * 1000:.1f} ms -> {matches[:1]}")
+        assert matches and matches[0]['filename'] == 'Press Release 4.docx'
+        fresh = '\n\n'.join(make_paragraphs(20, seed=10_000))
+        assert not index.query(fresh)
+
+        # Text-less uploads all share one signature; they must not match each other
+        index.sync(stored + [{'id': 'scan-1', 'filename': 'Scan 1.pdf', 'extracted_text': ''}])
+        assert 'scan-1' not in index.doc_ids() and not index.query('  ')
+        scans = [{'filename': f'Scan {i}.pdf', 'full_text': text} for i, text in enumerate(['', ' ', 'Page 1'])]
+        assert collapse_near_duplicates(scans)[1] == []
+        print("Documents without text are never flagged as duplicates")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: streaming DOCX extraction vs python-docx.
+
+Checks that the streaming path returns exactly python-docx's text (on the
+synthetic corpus and on a document with tables, hyperlinks, tabs and
+breaks), then times both and measures each one's peak RSS in a fresh
+subprocess (python-docx keeps its tree in libxml2, which tracemalloc
+can't see).
+
+Usage:
+    python benchmarks/bench_docx_extract.py [--paragraphs 20000]
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from corpus import make_docx, make_paragraphs
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import parse_xml
+from src.document_parser import iter_docx_paragraphs, parse_docx
+
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def make_tricky_docx() -> bytes:
+    """A small DOCX exercising the run content python-docx treats specially."""
+    doc = Document()
+    doc.add_heading('Title Page', level=0)
+    doc.add_heading('Section', level=2)
+    para = doc.add_paragraph('Tab\there ')
+    run = para.add_run('then a line')
+    run.add_break()
+    run.add_text('break and a page')
+    run.add_break(WD_BREAK.PAGE)
+    run.add_text('break')
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = 'Table text is not body text'
+    para = doc.add_paragraph('Visit ')
+    para._p.append(parse_xml(
+        f'<w:hyperlink {_W_NS}><w:r><w:t>our gallery</w:t></w:r>'
+        f'<w:r><w:noBreakHyphen/><w:t xml:space="preserve"> online</w:t></w:r></w:hyperlink>'
+    ))
+    para.add_run(' today.')
+    doc.add_paragraph('')
+    doc.add_paragraph('  Padded  ')
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def peak_rss_mb(path: Path, fast: bool) -> float:
+    """Peak RSS of a fresh interpreter parsing path once."""
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', str(path), '--fast' if fast else '--slow'],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return float(output)
+
+
+def _peak_rss_kb() -> int:
+    # ru_maxrss survives exec (it would report the parent's peak), so
+    # prefer the per-process high-water mark where /proc has it
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(path: str, fast: bool):
+    baseline = _peak_rss_kb()
+    parse_docx(path, fast=fast)
+    print((_peak_rss_kb() - baseline) / 1024)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--paragraphs', type=int, default=20000)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--fast', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--slow', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.fast)
+        return
+
+    tricky = make_tricky_docx()
+    assert parse_docx(tricky) == parse_docx(tricky, fast=False)
+    levels = [level for _, level in iter_docx_paragraphs(tricky, with_headings=True)]
+    assert levels[:3] == [0, 2, None], levels
+    small = make_docx(make_paragraphs(200))
+    assert parse_docx(small) == parse_docx(small, fast=False)
+    print("Streaming output matches python-docx")
+
+    data = make_docx(make_paragraphs(args.paragraphs))
+    print(f"Document: {args.paragraphs} paragraphs, {len(data) / 1e6:.1f} MB zipped")
+
+    slow = min(timed(lambda: parse_docx(data, fast=False)) for _ in range(3))
+    fast = min(timed(lambda: parse_docx(data)) for _ in range(3))
+    print(f"python-docx:  {slow * 1000:8.1f} ms")
+    print(f"Streaming:    {fast * 1000:8.1f} ms ({slow / fast:.2f}x)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'large.docx'
+        path.write_bytes(data)
+        print(f"Peak RSS growth, python-docx: {peak_rss_mb(path, fast=False):7.1f} MB")
+        print(f"Peak RSS growth, streaming:   {peak_rss_mb(path, fast=True):7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark: the local BM25 exemplar index.
+
+Builds a synthetic artist corpus (Zipf-distributed vocabulary), then
+times indexing every document, adding and removing one document, the
+first query after a change (postings rebuilt) and warm queries. Checks
+the scores against a plain-Python BM25 over the same passages, that
+removed documents never come back and that example passages land in the
+variable tail of the generate prompt, after the cacheable prefix.
+
+Usage:
+    python benchmarks/bench_exemplar_index.py [--documents 300] [--words 900] [--queries 200]
+"""
+
+import argparse
+import math
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+from fake_openai import prompt_text
+from src.exemplar_index import (
+    BM25_B,
+    BM25_K1,
+    EXEMPLAR_CHUNK_OVERLAP,
+    EXEMPLAR_CHUNK_SIZE,
+    ArtistExemplarIndex,
+    _WORD_RE,
+)
+from src.document_parser import chunk_text
+from src.generator_v2 import CopyGeneratorV2
+
+VOCABULARY = [f"w{i}" for i in range(8000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        n = min(words, rng.randint(8, 20))
+        sentences.append(' '.join(rng.choices(VOCABULARY, WEIGHTS, k=n)).capitalize() + '.')
+        words -= n
+    return ' '.join(sentences)
+
+
+def reference_scores(documents: list[dict], query: str) -> dict[tuple[str, str], float]:
+    """Plain-Python BM25 (same idf and length normalisation), keyed by (doc_id, passage)."""
+    passages = [
+        (d['id'], passage, Counter(_WORD_RE.findall(passage.lower())))
+        for d in documents
+        for passage in chunk_text(d['extracted_text'], EXEMPLAR_CHUNK_SIZE, EXEMPLAR_CHUNK_OVERLAP)
+    ]
+    passages = [p for p in passages if p[2]]
+    n = len(passages)
+    average_length = sum(sum(c.values()) for _, _, c in passages) / n
+    df = Counter(term for _, _, counts in passages for term in counts)
+    query_counts = Counter(_WORD_RE.findall(query.lower()))
+    scores = {}
+    for doc_id, passage, counts in passages:
+        length = sum(counts.values())
+        score = 0.0
+        for term, q in query_counts.items():
+            tf = counts.get(term, 0)
+            if tf:
+                idf = math.log1p((n - df[term] + 0.5) / (df[term] + 0.5))
+                score += q * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+        scores[(doc_id, passage)] = score
+    return scores
+
+
+def check_prompt():
+    generator = CopyGeneratorV2('sk-fake')
+    exemplars = [{'filename': 'Spring show.docx', 'text': 'Light falls across the harbour.'}]
+    plain = generator._generate_request('Guide', 'bio', 'Brief', None)
+    with_examples = generator._generate_request('Guide', 'bio', 'Brief', None, exemplars)
+    assert plain['messages'][:-1] == with_examples['messages'][:-1]
+    tail = prompt_text(with_examples['messages'][-1:])
+    assert tail.index('EXAMPLE PASSAGES') < tail.index('USER BRIEF')
+    assert 'Light falls across the harbour.' in tail and 'EXAMPLE PASSAGES' not in str(plain['messages'])
+    print("Example passages go after the cacheable prefix and before the brief; none without exemplars")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=300)
+    parser.add_argument('--words', type=int, default=900, help="words per document")
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [
+        {'id': str(i), 'filename': f'Document {i}.docx', 'extracted_text': make_text(rng, args.words)}
+        for i in range(args.documents)
+    ]
+    new_document = {'id': 'new', 'filename': 'New.docx', 'extracted_text': make_text(rng, args.words)}
+    queries = [make_text(rng, rng.randint(20, 80)) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ArtistExemplarIndex('artist', index_dir=tmp)
+
+        start = time.perf_counter()
+        index.sync(documents)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        index.search(queries[0])
+        first_query = time.perf_counter() - start
+        stats = index.stats()
+
+        start = time.perf_counter()
+        index.sync(documents)
+        resync = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.add(new_document['id'], new_document['filename'], new_document['extracted_text'])
+        add = time.perf_counter() - start
+        start = time.perf_counter()
+        index.search(queries[0])
+        rebuild = time.perf_counter() - start
+        start = time.perf_counter()
+        index.remove(new_document['id'])
+        remove = time.perf_counter() - start
+        assert index.stats() == stats
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        print(f"{stats['documents']} documents, {stats['passages']:,} passages")
+        print(f"  index every document   {build * 1e3:8.1f} ms")
+        print(f"  first query (load)     {first_query * 1e3:8.1f} ms")
+        print(f"  sync, nothing changed  {resync * 1e3:8.1f} ms")
+        print(f"  add one document       {add * 1e3:8.1f} ms")
+        print(f"  next query (rebuild)   {rebuild * 1e3:8.1f} ms")
+        print(f"  remove one document    {remove * 1e3:8.1f} ms")
+        p50, p95 = statistics.median(latencies), latencies[int(0.95 * (len(latencies) - 1))]
+        print(f"Warm queries: p50 {p50 * 1e3:.2f} ms, p95 {p95 * 1e3:.2f} ms over {len(queries)} briefs")
+        assert p95 < 0.05
+
+        # Same scores and ranking as the plain-Python BM25
+        for query in queries[:5]:
+            expected = reference_scores(documents, query)
+            results = index.search(query, k=10, max_per_document=10 ** 6)
+            for r in results:
+                assert math.isclose(r['score'], expected[(r['doc_id'], r['text'])], rel_tol=1e-4)
+            best = sorted(expected.values(), reverse=True)[:len(results)]
+            assert all(math.isclose(r['score'], s, rel_tol=1e-4) for r, s in zip(results, best))
+        assert len({r['doc_id'] for r in index.search(queries[0], k=5)}) == 5
+        print("Scores match a plain-Python BM25; one passage per document by default")
+
+        # Removed documents drop out of results
+        index.sync(documents[10:])
+        assert not {r['doc_id'] for r in index.search(documents[0]['extracted_text'][:400], k=20)} & {
+            d['id'] for d in documents[:10]
+        }
+        assert index.stats()['documents'] == args.documents - 10
+        print("Documents removed from storage are dropped on sync")
+
+    check_prompt()
+
+
+if __name__ == '__main__':
+    main()
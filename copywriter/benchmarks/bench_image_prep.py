@@ -0,0 +1,95 @@
+"""
+Benchmark: image preparation before vision calls.
+
+Builds artwork-sized test images (large JPEG and PNG photos, a PNG with
+transparency, a WebP, a small JPEG) and compares the raw uploads with the
+output of prepare_images: request bytes, estimated vision tokens and time,
+sequential vs threaded. Checks every prepared image decodes, matches its
+MIME type and fits the size the model would scale it to.
+
+Usage:
+    python benchmarks/bench_image_prep.py [--workers 4]
+"""
+
+import argparse
+import base64
+import time
+from io import BytesIO
+
+import corpus  # noqa: F401  (puts src on the path)
+from PIL import Image, ImageFilter
+
+from src.image_prep import estimate_image_tokens, model_size, prepare_images
+
+FORMAT_MIME = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+
+
+def artwork(width: int, height: int, seed: int) -> Image.Image:
+    """Noisy gradient with soft blobs: compresses like a photographed painting."""
+    noise = Image.effect_noise((width // 4, height // 4), 40 + seed).resize((width, height))
+    gradient = Image.linear_gradient('L').resize((width, height)).rotate(seed * 30)
+    base = Image.merge('RGB', (noise, gradient, Image.blend(noise, gradient, 0.5)))
+    return base.filter(ImageFilter.GaussianBlur(1))
+
+
+def encode(image: Image.Image, fmt: str, **kwargs) -> bytes:
+    out = BytesIO()
+    image.save(out, format=fmt, **kwargs)
+    return out.getvalue()
+
+
+def make_uploads() -> list[dict]:
+    transparent = artwork(1600, 1600, 3).convert('RGBA')
+    transparent.putalpha(Image.radial_gradient('L').resize((1600, 1600)))
+    return [
+        {'name': 'camera.jpg', 'bytes': encode(artwork(4000, 3000, 1), 'JPEG', quality=95)},
+        {'name': 'scan.png', 'bytes': encode(artwork(3000, 3000, 2), 'PNG')},
+        {'name': 'cutout.png', 'bytes': encode(transparent, 'PNG')},
+        {'name': 'web.webp', 'bytes': encode(artwork(2400, 1600, 4), 'WEBP', quality=90)},
+        {'name': 'thumb.jpg', 'bytes': encode(artwork(600, 400, 5), 'JPEG', quality=80)},
+        {'name': 'detail-low.jpg', 'bytes': encode(artwork(3000, 2000, 6), 'JPEG', quality=95), 'detail': 'low'},
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    uploads = make_uploads()
+
+    start = time.perf_counter()
+    sequential, report = prepare_images(uploads, max_workers=1)
+    sequential_time = time.perf_counter() - start
+    start = time.perf_counter()
+    threaded, _ = prepare_images(uploads, max_workers=args.workers)
+    threaded_time = time.perf_counter() - start
+    assert [p['bytes'] for p in threaded] == [p['bytes'] for p in sequential]
+
+    print(f"{'image':<16}{'raw':>10}{'prepared':>10}  {'mime':<11}{'detail':<7}{'tokens':>7}")
+    for upload, prepared in zip(uploads, sequential):
+        raw = Image.open(BytesIO(upload['bytes']))
+        image = Image.open(BytesIO(prepared['bytes']))
+        assert FORMAT_MIME[image.format] == prepared['mime_type']
+        assert image.size == model_size(*raw.size, prepared['detail'])
+        assert len(prepared['bytes']) <= len(upload['bytes'])
+        assert prepared['name'] == upload['name']
+        tokens = estimate_image_tokens(*image.size, prepared['detail'])
+        print(
+            f"{upload['name']:<16}{len(upload['bytes']) / 1e6:>8.2f}MB{len(prepared['bytes']) / 1e6:>8.2f}MB"
+            f"  {prepared['mime_type']:<11}{prepared['detail']:<7}{tokens:>7}"
+        )
+    assert sequential[2]['mime_type'] == 'image/png'  # transparency kept
+
+    def request_bytes(images):
+        return sum(len(base64.b64encode(img['bytes'])) for img in images)
+
+    print(
+        f"Request payload: {request_bytes(uploads) / 1e6:.1f} MB -> {request_bytes(sequential) / 1e6:.1f} MB base64; "
+        f"vision tokens ~{report['original_tokens']:,} -> ~{report['tokens']:,}"
+    )
+    print(f"Preparation: {sequential_time:.2f}s sequential, {threaded_time:.2f}s with {args.workers} threads")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark: full style guide regeneration versus an incremental update
+after one new document.
+
+Builds a synthetic artist corpus and a nine-section guide, then sends the
+requests StyleAnalyzerV2 makes for a full rebuild (single prompt and
+map-reduce) and for update() with one new press release, against a fake
+client that replies like the model would: a whole guide, style notes, or
+just the revised sections. Token counts come from the real requests;
+time is modelled from them (prompt tokens at --prefill-rate, output
+tokens at --output-rate, per sequential step), since the fake replies
+instantly. Also checks that revised sections are merged into the right
+places and that a guide without the nine sections is rewritten whole.
+
+Usage:
+    python benchmarks/bench_incremental_guide.py [--documents 80] [--words 900]
+        [--prefill-rate 15000] [--output-rate 80]
+"""
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from fake_openai import prompt_text
+from src.corpus_assembler import estimate_tokens
+from src.generator_v2 import DEFAULT_ANALYSIS_WORKERS, StyleAnalyzerV2
+from src.guide_sections import GUIDE_SECTIONS, NO_CHANGES, split_guide
+from src.rate_limiter import RequestScheduler
+
+WORDS = (
+    "harbour light canvas palette evening tide memory brushwork coastline studio "
+    "collection gallery colour texture quiet bold narrative heritage figure street"
+).split()
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        n = min(words, rng.randint(8, 20))
+        sentences.append(' '.join(rng.choice(WORDS) for _ in range(n)).capitalize() + '.')
+        words -= n
+    return ' '.join(sentences)
+
+
+def make_guide(rng: random.Random, section_words: int = 300) -> str:
+    return "\n\n".join(
+        f"{i}) {title}\n" + make_text(rng, section_words)
+        for i, title in enumerate(GUIDE_SECTIONS, start=1)
+    )
+
+
+class GuideCompletions:
+    """
+    Fake chat.completions.create replying by prompt type: revised sections
+    to an update, notes to a map step, otherwise a whole guide. Keeps the
+    prompt and output tokens of every call.
+    """
+
+    def __init__(self, guide: str, revised: str):
+        self.guide, self.revised = guide, revised
+        self.calls = []
+
+    def create(self, model, messages, **kwargs):
+        prompt = prompt_text(messages)
+        if '--- CURRENT STYLE GUIDE ---' in prompt:
+            reply = self.revised
+        elif '--- STYLE NOTES ---' in prompt or 'Take style notes' not in prompt:
+            reply = self.guide
+        else:
+            reply = self.guide[:2400]  # ~600 words of notes
+        usage = SimpleNamespace(
+            prompt_tokens=estimate_tokens(prompt), completion_tokens=estimate_tokens(reply),
+            total_tokens=estimate_tokens(prompt) + estimate_tokens(reply), prompt_tokens_details=None,
+        )
+        self.calls.append(usage)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))], usage=usage)
+
+
+def run(guide: str, revised: str, action) -> tuple[list, str, StyleAnalyzerV2]:
+    completions = GuideCompletions(guide, revised)
+    analyzer = StyleAnalyzerV2('sk-fake', scheduler=RequestScheduler(0, 0))
+    analyzer.openai = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    result = action(analyzer)
+    return completions.calls, result, analyzer
+
+
+def modelled_seconds(calls: list, parallel: int, prefill_rate: float, output_rate: float) -> float:
+    """Map calls run `parallel` at a time; the last call (merge or single) runs alone."""
+    *map_calls, last = calls
+
+    def seconds(call):
+        return call.prompt_tokens / prefill_rate + call.completion_tokens / output_rate
+
+    map_time = sum(seconds(c) for c in map_calls) / parallel if map_calls else 0.0
+    return map_time + seconds(last)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=80)
+    parser.add_argument('--words', type=int, default=900, help="words per document")
+    parser.add_argument('--prefill-rate', type=float, default=15000, help="prompt tokens per second")
+    parser.add_argument('--output-rate', type=float, default=80, help="output tokens per second")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [
+        {'id': str(i), 'filename': f'Press release {i}.docx', 'full_text': make_text(rng, args.words)}
+        for i in range(args.documents)
+    ]
+    new_document = {'id': 'new', 'filename': 'Press release new.docx', 'full_text': make_text(rng, args.words)}
+    guide = make_guide(rng)
+    # A typical update: new phrase stems and a tweak to the non-negotiables
+    revised = "\n\n".join(
+        f"{n}) {GUIDE_SECTIONS[n - 1]}\n" + make_text(rng, 320) for n in (2, 6)
+    )
+
+    # Merge: sections 2 and 6 replaced, the rest untouched
+    calls, updated, analyzer = run(guide, revised, lambda a: a.update(guide, [new_document], 'Artist'))
+    before, after = split_guide(guide)[1], split_guide(updated)[1]
+    assert analyzer.last_update['changed_sections'] == [2, 6]
+    assert [n for n in after if after[n] != before[n]] == [2, 6] and len(after) == 9
+    _, unchanged, _ = run(guide, NO_CHANGES, lambda a: a.update(guide, [new_document], 'Artist'))
+    assert unchanged == guide
+    _, rewritten, analyzer = run('Whole new guide', 'Whole new guide', lambda a: a.update('Free-form notes', [new_document]))
+    assert analyzer.last_update['mode'] == 'full' and rewritten == 'Whole new guide'
+    print("Revised sections merged in place; NO CHANGES keeps the guide; unsectioned guides are rewritten")
+
+    corpus_tokens = sum(estimate_tokens(d['full_text']) for d in documents + [new_document])
+    print(f"{args.documents + 1} documents, ~{corpus_tokens:,} tokens; guide ~{estimate_tokens(guide):,} tokens")
+    print(f"Time modelled at {args.prefill_rate:,.0f} prompt and {args.output_rate:,.0f} output tokens/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = {
+            'full, one prompt': (run(guide, revised, lambda a: a.analyze(documents + [new_document], 'Artist'))[0], 1),
+            'full, map-reduce': (run(guide, revised, lambda a: a.analyze_map_reduce(
+                documents + [new_document], 'Artist', cache_dir=Path(tmp),
+            ))[0], DEFAULT_ANALYSIS_WORKERS),
+            'incremental update': (calls, 1),
+        }
+    results = {}
+    for label, (calls, parallel) in runs.items():
+        prompt = sum(c.prompt_tokens for c in calls)
+        output = sum(c.completion_tokens for c in calls)
+        seconds = modelled_seconds(calls, parallel, args.prefill_rate, args.output_rate)
+        results[label] = (prompt + output, seconds)
+        print(f"  {label:<19} {len(calls):>3} calls, {prompt:>8,} prompt + {output:>6,} output tokens, ~{seconds:5.1f}s")
+
+    tokens, seconds = results['incremental update']
+    for label in ('full, one prompt', 'full, map-reduce'):
+        print(f"Update vs {label}: {results[label][0] / tokens:.0f}x fewer tokens, "
+              f"{results[label][1] / seconds:.1f}x faster")
+    assert results['full, map-reduce'][0] > 10 * tokens
+
+
+if __name__ == '__main__':
+    main()
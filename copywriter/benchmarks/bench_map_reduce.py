@@ -0,0 +1,94 @@
+"""
+Benchmark: map-reduce style analysis with a fake OpenAI client.
+
+Each fake completion sleeps for a fixed latency, so wall time shows how
+analyze_map_reduce scales: with batches / concurrency rather than total
+corpus size. Also checks that a run with failing batches can be resumed
+from the notes cache, re-requesting only the failed batches, and that
+cached notes are not reused once the model changes.
+
+Usage:
+    python benchmarks/bench_map_reduce.py [--documents 120] [--latency 0.2]
+"""
+
+import argparse
+import tempfile
+import time
+
+from corpus import make_paragraphs
+from fake_openai import FakeCompletions, fake_client
+from src.corpus_assembler import estimate_tokens
+from src.generator_v2 import StyleAnalyzerV2
+from src.rate_limiter import RequestScheduler
+
+
+def make_analyzer(completions: FakeCompletions) -> StyleAnalyzerV2:
+    # No local rate limits: the fake client has none, and the shared
+    # scheduler's token budget would otherwise set the pace
+    analyzer = StyleAnalyzerV2(api_key='sk-fake', scheduler=RequestScheduler(0, 0))
+    analyzer.openai = fake_client(completions)
+    return analyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=120)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--batch-tokens', type=int, default=8000)
+    args = parser.parse_args()
+
+    documents = [
+        {'filename': f'Press Release {i:03d}.docx', 'full_text': '\n\n'.join(make_paragraphs(25, seed=i))}
+        for i in range(args.documents)
+    ]
+    tokens = sum(estimate_tokens(d['full_text']) for d in documents)
+    print(f"Corpus: {args.documents} documents, ~{tokens:,} tokens, {args.latency:.2f}s per request")
+
+    for workers in (1, 4, 8):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            fake = FakeCompletions(first_token_latency=args.latency)
+            analyzer = make_analyzer(fake)
+            start = time.perf_counter()
+            analyzer.analyze_map_reduce(
+                documents, 'Test Artist', batch_tokens=args.batch_tokens,
+                max_workers=workers, cache_dir=cache_dir,
+            )
+            elapsed = time.perf_counter() - start
+            report = analyzer.last_corpus_report
+            print(f"{workers} workers: {elapsed:5.2f}s for {report['batches']} batches + merge ({fake.calls} requests)")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Fail the batch that contains document 007
+        failing = FakeCompletions(fail_marker='Press Release 007')
+        try:
+            make_analyzer(failing).analyze_map_reduce(
+                documents, 'Test Artist', batch_tokens=args.batch_tokens, cache_dir=cache_dir,
+            )
+            raise AssertionError("expected the run to fail")
+        except RuntimeError as e:
+            print(f"First run failed as expected: {e}")
+
+        resumed = FakeCompletions()
+        analyzer = make_analyzer(resumed)
+        analyzer.analyze_map_reduce(
+            documents, 'Test Artist', batch_tokens=args.batch_tokens, cache_dir=cache_dir,
+        )
+        report = analyzer.last_corpus_report
+        assert report['cached_batches'] == report['batches'] - 1
+        assert resumed.calls == 2  # the failed batch and the merge
+        print(f"Resumed run: {report['cached_batches']}/{report['batches']} batches from cache, {resumed.calls} requests")
+
+        # Notes are keyed on the whole request, model included
+        other_model = FakeCompletions()
+        analyzer = make_analyzer(other_model)
+        notes_request = analyzer._notes_request
+        analyzer._notes_request = lambda *a: dict(notes_request(*a), model='gpt-4o-mini')
+        analyzer.analyze_map_reduce(
+            documents, 'Test Artist', batch_tokens=args.batch_tokens, cache_dir=cache_dir,
+        )
+        assert analyzer.last_corpus_report['cached_batches'] == 0
+        print("Changing the model re-requests every batch")
+
+
+if __name__ == '__main__':
+    main()
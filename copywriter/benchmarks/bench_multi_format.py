@@ -0,0 +1,96 @@
+"""
+Benchmark: several formats for one brief, sequential generate() calls vs
+CopyGeneratorV2.generate_formats().
+
+The fake client makes reply time proportional to reply length, so the
+longest format sets the concurrent wall time. Checks that each format
+sends the same request generate() would, that the concurrency limit holds,
+and that a failing format doesn't stop the others.
+
+Usage:
+    python benchmarks/bench_multi_format.py [--latency 0.5] [--per-token 0.01]
+"""
+
+import argparse
+import time
+
+from fake_openai import FakeAsyncClient, FakeAsyncCompletions, FakeCompletions, fake_client
+from src.generator_v2 import CopyGeneratorV2
+
+STYLE_GUIDE = "Write in short, confident sentences. Lead with the collection name."
+CONTEXT = "New collection of ceramic lamps inspired by coastal light."
+# Reply length (words) per format, roughly matching FORMAT_RULES
+FORMATS = {'press_release': 650, 'collection_overview': 300, 'bio': 200, 'paid_ads': 120}
+
+
+def brief(doc_type: str) -> str:
+    return f"Document type: {doc_type.replace('_', ' ')}\n\n{CONTEXT}"
+
+
+class SizedCompletions(FakeCompletions):
+    """Reply length depends on the doc type in the prompt."""
+
+    def _reply(self, prompt):
+        words = next(n for doc_type, n in FORMATS.items() if brief(doc_type) in prompt)
+        return [f" word{i}" for i in range(words)]
+
+
+class SizedAsyncCompletions(FakeAsyncCompletions):
+    _reply = SizedCompletions._reply
+
+
+def make_generator(sync, async_=None) -> CopyGeneratorV2:
+    generator = CopyGeneratorV2(api_key='sk-fake')
+    generator.openai = fake_client(sync)
+    generator._async_client = lambda: FakeAsyncClient(async_)
+    return generator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--per-token', type=float, default=0.01)
+    args = parser.parse_args()
+
+    briefs = {doc_type: brief(doc_type) for doc_type in FORMATS}
+
+    sync = SizedCompletions(args.latency, args.per_token)
+    concurrent = SizedAsyncCompletions(args.latency, args.per_token)
+    generator = make_generator(sync, concurrent)
+
+    start = time.perf_counter()
+    sequential = {doc_type: generator.generate(STYLE_GUIDE, doc_type, context) for doc_type, context in briefs.items()}
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    order, results = [], {}
+    for result in generator.generate_formats(STYLE_GUIDE, briefs, max_concurrency=len(briefs)):
+        order.append(result['doc_type'])
+        results[result['doc_type']] = result
+    concurrent_time = time.perf_counter() - start
+
+    assert {k: r['copy'] for k, r in results.items()} == sequential
+    assert sorted(map(repr, sync.requests)) == sorted(map(repr, concurrent.requests))
+    assert order[-1] == 'press_release'  # the longest reply arrives last
+    slowest = max(r['total_time'] for r in results.values())
+    print("Concurrent results and requests match sequential generate()")
+    print(f"{len(briefs)} formats: sequential {sequential_time:.2f}s, concurrent {concurrent_time:.2f}s "
+          f"(slowest single format {slowest:.2f}s)")
+    print(f"Completion order: {', '.join(order)}")
+
+    limited = SizedAsyncCompletions(args.latency, 0)
+    generator = make_generator(sync, limited)
+    list(generator.generate_formats(STYLE_GUIDE, briefs, max_concurrency=2))
+    assert limited.max_in_flight == 2
+    print(f"max_concurrency=2: at most {limited.max_in_flight} requests in flight")
+
+    failing = SizedAsyncCompletions(args.latency, 0, fail_marker=brief('bio'))
+    generator = make_generator(sync, failing)
+    results = {r['doc_type']: r for r in generator.generate_formats(STYLE_GUIDE, briefs)}
+    assert results['bio']['error'] and results['bio']['copy'] is None
+    assert all(r['copy'] for k, r in results.items() if k != 'bio')
+    print(f"Failing format reported without stopping the others: bio -> {results['bio']['error']}")
+
+
+if __name__ == '__main__':
+    main()
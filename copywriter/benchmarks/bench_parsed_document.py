@@ -0,0 +1,99 @@
+"""
+Benchmark: memory held by parsed documents, ParsedDocument vs plain dicts.
+
+Checks that ParsedDocument's lazy paragraphs, word count and chunks match
+the values the old dict stored, then measures with tracemalloc what a
+corpus of parsed documents keeps alive in each representation.
+
+Usage:
+    python benchmarks/bench_parsed_document.py [--documents 500]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from corpus import make_paragraph
+from src.document_parser import chunk_text, detect_document_type
+from src.parsed_document import ParsedDocument
+
+
+def legacy_document(filename: str, full_text: str) -> dict:
+    """The previous parse_document_bytes result, kept here as the baseline."""
+    return {
+        'filename': filename,
+        'doc_type': detect_document_type(filename),
+        'full_text': full_text,
+        'paragraphs': [p.strip() for p in full_text.split('\n\n') if p.strip()],
+        'word_count': len(full_text.split()),
+    }
+
+
+def make_texts(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        paragraphs = [make_paragraph(rng, rng.randint(20, 150)) for _ in range(rng.randint(5, 60))]
+        # Extracted text is not always tidy: stray blank lines and padding
+        if rng.random() < 0.3:
+            paragraphs.insert(rng.randrange(len(paragraphs)), '   ')
+        texts.append('\n\n'.join(f' {p} ' if rng.random() < 0.1 else p for p in paragraphs))
+    return texts
+
+
+def retained_bytes(build) -> tuple[int, list]:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    documents = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=500)
+    args = parser.parse_args()
+
+    texts = make_texts(args.documents)
+    names = [f'Press Release {i}.docx' for i in range(len(texts))]
+
+    for name, text in zip(names[:100], texts[:100]):
+        doc, old = ParsedDocument(name, detect_document_type(name), text), legacy_document(name, text)
+        assert dict(doc) == old
+        assert doc.chunks() == chunk_text(text) and doc.chunks(200, 0) == chunk_text(text, 200, 0)
+    print("Derived fields match the previous dict")
+
+    # Each representation gets its own copy of the text so it is counted
+    old_bytes, old_docs = retained_bytes(lambda: [
+        legacy_document(name, text.encode().decode()) for name, text in zip(names, texts)
+    ])
+    del old_docs
+    new_bytes, new_docs = retained_bytes(lambda: [
+        ParsedDocument(name, detect_document_type(name), text.encode().decode())
+        for name, text in zip(names, texts)
+    ])
+    # Touching paragraphs caches only their offsets on each document
+    spans_bytes, _ = retained_bytes(lambda: sum(len(doc.paragraphs) for doc in new_docs))
+    used_bytes = new_bytes + spans_bytes
+
+    text_mb = sum(map(len, texts)) / 1e6
+    print(f"Corpus: {args.documents} documents, {text_mb:.1f} MB of text")
+    print(f"dict (text + paragraphs):          {old_bytes / 1e6:6.1f} MB")
+    print(f"ParsedDocument (text only):        {new_bytes / 1e6:6.1f} MB ({new_bytes / old_bytes:.0%})")
+    print(f"ParsedDocument (paragraphs used):  {used_bytes / 1e6:6.1f} MB ({used_bytes / old_bytes:.0%})")
+
+    start = time.perf_counter()
+    for name, text in zip(names, texts):
+        legacy_document(name, text)
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for name, text in zip(names, texts):
+        ParsedDocument(name, detect_document_type(name), text)
+    new_time = time.perf_counter() - start
+    print(f"Build time: dict {old_time * 1000:.0f} ms, ParsedDocument {new_time * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
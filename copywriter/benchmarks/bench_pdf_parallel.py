@@ -0,0 +1,65 @@
+"""
+Benchmark: per-page parallel extraction of one large PDF.
+
+Checks that splitting the page range across processes gives exactly the
+serial text, then times both. The speedup tracks the number of free
+cores; on a single-core machine expect ~1x (or a little worse). Also
+checks that a PDF below the split threshold is opened only once.
+
+Usage:
+    python benchmarks/bench_pdf_parallel.py [--pages 200] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import make_pdf_pages
+from src import document_parser
+from src.document_parser import PDF_PARALLEL_MIN_PAGES, parse_pdf
+
+
+def timed(fn) -> tuple[float, str]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}, workers: {args.workers}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'catalogue.pdf'
+        path.write_bytes(make_pdf_pages(args.pages))
+
+        serial, serial_text = timed(lambda: parse_pdf(str(path), max_workers=1))
+        parallel, parallel_text = timed(
+            lambda: parse_pdf(str(path), max_workers=args.workers, parallel_min_pages=1)
+        )
+        assert parallel_text == serial_text
+        print(f"Parallel output matches serial ({len(serial_text) / 1e6:.1f} MB of text)")
+
+        print(f"Serial:   {serial:6.2f}s")
+        print(f"Parallel: {parallel:6.2f}s ({serial / parallel:.2f}x)")
+
+        # Below the threshold the page count and the text come from one open
+        small = make_pdf_pages(max(1, PDF_PARALLEL_MIN_PAGES // 4))
+        opens = []
+        real_open = document_parser.pdfplumber.open
+        document_parser.pdfplumber.open = lambda *a, **kw: opens.append(a) or real_open(*a, **kw)
+        try:
+            text = parse_pdf(small, max_workers=args.workers)
+        finally:
+            document_parser.pdfplumber.open = real_open
+        assert len(opens) == 1 and text == parse_pdf(small, max_workers=1)
+        print("A PDF below the split threshold is opened once")
+
+
+if __name__ == '__main__':
+    main()
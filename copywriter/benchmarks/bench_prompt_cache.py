@@ -0,0 +1,136 @@
+"""
+Benchmark: how much of each generate() prompt the provider's prefix cache
+can reuse, old single-message layout vs the layered one.
+
+Replays a day of requests for two artists (mixed formats, a new brief each
+time) through a fake client that simulates prompt caching (longest prefix
+shared with an earlier prompt, 128-token steps, 1,024-token minimum) and
+reports the cached tokens recorded in last_timing.
+
+Usage:
+    python benchmarks/bench_prompt_cache.py [--requests 40] [--guide-words 400 1000 2500]
+"""
+
+import argparse
+import random
+
+from corpus import make_paragraph
+from fake_openai import FakeCompletions, fake_client
+from src.generator_v2 import FORMAT_RULES, CopyGeneratorV2
+from src.rate_limiter import RequestScheduler
+
+FORMATS = ['press_release', 'collection_overview', 'bio', 'paid_ads']
+# gpt-4o bills cached input tokens at half price
+CACHED_INPUT_PRICE = 0.5
+
+
+def old_generate_request(style_guide: str, doc_type: str, context: str) -> dict:
+    """The previous generate() prompt (brief between style guide and format rules), kept as the baseline."""
+    format_rules = FORMAT_RULES.get(doc_type, FORMAT_RULES["general"])
+    prompt = f"""You are writing copy for Castle Fine Art gallery.
+
+Below is a STYLE GUIDE that describes HOW to write — the voice, tone, structure,
+cadence, and narrative devices to use. It was derived from previous documents about
+this artist.
+
+--- STYLE GUIDE (voice and structure rules only) ---
+{style_guide}
+--- END STYLE GUIDE ---
+
+Below is the USER BRIEF — this is the ONLY source of facts for the copy you write.
+Every specific detail (collection name, artwork titles, subjects depicted, prices,
+charity information, exhibition dates) must come from the brief below or from
+the attached images. Do NOT recycle specific facts, charity amounts, collection
+names, or event details from the style guide — those are from past campaigns.
+
+--- USER BRIEF ---
+{context}
+--- END USER BRIEF ---
+
+--- OUTPUT REQUIREMENTS (mandatory — do not ignore) ---
+{format_rules}
+--- END OUTPUT REQUIREMENTS ---
+
+Additional rules:
+1. Follow the style guide for voice, tone, and cadence
+2. Use ONLY facts from the user brief and images — do not invent details
+3. If key facts are missing, write around them with general language rather than placeholders or invented details
+4. Refer to the gallery as "Castle Fine Art" (never "Castle Galleries")
+5. Use British English throughout (colour, favour, centre, catalogue)
+6. No generic filler ("stunning", "amazing", "check out", "awesome")
+7. For pricing, use "priced at £X" or "available at £X" (only if prices are in the brief)
+8. If the output reads like a short marketing blurb, it is wrong — expand with narrative detail
+
+Write now."""
+    return dict(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": [{"type": "text", "text": prompt}]}],
+        temperature=0.7,
+        max_tokens=4000,
+    )
+
+
+def make_workload(count: int, guide_words: int, seed: int = 0) -> list[tuple[str, str, str]]:
+    """(artist, doc_type, brief) requests and each artist's style guide."""
+    rng = random.Random(seed)
+    guides = {artist: make_paragraph(rng, guide_words) for artist in ('Artist A', 'Artist B')}
+    requests = []
+    for i in range(count):
+        artist = rng.choice(list(guides))
+        brief = f"Document type: brief {i}\n\n" + make_paragraph(rng, rng.randint(40, 120))
+        requests.append((artist, rng.choice(FORMATS), brief))
+    return guides, requests
+
+
+def replay(generator: CopyGeneratorV2, build, guides: dict, requests: list) -> dict:
+    totals = {}
+    for artist, doc_type, brief in requests:
+        request = build(guides[artist], doc_type, brief)
+        generator._cached_complete(request, True, 'generate', doc_type)
+        per_artist = totals.setdefault(artist, {'prompt_tokens': 0, 'cached_tokens': 0})
+        per_artist['prompt_tokens'] += generator.last_timing['prompt_tokens']
+        per_artist['cached_tokens'] += generator.last_timing['cached_tokens']
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--guide-words', type=int, nargs='+', default=[400, 1000, 2500])
+    args = parser.parse_args()
+
+    # Layout: instructions, style guide, format rules, brief, images
+    request = CopyGeneratorV2('sk-fake')._generate_request('<guide>', 'bio', '<brief>', [{'bytes': b'img'}])
+    system, user = request['messages']
+    assert system['role'] == 'system' and '<guide>' not in system['content']
+    texts = [part.get('text', '') for part in user['content']]
+    assert texts[0].index('<guide>') < texts[0].index('OUTPUT REQUIREMENTS') and '<brief>' in texts[1]
+    assert user['content'][-1]['type'] == 'image_url'
+    print("Layered prompt: instructions, style guide, format rules, then brief and images")
+
+    print(f"{args.requests} requests for 2 artists, 4 formats; share of prompt tokens cached "
+          f"(billed-equivalent input tokens, cached at {CACHED_INPUT_PRICE:.0%} price)")
+    for guide_words in args.guide_words:
+        guides, requests = make_workload(args.requests, guide_words)
+        results = {}
+        for label, build in (
+            ('old', old_generate_request),
+            ('layered', lambda guide, doc_type, brief: generator._generate_request(guide, doc_type, brief, None)),
+        ):
+            generator = CopyGeneratorV2(api_key='sk-fake', scheduler=RequestScheduler(0, 0))
+            generator.openai = fake_client(FakeCompletions())
+            results[label] = replay(generator, build, guides, requests)
+
+        line = []
+        for label, totals in results.items():
+            prompt = sum(t['prompt_tokens'] for t in totals.values())
+            cached = sum(t['cached_tokens'] for t in totals.values())
+            billed = prompt - cached * (1 - CACHED_INPUT_PRICE)
+            line.append(f"{label} {cached / prompt:5.1%} ({billed:,.0f})")
+        assert (sum(t['cached_tokens'] for t in results['layered'].values())
+                > sum(t['cached_tokens'] for t in results['old'].values()))
+        print(f"  ~{guide_words:>4}-word style guide: " + ", ".join(line))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmark: OpenAI calls against a local server with a simulated rate limit.
+
+Runs the same burst of generate() calls from several threads:
+- bare client without retries (429s reach the user)
+- bare client with the SDK's built-in retries
+- through a RequestScheduler whose limit matches the server's
+- through a RequestScheduler with no local limit, relying on Retry-After
+Then checks fairness: a writer's few requests are not stuck behind
+another session's large batch, that a long Retry-After pauses
+admissions for that long without leaving them spaced out afterwards,
+that streamed calls give back unused tokens from their final usage
+chunk and that a cancelled async call gives up its place in the queue.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py [--rpm 600] [--requests 60] [--threads 8]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from fake_openai import FakeCompletions, FakeOpenAIServer, fake_client
+from openai import OpenAI, RateLimitError
+from src.generator_v2 import CopyGeneratorV2
+from src.rate_limiter import (
+    BURST_SECONDS,
+    SPACING_HALF_LIFE,
+    SPACING_MAX,
+    RequestScheduler,
+    _Ticket,
+    estimate_request_tokens,
+)
+
+STYLE_GUIDE = "Write in short, confident sentences. Lead with the collection name."
+
+
+def make_server(rpm: int) -> FakeOpenAIServer:
+    # The server allows the same short-window burst the scheduler assumes
+    return FakeOpenAIServer(rpm, burst=max(1, round(rpm / 60 * BURST_SECONDS)), latency=0.05)
+
+
+def make_generator(server, scheduler, session='default') -> CopyGeneratorV2:
+    generator = CopyGeneratorV2(api_key='sk-fake', scheduler=scheduler, session_id=session)
+    generator.openai = OpenAI(api_key='sk-fake', base_url=server.base_url, max_retries=0)
+    return generator
+
+
+def burst(call, requests: int, threads: int) -> tuple[int, int, float]:
+    """Run call() requests times; returns (succeeded, failed, seconds)."""
+    def one(_):
+        try:
+            call()
+            return True
+        except RateLimitError:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(requests)))
+    return sum(results), len(results) - sum(results), time.perf_counter() - start
+
+
+def bare(server, retries):
+    client = OpenAI(api_key='sk-fake', base_url=server.base_url, max_retries=retries)
+    request = make_generator(server, RequestScheduler(0, 0))._generate_request(STYLE_GUIDE, 'bio', 'Brief', None)
+    return lambda: client.chat.completions.create(**request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rpm', type=int, default=600)
+    parser.add_argument('--requests', type=int, default=60)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"Server limit {args.rpm} requests/minute; {args.requests} requests from {args.threads} threads")
+
+    runs = [
+        ("bare client, no retries", lambda server: (bare(server, 0), None)),
+        ("bare client, SDK retries (2)", lambda server: (bare(server, 2), None)),
+    ]
+    for label, setup in runs:
+        with make_server(args.rpm) as server:
+            call, _ = setup(server)
+            ok, failed, elapsed = burst(call, args.requests, args.threads)
+            print(f"{label:<34} {ok:3d} ok, {failed:3d} failed, {server.rejected:3d} 429s, {elapsed:5.2f}s")
+
+    for label, scheduler in (
+        ("scheduler, limit matches server", RequestScheduler(args.rpm, 0)),
+        ("scheduler, Retry-After only", RequestScheduler(0, 0)),
+    ):
+        with make_server(args.rpm) as server:
+            generator = make_generator(server, scheduler)
+            call = lambda: generator.generate(STYLE_GUIDE, 'bio', 'Brief')
+            ok, failed, elapsed = burst(call, args.requests, args.threads)
+            assert failed == 0
+            stats = scheduler.stats()
+            print(f"{label:<34} {ok:3d} ok, {failed:3d} failed, {server.rejected:3d} 429s, {elapsed:5.2f}s "
+                  f"({stats['retries']} retries)")
+
+    # Fairness: a batch session floods the queue, a writer sends a few requests
+    fair = writer_latency(args, writer_session='writer')
+    fifo = writer_latency(args, writer_session='batch')  # one queue: arrival order
+    assert fair < fifo
+    print(f"Writer latency during a {args.requests}-request batch: {fair:.2f}s with per-session queues, "
+          f"{fifo:.2f}s in arrival order")
+
+    check_spacing()
+    check_stream_settle()
+    check_cancelled_admission()
+
+
+def check_spacing():
+    """Repeated 429s with Retry-After: 60 cap the admission gap, which then decays with time."""
+    scheduler = RequestScheduler(0, 0)
+    response = httpx.Response(429, headers={'retry-after': '60'}, request=httpx.Request('POST', 'http://x'))
+    error = RateLimitError('rate limited', response=response, body=None)
+    for attempt in range(10):
+        assert scheduler._retry_delay(error, attempt) >= 60
+    now = time.monotonic()
+    assert scheduler._current_spacing(now) <= SPACING_MAX
+    assert scheduler._current_spacing(now + 4 * SPACING_HALF_LIFE) <= SPACING_MAX / 16
+    print(f"After ten 429s with Retry-After 60s: admissions {SPACING_MAX:.1f}s apart at most, "
+          f"halving every {SPACING_HALF_LIFE:.0f}s")
+
+
+def check_stream_settle():
+    """A streamed call holds only its real token total once the stream ends."""
+    scheduler = RequestScheduler(0, 6_000_000)
+    scheduler.tokens.rate = 1e-9  # no refill, so the level shows what is still held
+    generator = CopyGeneratorV2('sk-fake', scheduler=scheduler)
+    generator.openai = fake_client(FakeCompletions())
+    reserved = estimate_request_tokens(generator._generate_request(STYLE_GUIDE, 'bio', 'Brief', None))
+    ''.join(generator.generate_stream(STYLE_GUIDE, 'bio', 'Brief'))
+    held = scheduler.tokens.capacity - scheduler.tokens.level
+    used = generator.last_timing['prompt_tokens'] + generator.last_timing['completion_tokens']
+    assert abs(held - used) < 1 and used < reserved
+    print(f"Streamed generate: {reserved:,} tokens reserved, {held:,.0f} held after the stream (its real usage)")
+
+
+def check_cancelled_admission():
+    """A cancelled acall() leaves the queue; one admitted as it is cancelled is refunded."""
+    scheduler = RequestScheduler(60, 0)  # bucket of 2 requests, one more a second
+
+    async def cancel_while_queued():
+        for _ in range(2):
+            await scheduler.acall(asyncio.sleep, 0)
+        task = asyncio.ensure_future(scheduler.acall(asyncio.sleep, 0))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(1.5)  # past the refill the cancelled call was waiting for
+
+    asyncio.run(cancel_while_queued())
+    stats = scheduler.stats()
+    assert stats['admitted'] == 2 and stats['waiting'] == 0
+    assert scheduler.requests.wait_time(1, time.monotonic()) == 0
+
+    scheduler = RequestScheduler(0, 600_000)
+    ticket = _Ticket()
+    scheduler._admit('default', 5000, ticket)
+    scheduler._withdraw(ticket, 5000)
+    assert scheduler.tokens.level == scheduler.tokens.capacity
+    print("A cancelled async call leaves the queue without being admitted, or is refunded if admitted")
+
+
+def writer_latency(args, writer_session: str) -> float:
+    """Mean latency of 5 writer requests sent while a batch is queued."""
+    with make_server(args.rpm) as server:
+        scheduler = RequestScheduler(args.rpm, 0)
+        batch = make_generator(server, scheduler, session='batch')
+        writer = make_generator(server, scheduler, session=writer_session)
+        batch_thread = threading.Thread(
+            target=burst, args=(lambda: batch.generate(STYLE_GUIDE, 'bio', 'Batch'), args.requests, args.threads),
+        )
+        batch_thread.start()
+        time.sleep(0.5)
+        latencies = []
+        for _ in range(5):
+            start = time.perf_counter()
+            writer.generate(STYLE_GUIDE, 'bio', 'Writer brief')
+            latencies.append(time.perf_counter() - start)
+        batch_thread.join()
+    return sum(latencies) / len(latencies)
+
+
+if __name__ == '__main__':
+    main()
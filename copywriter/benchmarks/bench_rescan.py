@@ -0,0 +1,81 @@
+"""
+Benchmark: incremental directory rescan with rescan_documents.
+
+Builds an archive of small documents, syncs it once, then times a re-sync
+with no changes and one after a few edits, additions and deletions. Also
+checks that after a parser version bump every file is re-parsed and files
+deleted since are dropped from the store.
+
+Usage:
+    python benchmarks/bench_rescan.py [--files 1000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import make_html, make_paragraphs
+from src import document_parser
+from src.document_parser import load_processed_documents, rescan_documents
+
+
+def timed_rescan(directory: Path, cache_dir: Path) -> tuple[float, dict]:
+    start = time.perf_counter()
+    result = rescan_documents(str(directory), str(cache_dir))
+    return time.perf_counter() - start, result
+
+
+def summary(result: dict) -> str:
+    return ', '.join(
+        f"{len(result[key])} {key}" for key in ('new', 'changed', 'unchanged', 'deleted')
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive, cache_dir = Path(tmp) / 'archive', Path(tmp) / 'cache'
+        archive.mkdir()
+        for i in range(args.files):
+            page = make_html(make_paragraphs(30, seed=i))
+            (archive / f'Press Release {i:04d}.html').write_bytes(page)
+
+        elapsed, result = timed_rescan(archive, cache_dir)
+        print(f"Initial sync:     {elapsed:6.2f}s ({summary(result)})")
+
+        elapsed, result = timed_rescan(archive, cache_dir)
+        print(f"No-change resync: {elapsed:6.2f}s ({summary(result)})")
+        assert len(result['unchanged']) == args.files
+
+        for i in range(5):
+            path = archive / f'Press Release {i:04d}.html'
+            path.write_bytes(path.read_bytes() + b'<p>Updated.</p>')
+        for i in range(5, 7):
+            (archive / f'Press Release {i:04d}.html').unlink()
+        (archive / 'New Bio.html').write_bytes(make_html(make_paragraphs(30, seed=-1)))
+
+        elapsed, result = timed_rescan(archive, cache_dir)
+        print(f"Edited resync:    {elapsed:6.2f}s ({summary(result)})")
+        assert (len(result['new']), len(result['changed']), len(result['deleted'])) == (1, 5, 2)
+
+        # After a parser version bump, old rows read as changed or deleted
+        for i in range(7, 9):
+            (archive / f'Press Release {i:04d}.html').unlink()
+        remaining = len(list(archive.iterdir()))
+        version = document_parser.PARSER_VERSION
+        document_parser.PARSER_VERSION = version + '-next'
+        try:
+            elapsed, result = timed_rescan(archive, cache_dir)
+        finally:
+            document_parser.PARSER_VERSION = version
+        print(f"Parser bump:      {elapsed:6.2f}s ({summary(result)})")
+        assert (len(result['changed']), len(result['deleted'])) == (remaining, 2)
+        assert len(load_processed_documents(str(cache_dir))) == remaining
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: CopyGeneratorV2 with and without a ResponseCache.
+
+Replays a workload of briefs where some are repeated (regenerate clicks,
+the same brief sent twice) against a fake client with a fixed completion
+time. Checks that the cache key changes with the prompt, style guide,
+images and sampling settings, that fresh= bypasses the lookup, and that
+TTL expiry and LRU eviction work.
+
+Usage:
+    python benchmarks/bench_response_cache.py [--requests 40] [--repeat 0.4] [--latency 0.3]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from fake_openai import FakeCompletions, fake_client
+from src.generator_v2 import CopyGeneratorV2
+from src.response_cache import ResponseCache, request_key
+
+STYLE_GUIDE = "Write in short, confident sentences. Lead with the collection name."
+
+
+def make_generator(completions, cache=None) -> CopyGeneratorV2:
+    generator = CopyGeneratorV2(api_key='sk-fake', response_cache=cache)
+    generator.openai = fake_client(completions)
+    return generator
+
+
+def check_keys(generator: CopyGeneratorV2):
+    base = generator._generate_request(STYLE_GUIDE, 'bio', 'Brief', [{'bytes': b'img-1'}])
+    variants = [
+        generator._generate_request(STYLE_GUIDE + ' ', 'bio', 'Brief', [{'bytes': b'img-1'}]),
+        generator._generate_request(STYLE_GUIDE, 'press_release', 'Brief', [{'bytes': b'img-1'}]),
+        generator._generate_request(STYLE_GUIDE, 'bio', 'Brief.', [{'bytes': b'img-1'}]),
+        generator._generate_request(STYLE_GUIDE, 'bio', 'Brief', [{'bytes': b'img-2'}]),
+        generator._generate_request(STYLE_GUIDE, 'bio', 'Brief', []),
+        dict(base, temperature=0.2),
+        dict(base, model='gpt-4o-mini'),
+    ]
+    same = generator._generate_request(STYLE_GUIDE, 'bio', 'Brief', [{'bytes': b'img-1'}])
+    assert request_key(same) == request_key(base)
+    keys = {request_key(base)} | {request_key(v) for v in variants}
+    assert len(keys) == len(variants) + 1
+    print("Cache key changes with style guide, format, brief, images, temperature and model")
+
+
+def run_workload(generator: CopyGeneratorV2, briefs: list[str]) -> float:
+    start = time.perf_counter()
+    for brief in briefs:
+        generator.generate(STYLE_GUIDE, 'press_release', brief)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--repeat', type=float, default=0.4, help="share of requests that repeat an earlier brief")
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    briefs = []
+    for i in range(args.requests):
+        if briefs and rng.random() < args.repeat:
+            briefs.append(rng.choice(briefs))
+        else:
+            briefs.append(f"Brief {i}: new collection of harbour scenes.")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(Path(tmp) / 'responses.db')
+        check_keys(make_generator(FakeCompletions(), cache))
+
+        uncached = FakeCompletions(args.latency)
+        plain_time = run_workload(make_generator(uncached), briefs)
+
+        cached = FakeCompletions(args.latency)
+        generator = make_generator(cached, cache)
+        cached_time = run_workload(generator, briefs)
+        stats = cache.stats()
+
+        assert cached.calls == len(set(briefs))
+        assert stats['hits'] == len(briefs) - len(set(briefs))
+        print(f"{len(briefs)} requests, {len(set(briefs))} distinct, {args.latency:.2f}s per completion")
+        print(f"No cache:   {plain_time:5.2f}s, {uncached.calls} completions")
+        print(f"With cache: {cached_time:5.2f}s, {cached.calls} completions, "
+              f"hit rate {stats['hit_rate']:.0%}, {stats['saved_seconds']:.1f}s of completion time saved")
+
+        # Streaming shares the cache: a cached brief arrives as one delta
+        deltas = list(generator.generate_stream(STYLE_GUIDE, 'press_release', briefs[0]))
+        assert len(deltas) == 1 and generator.last_timing['cached']
+        assert deltas[0] == generator.generate(STYLE_GUIDE, 'press_release', briefs[0])
+
+        # fresh= skips the lookup but stores the new variant
+        calls = cached.calls
+        generator.generate(STYLE_GUIDE, 'press_release', briefs[0], fresh=True)
+        assert cached.calls == calls + 1 and not generator.last_timing['cached']
+        print("Streaming hits the same cache; fresh=True requests a new completion")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        completions = FakeCompletions()
+        small = ResponseCache(Path(tmp) / 'responses.db', max_entries=3)
+        generator = make_generator(completions, small)
+        for brief in ('a', 'b', 'c'):
+            generator.generate(STYLE_GUIDE, 'bio', brief)
+        generator.generate(STYLE_GUIDE, 'bio', 'a')  # a is now most recently used
+        generator.generate(STYLE_GUIDE, 'bio', 'd')  # evicts b
+        assert small.stats()['entries'] == 3
+        calls = completions.calls
+        generator.generate(STYLE_GUIDE, 'bio', 'a')
+        assert completions.calls == calls
+        generator.generate(STYLE_GUIDE, 'bio', 'b')
+        assert completions.calls == calls + 1
+        print("LRU eviction keeps the most recently used entries")
+
+        small.ttl_seconds = 0
+        time.sleep(0.01)
+        calls = completions.calls
+        generator.generate(STYLE_GUIDE, 'bio', 'a')
+        assert completions.calls == calls + 1
+        print("Expired entries are regenerated")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: time to first visible text, generate() vs generate_stream().
+
+Uses a fake client whose replies take a fixed time to start and then a
+fixed time per token, like a real completion. Checks that the streamed
+deltas join to exactly what generate() returns and that both send the
+same request (apart from stream=True).
+
+Usage:
+    python benchmarks/bench_streaming.py [--first-token 0.5] [--per-token 0.02] [--words 300]
+"""
+
+import argparse
+import time
+
+from fake_openai import FakeCompletions, fake_client
+from src.generator_v2 import CopyGeneratorV2
+
+STYLE_GUIDE = "Write in short, confident sentences. Lead with the collection name."
+CONTEXT = "New collection of ceramic lamps inspired by coastal light."
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--first-token', type=float, default=0.5)
+    parser.add_argument('--per-token', type=float, default=0.02)
+    parser.add_argument('--words', type=int, default=300)
+    args = parser.parse_args()
+
+    fake = FakeCompletions(args.first_token, args.per_token, reply_words=args.words)
+    generator = CopyGeneratorV2(api_key='sk-fake')
+    generator.openai = fake_client(fake)
+
+    start = time.perf_counter()
+    text = generator.generate(STYLE_GUIDE, 'press_release', CONTEXT)
+    plain = dict(generator.last_timing)
+    plain_total = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_seen = None
+    deltas = []
+    for delta in generator.generate_stream(STYLE_GUIDE, 'press_release', CONTEXT):
+        if first_seen is None:
+            first_seen = time.perf_counter() - start
+        deltas.append(delta)
+    streamed = dict(generator.last_timing)
+    stream_total = time.perf_counter() - start
+
+    assert ''.join(deltas).strip() == text
+    assert fake.requests[0] == fake.requests[1]
+    assert streamed['chars'] == len(''.join(deltas))
+    print("Streamed text and request match generate()")
+
+    print(f"Reply: {args.words} words, {args.first_token:.2f}s to first token, {args.per_token * 1000:.0f} ms per token")
+    print(f"generate():        first text after {plain['time_to_first_token']:.2f}s, done after {plain_total:.2f}s")
+    print(f"generate_stream(): first text after {first_seen:.2f}s, done after {stream_total:.2f}s")
+    print(f"Recorded timing:   {streamed['time_to_first_token']:.2f}s to first token, {streamed['total_time']:.2f}s total")
+
+
+if __name__ == '__main__':
+    main()
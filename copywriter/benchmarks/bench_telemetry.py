@@ -0,0 +1,178 @@
+"""
+Benchmark: per-call telemetry (src.telemetry) around generator_v2.
+
+Checks that each kind of call is recorded with the right operation,
+doc_type, tokens, time to first token, latency and retries (retries come
+from a local server that returns 429s), that failed and abandoned calls
+are recorded too, and that records round-trip through local_storage.
+Then measures what recording adds to a call, writing each record on its
+own versus one batch per generate_formats() run.
+
+Usage:
+    python benchmarks/bench_telemetry.py [--calls 200]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from fake_openai import FakeAsyncClient, FakeAsyncCompletions, FakeCompletions, FakeOpenAIServer, fake_client
+from openai import OpenAI
+from src.generator_v2 import CopyGeneratorV2, StyleAnalyzerV2
+from src.rate_limiter import RequestScheduler
+from src.telemetry import CallRecorder, summarize_calls
+
+import local_storage
+
+STYLE_GUIDE = "Write in short, confident sentences. Lead with the collection name."
+
+
+class ListSink:
+    """Sink that keeps records and counts writes."""
+
+    def __init__(self):
+        self.records, self.writes = [], 0
+
+    def __call__(self, records):
+        self.records.extend(records)
+        self.writes += 1
+
+
+def without_id(record: dict) -> dict:
+    return {k: v for k, v in record.items() if k != 'id'}
+
+
+def make_generator(completions, telemetry, scheduler=None) -> CopyGeneratorV2:
+    generator = CopyGeneratorV2(
+        api_key='sk-fake', scheduler=scheduler or RequestScheduler(0, 0), telemetry=telemetry,
+    )
+    generator.openai = fake_client(completions)
+    return generator
+
+
+def check_records():
+    sink = ListSink()
+    recorder = CallRecorder(sink, artist_id='artist-1')
+
+    # Streamed generate: time to first token and tokens from the usage chunk
+    generator = make_generator(FakeCompletions(0.2, 0.01, fail_marker='FAIL'), recorder)
+    ''.join(generator.generate_stream(STYLE_GUIDE, 'bio', 'New harbour scenes'))
+    record = sink.records[-1]
+    assert record['operation'] == 'generate' and record['doc_type'] == 'bio' and record['streamed']
+    assert record['artist_id'] == 'artist-1' and record['model'] == 'gpt-4o'
+    assert 0.19 < record['time_to_first_token'] < record['total_time']
+    assert record['prompt_tokens'] == generator.last_timing['prompt_tokens'] and record['completion_tokens'] == 20
+    assert record['cost_usd'] > 0 and record['retries'] == 0
+
+    # A failure and a stream abandoned after its first delta
+    try:
+        generator.generate(STYLE_GUIDE, 'bio', 'FAIL')
+    except ConnectionError:
+        pass
+    assert sink.records[-1]['status'] == 'error' and 'simulated' in sink.records[-1]['error']
+    stream = generator.generate_with_conversation_stream(STYLE_GUIDE, 'A short bio')
+    next(stream)
+    stream.close()
+    assert sink.records[-1]['status'] == 'cancelled' and sink.records[-1]['operation'] == 'conversation'
+
+    # Several formats: one record each, written together
+    writes = sink.writes
+    generator._async_client = lambda: FakeAsyncClient(FakeAsyncCompletions(0.05))
+    results = list(generator.generate_formats(STYLE_GUIDE, {t: 'Brief' for t in ('bio', 'paid_ads', 'press_release')}))
+    assert sink.writes == writes + 1
+    assert {r['doc_type'] for r in sink.records[-3:]} == {r['doc_type'] for r in results}
+    assert all(r['prompt_tokens'] for r in sink.records[-3:])
+
+    # Map-reduce analysis: one record per batch of notes, plus the merge
+    analyzer = StyleAnalyzerV2('sk-fake', scheduler=RequestScheduler(0, 0), telemetry=recorder)
+    analyzer.openai = fake_client(FakeCompletions())
+    documents = [{'filename': f'doc{i}.docx', 'full_text': f'Paragraph {i}. ' * 400} for i in range(6)]
+    with tempfile.TemporaryDirectory() as tmp:
+        before = len(sink.records)
+        analyzer.analyze_map_reduce(documents, 'Artist', batch_tokens=1000, cache_dir=Path(tmp))
+    operations = [r['operation'] for r in sink.records[before:]]
+    assert operations[-1] == 'analyze_merge' and operations.count('analyze_notes') == len(operations) - 1
+    print(f"Recorded generate (streamed, failed, abandoned), {len(results)} formats in one write, "
+          f"and {len(operations) - 1} map-reduce batches plus the merge")
+
+    # Retries: a server allowing 2 requests a second, with no local limit
+    with FakeOpenAIServer(120, burst=1, latency=0.02) as server:
+        retry_sink = ListSink()
+        generator = CopyGeneratorV2(
+            'sk-fake', scheduler=RequestScheduler(0, 0), telemetry=CallRecorder(retry_sink),
+        )
+        generator.openai = OpenAI(api_key='sk-fake', base_url=server.base_url, max_retries=0)
+        for _ in range(3):
+            generator.generate(STYLE_GUIDE, 'bio', 'Brief')
+        retries = [r['retries'] for r in retry_sink.records]
+        assert sum(retries) == server.rejected and server.rejected > 0
+    print(f"Retries recorded per call: {retries} ({server.rejected} 429s from the server)")
+
+    summary = summarize_calls(sink.records, ('operation', 'doc_type'))
+    assert sum(row['calls'] for row in summary) == len(sink.records)
+    return sink.records
+
+
+def check_storage(records: list[dict]):
+    with tempfile.TemporaryDirectory() as tmp:
+        local_storage._BASE = Path(tmp)
+        local_storage._DB_PATH = Path(tmp) / 'copywriter.db'
+        local_storage._FILES_DIR = Path(tmp) / 'storage'
+        artist = local_storage.create_artist('Test Artist')
+        local_storage.save_llm_calls([dict(r, artist_id=artist['id']) for r in records])
+        saved = local_storage.get_llm_calls()
+        assert len(saved) == len(records)
+        assert summarize_calls(saved, ('artist_id',))[0]['calls'] == len(records)
+        since = local_storage.get_llm_calls(since=max(r['created_at'] for r in records))
+        assert 1 <= len(since) < len(records)
+    print(f"{len(records)} records saved to and read back from local_storage")
+
+
+def time_overhead(calls: int):
+    def run(telemetry) -> float:
+        generator = make_generator(FakeCompletions(), telemetry)
+        start = time.perf_counter()
+        for i in range(calls):
+            generator.generate(STYLE_GUIDE, 'bio', f'Brief {i}')
+        return (time.perf_counter() - start) / calls
+
+    with tempfile.TemporaryDirectory() as tmp:
+        local_storage._BASE = Path(tmp)
+        local_storage._DB_PATH = Path(tmp) / 'copywriter.db'
+        local_storage._FILES_DIR = Path(tmp) / 'storage'
+        local_storage.get_llm_calls()  # create the schema outside the timings
+
+        bare = run(None)
+        buffered = run(CallRecorder(lambda records: None))
+        stored = run(CallRecorder(local_storage.save_llm_calls))
+
+        # The same records written one by one versus in one batch
+        records = local_storage.get_llm_calls(limit=calls)
+        start = time.perf_counter()
+        for record in records:
+            local_storage.save_llm_calls([without_id(record)])
+        one_by_one = (time.perf_counter() - start) / len(records)
+        start = time.perf_counter()
+        local_storage.save_llm_calls([without_id(record) for record in records])
+        batched = (time.perf_counter() - start) / len(records)
+
+    print(f"Per call ({calls} calls, instant fake completions):")
+    print(f"  no telemetry:        {bare * 1e3:6.2f} ms")
+    print(f"  recording only:      {buffered * 1e3:6.2f} ms ({(buffered - bare) * 1e3:+.2f} ms)")
+    print(f"  saved to SQLite:     {stored * 1e3:6.2f} ms ({(stored - bare) * 1e3:+.2f} ms)")
+    print(f"Writing a record: {one_by_one * 1e3:.2f} ms alone, {batched * 1e3:.3f} ms in a batch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    records = check_records()
+    check_storage(records)
+    time_overhead(args.calls)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Synthetic corpus helpers for the benchmarks.
+Builds gallery-flavoured DOCX, PDF and HTML documents of a chosen size.
+"""
+
+import random
+import struct
+import sys
+from io import BytesIO
+from pathlib import Path
+
+# Make `src` importable when a benchmark is run as a plain script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from docx import Document
+
+WORDS = (
+    "light shadow canvas harbour evening memory colour texture brushwork gallery "
+    "collection edition city street legacy atmosphere quiet figure bronze studio "
+    "landscape rain glow heritage narrative moment crowd river smoke iron warmth "
+    "linen ochre charcoal dusk horizon craft layered portrait signature limited"
+).split()
+
+
+def make_paragraph(rng: random.Random, words: int = 60) -> str:
+    """One paragraph of pseudo-prose, sentence-cased with full stops."""
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        n = min(remaining, rng.randint(8, 18))
+        sentence = ' '.join(rng.choice(WORDS) for _ in range(n))
+        sentences.append(sentence.capitalize() + '.')
+        remaining -= n
+    return ' '.join(sentences)
+
+
+def make_paragraphs(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [make_paragraph(rng) for _ in range(count)]
+
+
+def make_docx(paragraphs: list[str]) -> bytes:
+    """Build a DOCX with a heading and one Word paragraph per entry."""
+    doc = Document()
+    doc.add_heading('Collection Press Release', level=1)
+    for para in paragraphs:
+        doc.add_paragraph(para)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_html(paragraphs: list[str]) -> bytes:
+    """Build a saved-web-page style HTML document with scripts and styles."""
+    parts = [
+        '<!DOCTYPE html><html><head><title>Gallery</title>',
+        '<style>body { font-family: serif; } p { margin: 0 }</style>',
+        '<script>window.dataLayer = [{"event": "page <view>"}];</script>',
+        '</head><body><nav><ul><li><a href="/">Home</a></li>',
+        '<li><a href="/artists">Artists</a></li></ul></nav><article>',
+        '<h1>Collection &amp; Story</h1>',
+    ]
+    for i, para in enumerate(paragraphs):
+        if i % 7 == 0:
+            parts.append(f'<h2>Chapter {i // 7 + 1}</h2>')
+        parts.append(f'<p class="body">{para} &ldquo;<em>Quoted</em>&rdquo;</p>\n')
+        if i % 11 == 0:
+            parts.append('<script type="text/javascript">track("scroll");</script>')
+    parts.append('</article><footer><div>&copy; Castle Fine Art</div></footer></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    """
+    Build a minimal text PDF. Each page is a list of lines (~90 chars each
+    fit on a line at 10pt Helvetica).
+    """
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+    pages_id = add(b'')  # placeholder, filled once the kids are known
+    page_ids = []
+
+    for lines in pages:
+        stream_lines = ['BT', '/F1 10 Tf', '12 TL', '40 800 Td']
+        for line in lines:
+            stream_lines.append(f'({_pdf_escape(line)}) Tj T*')
+        stream_lines.append('ET')
+        stream = '\n'.join(stream_lines).encode('latin-1')
+        content_id = add(
+            b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n'
+            + stream + b'\nendstream'
+        )
+        page_ids.append(add(
+            f'<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 595 842] '
+            f'/Resources << /Font << /F1 {font_id} 0 R >> >> '
+            f'/Contents {content_id} 0 R >>'.encode()
+        ))
+
+    kids = ' '.join(f'{i} 0 R' for i in page_ids)
+    objects[pages_id - 1] = f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode()
+    catalog_id = add(f'<< /Type /Catalog /Pages {pages_id} 0 R >>'.encode())
+
+    out = BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f'{number} 0 obj\n'.encode() + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode())
+    for offset in offsets:
+        out.write(f'{offset:010d} 00000 n \n'.encode())
+    out.write(
+        f'trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\n'
+        f'startxref\n{xref}\n%%EOF\n'.encode()
+    )
+    return out.getvalue()
+
+
+def make_pdf_pages(page_count: int, lines_per_page: int = 60, seed: int = 0) -> bytes:
+    """A PDF of page_count pages filled with wrapped pseudo-prose."""
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(page_count):
+        lines = []
+        while len(lines) < lines_per_page:
+            words = make_paragraph(rng, 120).split()
+            line = []
+            for word in words:
+                line.append(word)
+                if len(' '.join(line)) > 85:
+                    lines.append(' '.join(line))
+                    line = []
+            if line:
+                lines.append(' '.join(line))
+        pages.append(lines[:lines_per_page])
+    return make_pdf(pages)
+
+
+def _ole_entry(name: str, entry_type: int, start: int = 0xFFFFFFFE, size: int = 0,
+               right: int = 0xFFFFFFFF, child: int = 0xFFFFFFFF) -> bytes:
+    encoded = (name + '\0').encode('utf-16-le') if name else b''
+    entry = bytearray(128)
+    entry[:len(encoded)] = encoded
+    struct.pack_into('<HBBIII', entry, 64, len(encoded), entry_type, 1,
+                     0xFFFFFFFF, right, child)
+    struct.pack_into('<III', entry, 116, start, size, 0)
+    return bytes(entry)
+
+
+def make_doc(paragraphs: list[str]) -> bytes:
+    """
+    Build a minimal Word 97 .doc: an OLE2 container holding a WordDocument
+    stream (FIB + text) and a 1Table stream with a single-piece Clx.
+    Text is stored 8-bit when it fits cp1252, UTF-16 otherwise.
+    """
+    text = '\r'.join(paragraphs) + '\r'
+    try:
+        encoded, fc = text.encode('cp1252'), 0x40000000 | (1024 * 2)
+    except UnicodeEncodeError:
+        encoded, fc = text.encode('utf-16-le'), 1024
+
+    fib = bytearray(1024)
+    struct.pack_into('<HH', fib, 0, 0xA5EC, 0x00C1)
+    struct.pack_into('<H', fib, 0x0A, 0x0200)         # table is 1Table
+    struct.pack_into('<H', fib, 0x20, 14)             # csw
+    struct.pack_into('<H', fib, 0x3E, 22)             # cslw
+    struct.pack_into('<i', fib, 0x4C, len(text))      # ccpText
+    struct.pack_into('<H', fib, 0x98, 0x5D)           # cbRgFcLcb
+    clx = b'\x02' + struct.pack('<I', 16) + struct.pack('<II', 0, len(text))
+    clx += struct.pack('<HIH', 0, fc, 0)
+    struct.pack_into('<II', fib, 0x1A2, 0, len(clx))  # fcClx, lcbClx
+
+    # Keep both streams above the 4096-byte mini-stream cutoff
+    streams = [bytes(fib) + encoded, clx]
+    streams = [s.ljust(4096, b'\0') for s in streams]
+
+    sectors, fat = [], []
+    starts = []
+    for data in streams:
+        data = data.ljust(-(-len(data) // 512) * 512, b'\0')
+        starts.append(len(sectors))
+        count = len(data) // 512
+        for i in range(count):
+            sectors.append(data[i * 512:(i + 1) * 512])
+            fat.append(len(sectors) if i < count - 1 else 0xFFFFFFFE)
+
+    dir_sector = len(sectors)
+    sectors.append(
+        _ole_entry('Root Entry', 5, child=1)
+        + _ole_entry('WordDocument', 2, starts[0], len(streams[0]), right=2)
+        + _ole_entry('1Table', 2, starts[1], len(streams[1]))
+        + _ole_entry('', 0)
+    )
+    fat.append(0xFFFFFFFE)
+
+    fat_count = -(-(len(sectors) + 1) // 127)
+    fat_start = len(sectors)
+    fat.extend([0xFFFFFFFD] * fat_count)
+    fat.extend([0xFFFFFFFF] * (fat_count * 128 - len(fat)))
+    fat_bytes = struct.pack(f'<{len(fat)}I', *fat)
+    sectors.extend(fat_bytes[i * 512:(i + 1) * 512] for i in range(fat_count))
+
+    difat = list(range(fat_start, fat_start + fat_count))
+    difat += [0xFFFFFFFF] * (109 - len(difat))
+    header = bytearray(512)
+    header[:8] = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+    struct.pack_into('<HHHHH', header, 0x18, 0x3E, 3, 0xFFFE, 9, 6)
+    struct.pack_into('<IIIIIIIII', header, 0x28, 0, fat_count, dir_sector, 0,
+                     4096, 0xFFFFFFFE, 0, 0xFFFFFFFE, 0)
+    struct.pack_into('<109I', header, 0x4C, *difat)
+    return bytes(header) + b''.join(sectors)
+
+
+def write_corpus(directory: Path, files: int = 40, seed: int = 0) -> list[Path]:
+    """
+    Write a mixed artist archive (mostly DOCX and PDF, plus HTML and legacy
+    DOC) into directory and return the file paths.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(files):
+        kind = ('docx', 'pdf', 'doc', 'html', 'pdf', 'docx')[i % 6]
+        if kind == 'docx':
+            data = make_docx(make_paragraphs(120, seed + i))
+        elif kind == 'pdf':
+            data = make_pdf_pages(12, seed=seed + i)
+        elif kind == 'doc':
+            data = make_doc(make_paragraphs(120, seed + i))
+        else:
+            data = make_html(make_paragraphs(200, seed + i))
+        path = directory / f'Press Release {i:03d}.{kind}'
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
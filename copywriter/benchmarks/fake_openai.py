@@ -0,0 +1,280 @@
+"""
+In-process stand-ins for the OpenAI client used by the generator benchmarks.
+Completions take a configurable time and can stream their text in deltas.
+FakeOpenAIServer is a local HTTP server speaking the chat completions API,
+with a simulated per-minute request limit, for exercising the real client.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+# Make `src` importable when a benchmark is run as a plain script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Smallest prompt prefix the provider caches, and the step it matches in
+PROVIDER_CACHE_MIN_TOKENS = 1024
+PROVIDER_CACHE_STEP_TOKENS = 128
+
+
+def prompt_text(messages: list[dict]) -> str:
+    """Every text part of every message, in order (images as content hashes)."""
+    parts = []
+    for message in messages:
+        content = message['content']
+        for part in [{'type': 'text', 'text': content}] if isinstance(content, str) else content:
+            if part['type'] == 'text':
+                parts.append(part['text'])
+            else:
+                parts.append(hashlib.sha256(part['image_url']['url'].encode('utf-8')).hexdigest())
+    return '\n'.join(parts)
+
+
+class PrefixCache:
+    """
+    Simulates the provider's prompt caching: a prompt's cached tokens are
+    its longest prefix shared with an earlier prompt, counted in
+    128-token steps and only from 1,024 tokens (4 characters a token).
+    """
+
+    def __init__(self):
+        self.seen: list[str] = []
+
+    def cached_tokens(self, text: str) -> int:
+        shared = max((len(os.path.commonprefix([text, old])) for old in self.seen), default=0)
+        self.seen.append(text)
+        tokens = shared // 4 // PROVIDER_CACHE_STEP_TOKENS * PROVIDER_CACHE_STEP_TOKENS
+        return tokens if tokens >= PROVIDER_CACHE_MIN_TOKENS else 0
+
+
+class FakeCompletions:
+    """
+    Stands in for client.chat.completions.
+
+    A reply is `reply_words` words. Without streaming it arrives after
+    first_token_latency + one token_interval per word; with streaming the
+    first delta arrives after first_token_latency and the rest follow one
+    token_interval apart. Prompts containing fail_marker raise.
+    """
+
+    def __init__(
+        self,
+        first_token_latency: float = 0.0,
+        token_interval: float = 0.0,
+        reply_words: int = 20,
+        fail_marker: str = None,
+    ):
+        self.first_token_latency = first_token_latency
+        self.token_interval = token_interval
+        self.reply_words = reply_words
+        self.fail_marker = fail_marker
+        self.calls = 0
+        self.requests = []
+        self.prefix_cache = PrefixCache()
+        self._lock = threading.Lock()
+
+    def _reply(self, prompt: str) -> list[str]:
+        words = [f"word{i}" for i in range(self.reply_words - 1)]
+        return [f"Notes on {len(prompt)} chars:"] + [f" {w}" for w in words]
+
+    def _usage(self, prompt: str, deltas: list[str]) -> SimpleNamespace:
+        with self._lock:
+            cached = self.prefix_cache.cached_tokens(prompt)
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(deltas)
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+        )
+
+    def create(self, model, messages, stream=False, stream_options=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.requests.append(dict(model=model, messages=messages, **kwargs))
+        prompt = prompt_text(messages)
+        if self.fail_marker and self.fail_marker in prompt:
+            time.sleep(self.first_token_latency)
+            raise ConnectionError("simulated timeout")
+        deltas = self._reply(prompt)
+        usage = self._usage(prompt, deltas)
+
+        if stream:
+            return self._stream(deltas, usage if (stream_options or {}).get('include_usage') else None)
+        time.sleep(self.first_token_latency + self.token_interval * len(deltas))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=''.join(deltas)))],
+            usage=usage,
+        )
+
+    def _stream(self, deltas: list[str], usage=None):
+        time.sleep(self.first_token_latency)
+        for i, delta in enumerate(deltas):
+            if i:
+                time.sleep(self.token_interval)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))], usage=None)
+        if usage is not None:
+            yield SimpleNamespace(choices=[], usage=usage)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    """FakeCompletions for AsyncOpenAI: create() is a coroutine (no streaming)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        self.requests.append(dict(model=model, messages=messages, **kwargs))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            prompt = prompt_text(messages)
+            deltas = self._reply(prompt)
+            await asyncio.sleep(self.first_token_latency + self.token_interval * len(deltas))
+            if self.fail_marker and self.fail_marker in prompt:
+                raise ConnectionError("simulated timeout")
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=''.join(deltas)))],
+            usage=self._usage(prompt, deltas),
+        )
+
+
+class FakeAsyncClient:
+    """An object shaped like AsyncOpenAI(), usable with `async with`."""
+
+    def __init__(self, completions: FakeAsyncCompletions):
+        self.chat = SimpleNamespace(completions=completions)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def fake_client(completions: FakeCompletions) -> SimpleNamespace:
+    """An object shaped like OpenAI() for code that calls client.chat.completions.create."""
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class FakeOpenAIServer:
+    """
+    Local HTTP server for POST /v1/chat/completions (non-streaming).
+
+    Admits requests_per_minute with up to burst requests at once; beyond
+    that it answers 429 with Retry-After / retry-after-ms, like the real
+    API. Each accepted request takes latency seconds. Connections are kept
+    alive (HTTP/1.1); each new one costs connect_delay seconds, standing in
+    for the TCP and TLS handshakes with the real API.
+
+    Use as a context manager; point a client at server.base_url.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        burst: int = 1,
+        latency: float = 0.0,
+        connect_delay: float = 0.0,
+    ):
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.latency = latency
+        self.connect_delay = connect_delay
+        self.connections = 0
+        self.accepted = 0
+        self.rejected = 0
+        self._level = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def _admit(self) -> float:
+        """0 if the request is admitted, else seconds until it would be."""
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.burst, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._level >= 1:
+                self._level -= 1
+                self.accepted += 1
+                return 0.0
+            self.rejected += 1
+            return (1 - self._level) / self.rate
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes; without this a
+            # kept-alive connection waits on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                time.sleep(server.connect_delay)
+
+            def _send(self, status: int, body: dict, headers: dict = None):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                wait = server._admit()
+                if wait:
+                    self._send(429, {'error': {
+                        'message': 'Rate limit reached for requests', 'type': 'requests', 'code': 'rate_limit_exceeded',
+                    }}, {'retry-after': f"{max(1, round(wait))}", 'retry-after-ms': f"{wait * 1000:.0f}"})
+                    return
+                time.sleep(server.latency)
+                content = request['messages'][-1]['content']
+                prompt = content if isinstance(content, str) else content[0]['text']
+                self._send(200, {
+                    'id': 'chatcmpl-fake',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request['model'],
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': f"Copy for a {len(prompt)}-char prompt."},
+                        'finish_reason': 'stop',
+                    }],
+                    'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': 8, 'total_tokens': len(prompt) // 4 + 8},
+                })
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
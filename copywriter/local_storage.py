@@ -2,11 +2,13 @@
 Local storage backend for CopyWriter V2 — a no-cloud drop-in for supabase_storage.
 
 Mirrors the exact public API and the Supabase schema (artists, style_guides,
-documents, generated_copy) using a local SQLite database plus a local folder
-for original document files. Intended for offline testing only; production
-still uses Supabase. Activated by setting USE_LOCAL_DB=1 (see supabase_storage).
+style_guide_versions, documents, generated_copy, llm_calls) using a local
+SQLite database plus a local folder for original document files. Intended
+for offline testing only; production still uses Supabase. Activated by
+setting USE_LOCAL_DB=1 (see supabase_storage).
 """
 
+import json
 import os
 import sqlite3
 import uuid
@@ -53,6 +55,14 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
             created_at TEXT NOT NULL,
             updated_at TEXT NOT NULL
         );
+        CREATE TABLE IF NOT EXISTS style_guide_versions (
+            id TEXT PRIMARY KEY,
+            artist_id TEXT REFERENCES artists(id) ON DELETE CASCADE,
+            content TEXT NOT NULL,
+            document_ids TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
         CREATE TABLE IF NOT EXISTS documents (
             id TEXT PRIMARY KEY,
             artist_id TEXT REFERENCES artists(id) ON DELETE CASCADE,
@@ -70,6 +80,26 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
             content TEXT NOT NULL,
             created_at TEXT NOT NULL
         );
+        CREATE TABLE IF NOT EXISTS llm_calls (
+            id TEXT PRIMARY KEY,
+            artist_id TEXT REFERENCES artists(id) ON DELETE CASCADE,
+            operation TEXT NOT NULL,
+            doc_type TEXT,
+            model TEXT NOT NULL,
+            status TEXT NOT NULL,
+            error TEXT,
+            streamed INTEGER NOT NULL,
+            prompt_tokens INTEGER,
+            cached_tokens INTEGER,
+            completion_tokens INTEGER,
+            time_to_first_token REAL,
+            total_time REAL,
+            queued_seconds REAL,
+            retries INTEGER NOT NULL,
+            cost_usd REAL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS llm_calls_created_at ON llm_calls (created_at);
         """
     )
     conn.commit()
@@ -126,7 +156,12 @@ def get_style_guide(artist_id: str) -> str | None:
         conn.close()
 
 
-def save_style_guide(artist_id: str, content: str) -> None:
+def save_style_guide(
+    artist_id: str,
+    content: str,
+    document_ids: list[str] | None = None,
+    mode: str = "full",
+) -> None:
     conn = _connect()
     try:
         existing = conn.execute(
@@ -144,11 +179,31 @@ def save_style_guide(artist_id: str, content: str) -> None:
                 "VALUES (?, ?, ?, ?, ?)",
                 (_new_id(), artist_id, content, now, now),
             )
+        if document_ids is not None:
+            conn.execute(
+                "INSERT INTO style_guide_versions "
+                "(id, artist_id, content, document_ids, mode, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (_new_id(), artist_id, content, json.dumps(list(document_ids)), mode, _now()),
+            )
         conn.commit()
     finally:
         conn.close()
 
 
+def get_style_guide_version(artist_id: str) -> dict | None:
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT * FROM style_guide_versions WHERE artist_id = ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            (artist_id,),
+        ).fetchone()
+        return dict(row, document_ids=json.loads(row["document_ids"])) if row else None
+    finally:
+        conn.close()
+
+
 # --- Documents ---
 
 def get_documents(artist_id: str) -> list[dict]:
@@ -243,6 +298,32 @@ def save_generated_copy(artist_id: str, doc_type: str, user_brief: str, content:
         conn.close()
 
 
+def save_generated_copies(records: list[dict]) -> list[dict]:
+    recs = [
+        {
+            "id": _new_id(),
+            "artist_id": r["artist_id"],
+            "doc_type": r["doc_type"],
+            "user_brief": r["user_brief"],
+            "content": r["content"],
+            "created_at": _now(),
+        }
+        for r in records
+    ]
+    conn = _connect()
+    try:
+        conn.executemany(
+            "INSERT INTO generated_copy "
+            "(id, artist_id, doc_type, user_brief, content, created_at) "
+            "VALUES (:id, :artist_id, :doc_type, :user_brief, :content, :created_at)",
+            recs,
+        )
+        conn.commit()
+        return recs
+    finally:
+        conn.close()
+
+
 def get_generated_copy(artist_id: str) -> list[dict]:
     conn = _connect()
     try:
@@ -262,3 +343,45 @@ def delete_generated_copy(copy_id: str) -> None:
         conn.commit()
     finally:
         conn.close()
+
+
+# --- LLM Call Metrics ---
+
+_LLM_CALL_COLUMNS = (
+    "id", "artist_id", "operation", "doc_type", "model", "status", "error",
+    "streamed", "prompt_tokens", "cached_tokens", "completion_tokens",
+    "time_to_first_token", "total_time", "queued_seconds", "retries",
+    "cost_usd", "created_at",
+)
+
+
+def save_llm_calls(records: list[dict]) -> None:
+    rows = [
+        tuple(
+            {"id": _new_id(), "created_at": _now(), **rec}.get(col)
+            for col in _LLM_CALL_COLUMNS
+        )
+        for rec in records
+    ]
+    conn = _connect()
+    try:
+        conn.executemany(
+            f"INSERT INTO llm_calls ({', '.join(_LLM_CALL_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in _LLM_CALL_COLUMNS)})",
+            rows,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_llm_calls(since: str | None = None, limit: int = 5000) -> list[dict]:
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT * FROM llm_calls WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?",
+            (since or "", limit),
+        ).fetchall()
+        return [dict(r, streamed=bool(r["streamed"])) for r in rows]
+    finally:
+        conn.close()
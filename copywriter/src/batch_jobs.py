@@ -0,0 +1,306 @@
+"""
+Batch Jobs Module
+Runs a file of briefs (CSV or JSONL) through CopyGeneratorV2 with bounded
+concurrency, for launches that need dozens of descriptions and ads at once.
+Each finished brief is checkpointed to a SQLite file, so an interrupted job
+resumes with only the briefs that haven't succeeded, and generated copy is
+handed to a save callback in batches rather than one insert per brief.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from .generator_v2 import CopyGeneratorV2
+from .image_prep import prepare_images
+
+# Briefs generated at once
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv('COPYWRITER_BATCH_CONCURRENCY', '4'))
+
+# Finished briefs handed to the save callback per call
+DEFAULT_SAVE_BATCH_SIZE = int(os.getenv('COPYWRITER_BATCH_SAVE_SIZE', '10'))
+
+# Separator between image paths in a CSV cell
+CSV_IMAGE_SEPARATOR = ';'
+
+
+def _brief_key(brief: dict) -> str:
+    fields = [brief['artist'], brief['doc_type'], brief['context'], *brief['images']]
+    return hashlib.sha256('\0'.join(fields).encode('utf-8')).hexdigest()[:16]
+
+
+def load_briefs(path: str) -> list[dict]:
+    """
+    Read briefs from a CSV file (with a header row) or JSONL file (one
+    object per line).
+
+    Each brief needs artist (name, slug or id) and context; doc_type
+    defaults to general. images lists image paths, relative to the brief
+    file: a JSON list in JSONL, a CSV_IMAGE_SEPARATOR-separated cell in CSV.
+
+    Args:
+        path: Brief file (.csv, or .jsonl / .json for JSON lines)
+
+    Returns:
+        Brief dicts with artist, doc_type, context, images (absolute paths),
+        line, and key: the brief's id column if given, otherwise a hash of
+        its fields, so a resumed job matches briefs even if the file was
+        reordered
+
+    Raises:
+        ValueError: For a brief missing artist or context, or a repeated id
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if path.suffix.lower() == '.csv':
+            rows = [(line, row) for line, row in enumerate(csv.DictReader(f), start=2)]
+        else:
+            rows = [(line, json.loads(text)) for line, text in enumerate(f, start=1) if text.strip()]
+
+    briefs, seen = [], Counter()
+    for line, row in rows:
+        images = row.get('images') or []
+        if isinstance(images, str):
+            images = images.split(CSV_IMAGE_SEPARATOR)
+        brief = {
+            'artist': str(row.get('artist') or '').strip(),
+            'doc_type': str(row.get('doc_type') or '').strip() or 'general',
+            'context': str(row.get('context') or '').strip(),
+            'images': [str(path.parent / p.strip()) for p in images if p.strip()],
+            'line': line,
+        }
+        if not brief['artist'] or not brief['context']:
+            raise ValueError(f"{path.name} line {line}: a brief needs artist and context")
+        if row.get('id'):
+            key = str(row['id'])
+            if key in seen:
+                raise ValueError(f"{path.name} line {line}: id {key} is used twice")
+        else:
+            # The same brief twice is two jobs (e.g. two variants)
+            key = _brief_key(brief)
+            key = f"{key}-{seen[key] + 1}" if seen[key] else key
+        seen[key] += 1
+        brief['key'] = key
+        briefs.append(brief)
+    return briefs
+
+
+class BatchCheckpoint:
+    """
+    Progress of one batch job, one SQLite row per finished brief.
+
+    Copy is checkpointed as soon as a brief finishes and marked saved once
+    the save callback has stored it, so neither generation nor saving is
+    repeated on resume. A crash between a save and marking it leaves that
+    batch to be saved again.
+
+    Args:
+        db_path: Checkpoint file (see default_checkpoint_path)
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (one per call, like local_storage)."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS briefs (
+                key TEXT PRIMARY KEY,
+                artist_id TEXT NOT NULL,
+                doc_type TEXT NOT NULL,
+                user_brief TEXT NOT NULL,
+                content TEXT,
+                error TEXT,
+                total_time REAL,
+                saved INTEGER NOT NULL DEFAULT 0,
+                finished_at REAL NOT NULL
+            )
+            """
+        )
+        return conn
+
+    def succeeded(self) -> set[str]:
+        """Keys of briefs with copy (failed briefs are run again)."""
+        conn = self._connect()
+        try:
+            return {r['key'] for r in conn.execute("SELECT key FROM briefs WHERE content IS NOT NULL")}
+        finally:
+            conn.close()
+
+    def record(
+        self,
+        key: str,
+        artist_id: str,
+        doc_type: str,
+        user_brief: str,
+        content: Optional[str],
+        error: Optional[str] = None,
+        total_time: Optional[float] = None,
+    ) -> None:
+        """Checkpoint one finished brief (copy, or the error it failed with)."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO briefs "
+                "(key, artist_id, doc_type, user_brief, content, error, total_time, saved, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                (key, artist_id, doc_type, user_brief, content, error, total_time, time.time()),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def unsaved(self) -> list[dict]:
+        """Generated copy not yet saved, oldest first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT key, artist_id, doc_type, user_brief, content FROM briefs "
+                "WHERE content IS NOT NULL AND saved = 0 ORDER BY finished_at"
+            ).fetchall()
+            return [dict(r) for r in rows]
+        finally:
+            conn.close()
+
+    def mark_saved(self, keys: list[str]) -> None:
+        conn = self._connect()
+        try:
+            conn.executemany("UPDATE briefs SET saved = 1 WHERE key = ?", [(k,) for k in keys])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        """Briefs succeeded, failed and saved so far."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT COUNT(content) AS succeeded, COUNT(*) - COUNT(content) AS failed, "
+                "COALESCE(SUM(saved), 0) AS saved FROM briefs"
+            ).fetchone()
+            return dict(row)
+        finally:
+            conn.close()
+
+
+def default_checkpoint_path(brief_path: str) -> Path:
+    """Checkpoint file kept next to the brief file (briefs.csv -> briefs.csv.checkpoint.db)."""
+    brief_path = Path(brief_path)
+    return brief_path.with_name(brief_path.name + '.checkpoint.db')
+
+
+def run_batch(
+    briefs: list[dict],
+    make_generator: Callable[[str], CopyGeneratorV2],
+    style_guides: dict[str, str],
+    save: Callable[[list[dict]], object],
+    checkpoint: BatchCheckpoint,
+    max_concurrency: Optional[int] = None,
+    save_batch_size: Optional[int] = None,
+    find_exemplars: Optional[Callable[[str, str], list[dict]]] = None,
+    fresh: bool = False,
+) -> Iterator[dict]:
+    """
+    Generate copy for every brief not already done, yielding each result
+    as it finishes.
+
+    Each brief sends the same request the Generate page would. Results are
+    checkpointed one by one in this thread; saves go out every
+    save_batch_size briefs, when the job ends and when it is interrupted
+    (after waiting for the briefs already in flight, whose results are
+    kept). Copy left unsaved by an earlier run is saved first.
+
+    Args:
+        briefs: From load_briefs(), each with artist_id set
+        make_generator: Generator for an artist id (called per brief, as
+            generators keep per-call timing)
+        style_guides: Style guide for each artist id
+        save: Stores a list of copy dicts with artist_id, doc_type,
+            user_brief and content (e.g. save_generated_copies)
+        checkpoint: Job progress
+        max_concurrency: Briefs in flight at once (default DEFAULT_BATCH_CONCURRENCY)
+        save_batch_size: Briefs per save call (default DEFAULT_SAVE_BATCH_SIZE)
+        find_exemplars: Example passages for (artist id, brief), if wanted
+        fresh: Ask for new variants even if identical requests are cached
+
+    Yields:
+        Dicts with key, line, artist_id, doc_type, copy (None on failure),
+        error (None on success), cached and total_time (seconds)
+    """
+    save_batch_size = save_batch_size or DEFAULT_SAVE_BATCH_SIZE
+
+    def flush(minimum: int) -> None:
+        pending = checkpoint.unsaved()
+        while pending and len(pending) >= minimum:
+            batch, pending = pending[:save_batch_size], pending[save_batch_size:]
+            save([{k: row[k] for k in ('artist_id', 'doc_type', 'user_brief', 'content')} for row in batch])
+            checkpoint.mark_saved([row['key'] for row in batch])
+
+    def generate(brief: dict) -> dict:
+        start = time.perf_counter()
+        generator = make_generator(brief['artist_id'])
+        images, _ = prepare_images([
+            {'bytes': Path(p).read_bytes(), 'name': Path(p).name} for p in brief['images']
+        ])
+        copy = generator.generate(
+            style_guide=style_guides[brief['artist_id']],
+            doc_type=brief['doc_type'],
+            context=f"Document type: {brief['doc_type'].replace('_', ' ')}\n\n{brief['context']}",
+            images=images,
+            fresh=fresh,
+            exemplars=find_exemplars(brief['artist_id'], brief['context']) if find_exemplars else None,
+        )
+        return {'copy': copy, 'cached': bool(generator.last_timing.get('cached')),
+                'total_time': time.perf_counter() - start}
+
+    def finish(brief: dict, future) -> dict:
+        try:
+            outcome, error = future.result(), None
+        except Exception as e:
+            outcome, error = {'copy': None, 'cached': False, 'total_time': None}, str(e)
+        checkpoint.record(
+            brief['key'], brief['artist_id'], brief['doc_type'], brief['context'],
+            outcome['copy'], error, outcome['total_time'],
+        )
+        return {
+            'key': brief['key'],
+            'line': brief['line'],
+            'artist_id': brief['artist_id'],
+            'doc_type': brief['doc_type'],
+            'error': error,
+            **outcome,
+        }
+
+    flush(1)
+    done = checkpoint.succeeded()
+    pending = [b for b in briefs if b['key'] not in done]
+    if not pending:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=min(max_concurrency or DEFAULT_BATCH_CONCURRENCY, len(pending)))
+    futures = {pool.submit(generate, brief): brief for brief in pending}
+    finished = set()
+    try:
+        for future in as_completed(futures):
+            finished.add(future)
+            result = finish(futures[future], future)
+            flush(save_batch_size)
+            yield result
+    finally:
+        # Interrupted: drop queued briefs, keep what was already running
+        pool.shutdown(wait=True, cancel_futures=True)
+        for future, brief in futures.items():
+            if future not in finished and future.done() and not future.cancelled():
+                finish(brief, future)
+        flush(1)
@@ -0,0 +1,204 @@
+"""
+Corpus Assembler
+Builds the document block for style analysis within a token budget, so
+large artists stay inside the model's context window. Documents are chosen
+by the analysis prompt's priority order (press release > product copy >
+training notes), newest first, and trimmed at paragraph boundaries.
+"""
+
+import os
+from typing import Optional
+
+# Default token budget for the documents block of the analysis prompt.
+# gpt-4o has a 128k context; this leaves room for the instructions and
+# the 6,000-token answer. Override with COPYWRITER_CORPUS_TOKENS.
+DEFAULT_CORPUS_TOKEN_BUDGET = int(os.getenv('COPYWRITER_CORPUS_TOKENS', '60000'))
+
+# Average characters per token for English prose with the gpt-4o tokenizer
+CHARS_PER_TOKEN = 4
+
+# Filename keywords for each priority tier, highest priority first.
+# Documents matching none of them sit between product copy and training notes.
+PRIORITY_KEYWORDS = (
+    ('press_release', ('press release', 'press_release', 'press-release')),
+    ('product', ('product', 'collection', 'overview', 'description', 'bio', 'catalogue')),
+    ('other', ()),
+    ('training', ('training', 'notes', 'guide', 'brief', 'internal')),
+)
+_TIERS = [tier for tier, _ in PRIORITY_KEYWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough local token count (no tokenizer needed)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def document_tier(filename: str) -> str:
+    """Priority tier for a document, from its filename."""
+    name = filename.lower()
+    for tier, keywords in PRIORITY_KEYWORDS:
+        if tier != 'other' and any(k in name for k in keywords):
+            return tier
+    return 'other'
+
+
+def rank_documents(documents: list[dict]) -> list[dict]:
+    """Documents in priority-tier order, newest first within a tier."""
+    # Stable sorts: recency first, then tier
+    ranked = sorted(documents, key=lambda d: d.get('created_at') or '', reverse=True)
+    ranked.sort(key=lambda d: _TIERS.index(document_tier(d['filename'])))
+    return ranked
+
+
+def _header(filename: str) -> str:
+    return f"\n\n--- {filename} ---\n"
+
+
+def _trim_to_budget(text: str, budget: int) -> tuple[str, int, int]:
+    """
+    Longest run of leading paragraphs that fits in budget tokens.
+
+    Returns:
+        (text, paragraphs kept, paragraphs in total)
+    """
+    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+    kept, used = 0, 0
+    for para in paragraphs:
+        cost = estimate_tokens(para) + (1 if kept else 0)
+        if used + cost > budget:
+            break
+        used += cost
+        kept += 1
+    return '\n\n'.join(paragraphs[:kept]), kept, len(paragraphs)
+
+
+def assemble_corpus(
+    documents: list[dict],
+    token_budget: Optional[int] = None,
+    per_document_tokens: Optional[int] = None,
+) -> tuple[str, dict]:
+    """
+    Build the combined documents text for StyleAnalyzerV2 within a budget.
+
+    Args:
+        documents: Dicts with 'filename' and 'full_text', optionally
+            'created_at' (ISO timestamp, used to prefer recent documents)
+        token_budget: Estimated tokens for the whole block
+            (default DEFAULT_CORPUS_TOKEN_BUDGET)
+        per_document_tokens: Cap per document so one long file can't crowd
+            out the rest (default a quarter of the budget)
+
+    Returns:
+        (combined text, report) where report has budget, tokens (estimated
+        total used), included (list of dicts with filename, tier, tokens,
+        trimmed, and for trimmed documents the paragraphs kept out of
+        total_paragraphs) and excluded (filenames left out)
+    """
+    budget = token_budget or DEFAULT_CORPUS_TOKEN_BUDGET
+    per_document = per_document_tokens or max(budget // 4, 1)
+
+    parts, included, excluded = [], [], []
+    remaining = budget
+    for doc in rank_documents(documents):
+        header = _header(doc['filename'])
+        allowance = min(per_document, remaining) - estimate_tokens(header)
+        text = doc['full_text'] or ''
+        if allowance <= 0 or not text.strip():
+            excluded.append(doc['filename'])
+            continue
+
+        tokens = estimate_tokens(text)
+        if tokens <= allowance:
+            kept = total = None
+        else:
+            text, kept, total = _trim_to_budget(text, allowance)
+            if not kept:
+                excluded.append(doc['filename'])
+                continue
+            tokens = estimate_tokens(text)
+
+        parts.append(header)
+        parts.append(text)
+        used = tokens + estimate_tokens(header)
+        remaining -= used
+        included.append({
+            'filename': doc['filename'],
+            'tier': document_tier(doc['filename']),
+            'tokens': used,
+            'trimmed': kept is not None,
+            'paragraphs': kept,
+            'total_paragraphs': total,
+        })
+
+    report = {
+        'budget': budget,
+        'tokens': budget - remaining,
+        'included': included,
+        'excluded': excluded,
+    }
+    return ''.join(parts), report
+
+
+def batch_corpus(documents: list[dict], batch_tokens: int) -> list[str]:
+    """
+    Split the whole corpus into blocks of about batch_tokens estimated
+    tokens each, in priority order, for map-reduce analysis. Nothing is
+    left out: documents longer than a batch are split at paragraph
+    boundaries into labelled parts.
+
+    Args:
+        documents: Dicts with 'filename' and 'full_text' (and optionally
+            'created_at')
+        batch_tokens: Target size of each batch
+
+    Returns:
+        Batch texts, each formatted like assemble_corpus output
+    """
+    batches, current, used = [], [], 0
+
+    def flush():
+        nonlocal current, used
+        if current:
+            batches.append(''.join(current))
+        current, used = [], 0
+
+    for doc in rank_documents(documents):
+        text = (doc['full_text'] or '').strip()
+        if not text:
+            continue
+        header = _header(doc['filename'])
+        if estimate_tokens(header) + estimate_tokens(text) > batch_tokens:
+            pieces = _split_paragraphs(text, batch_tokens - estimate_tokens(header) - 4)
+            pieces = [
+                (_header(f"{doc['filename']} (part {i} of {len(pieces)})"), piece)
+                for i, piece in enumerate(pieces, start=1)
+            ]
+        else:
+            pieces = [(header, text)]
+
+        for header, piece in pieces:
+            cost = estimate_tokens(header) + estimate_tokens(piece)
+            if used and used + cost > batch_tokens:
+                flush()
+            current += [header, piece]
+            used += cost
+
+    flush()
+    return batches
+
+
+def _split_paragraphs(text: str, budget: int) -> list[str]:
+    """Pack paragraphs into pieces of at most budget tokens (a longer paragraph stands alone)."""
+    pieces, current, used = [], [], 0
+    for para in (p.strip() for p in text.split('\n\n')):
+        if not para:
+            continue
+        cost = estimate_tokens(para) + 1
+        if current and used + cost > budget:
+            pieces.append('\n\n'.join(current))
+            current, used = [], 0
+        current.append(para)
+        used += cost
+    if current:
+        pieces.append('\n\n'.join(current))
+    return pieces
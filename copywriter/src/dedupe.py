@@ -0,0 +1,290 @@
+"""
+Near-Duplicate Detection
+MinHash signatures over word shingles plus a banded LSH index, to catch the
+same press release saved as both PDF and DOCX, or a bio copied from the web.
+Each artist's index is persisted in its own SQLite file so existing
+documents aren't re-hashed on every upload.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional
+
+DEFAULT_INDEX_DIR = Path(
+    os.getenv('COPYWRITER_DEDUPE_DIR')
+    or Path(__file__).resolve().parent.parent / 'cache' / 'dedupe'
+)
+
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 128
+# 32 bands of 4 rows: pairs at the default threshold share a bucket >99.9% of the time
+LSH_BANDS = 32
+# Estimated Jaccard similarity at which two documents count as duplicates
+DEFAULT_THRESHOLD = 0.7
+# Texts with fewer shingles than this (empty, a scanned PDF with no text
+# layer, a line or two) are never duplicates: their signatures are mostly
+# empty or borrowed bins, so any two of them would look alike
+MIN_SHINGLES = 3
+
+_WORD_RE = re.compile(r'\w+')
+# Bin values keep 48 bits of the shingle hash; borrowed values (see
+# minhash_signature) are negated and offset above that range
+_VALUE_BITS = 48
+_EMPTY_BIN = (1 << 63) - 1
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_WORDS) -> set[int]:
+    """64-bit hashes of the text's overlapping word shingles (case-folded)."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = (' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+    return {
+        int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+        for s in shingles
+    }
+
+
+def minhash_signature(text: str) -> tuple[int, ...]:
+    """
+    MinHash signature of the text's shingles (NUM_PERMUTATIONS values).
+
+    Uses one-permutation hashing: each shingle hash lands in one of the
+    bins and each bin keeps its minimum, so the cost is a single pass
+    rather than one per permutation. Empty bins borrow from the next
+    non-empty bin (rotation densification) so short texts still compare.
+    """
+    bins = [_EMPTY_BIN] * NUM_PERMUTATIONS
+    for h in shingle_hashes(text):
+        slot, value = h % NUM_PERMUTATIONS, h >> (64 - _VALUE_BITS)
+        if value < bins[slot]:
+            bins[slot] = value
+
+    if _EMPTY_BIN in bins and any(value != _EMPTY_BIN for value in bins):
+        # Offset borrowed values by their distance so they only match
+        # bins that borrowed from the same place
+        hashed = list(bins)
+        for i in range(NUM_PERMUTATIONS):
+            if hashed[i] == _EMPTY_BIN:
+                distance = 1
+                while hashed[(i + distance) % NUM_PERMUTATIONS] == _EMPTY_BIN:
+                    distance += 1
+                bins[i] = -(hashed[(i + distance) % NUM_PERMUTATIONS] + (distance << _VALUE_BITS))
+    return tuple(bins)
+
+
+def is_comparable(signature: tuple[int, ...]) -> bool:
+    """
+    True if the signature came from at least MIN_SHINGLES shingles, counted
+    as the bins they fill directly (neither empty nor borrowed).
+    """
+    return sum(0 <= value < _EMPTY_BIN for value in signature) >= MIN_SHINGLES
+
+
+def estimate_similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the fraction of matching signature slots."""
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def lsh_buckets(signature: tuple[int, ...]) -> list[tuple[int, int]]:
+    """(band, bucket) pairs for a signature; sharing any one makes a candidate."""
+    rows = len(signature) // LSH_BANDS
+    return [
+        (band, zlib.crc32(array('q', signature[band * rows:(band + 1) * rows]).tobytes()))
+        for band in range(LSH_BANDS)
+    ]
+
+
+class LSHIndex:
+    """In-memory MinHash LSH index over a batch of documents."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.signatures: dict[str, tuple[int, ...]] = {}
+        self._buckets: dict[tuple[int, int], list[str]] = {}
+
+    def add(self, key: str, signature: tuple[int, ...]) -> None:
+        """Index a signature (ignored if not is_comparable)."""
+        if not is_comparable(signature):
+            return
+        self.signatures[key] = signature
+        for bucket in lsh_buckets(signature):
+            self._buckets.setdefault(bucket, []).append(key)
+
+    def query(self, signature: tuple[int, ...]) -> list[tuple[str, float]]:
+        """Indexed keys at or above the threshold, most similar first."""
+        if not is_comparable(signature):
+            return []
+        candidates = {
+            key for bucket in lsh_buckets(signature)
+            for key in self._buckets.get(bucket, ())
+        }
+        return _rank_matches(
+            ((key, self.signatures[key]) for key in candidates),
+            signature, self.threshold,
+        )
+
+
+def _rank_matches(candidates, signature, threshold: float) -> list[tuple[str, float]]:
+    matches = []
+    for key, other in candidates:
+        if not is_comparable(other):
+            continue  # stored before short texts were left out
+        similarity = estimate_similarity(signature, other)
+        if similarity >= threshold:
+            matches.append((key, similarity))
+    return sorted(matches, key=lambda m: -m[1])
+
+
+class ArtistDuplicateIndex:
+    """
+    Persistent LSH index for one artist's documents, keyed by document id.
+
+    Signatures and band buckets live in <index_dir>/<artist_id>.db, so
+    checking a new upload only hashes the new text.
+    """
+
+    def __init__(
+        self,
+        artist_id: str,
+        index_dir: Optional[Path] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+    ):
+        index_dir = Path(index_dir or DEFAULT_INDEX_DIR)
+        safe_id = re.sub(r'[^\w.-]', '_', str(artist_id))
+        self.db_path = index_dir / f'{safe_id}.db'
+        self.threshold = threshold
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (one per call, like local_storage)."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                doc_id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                doc_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket);
+            CREATE INDEX IF NOT EXISTS buckets_doc ON buckets (doc_id);
+            """
+        )
+        return conn
+
+    def doc_ids(self) -> set[str]:
+        conn = self._connect()
+        try:
+            return {r['doc_id'] for r in conn.execute("SELECT doc_id FROM signatures")}
+        finally:
+            conn.close()
+
+    def add(self, doc_id: str, filename: str, text: str) -> tuple[int, ...]:
+        """Index a document's text (unless too short, see MIN_SHINGLES); returns its signature."""
+        signature = minhash_signature(text)
+        if is_comparable(signature):
+            self._add_signatures([(str(doc_id), filename, signature)])
+        return signature
+
+    def _add_signatures(self, entries: list[tuple[str, str, tuple[int, ...]]]) -> None:
+        conn = self._connect()
+        try:
+            for doc_id, filename, signature in entries:
+                conn.execute("DELETE FROM buckets WHERE doc_id = ?", (doc_id,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO signatures (doc_id, filename, signature) VALUES (?, ?, ?)",
+                    (doc_id, filename, array('q', signature).tobytes()),
+                )
+                conn.executemany(
+                    "INSERT INTO buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                    [(band, bucket, doc_id) for band, bucket in lsh_buckets(signature)],
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def remove(self, *doc_ids: str) -> None:
+        conn = self._connect()
+        try:
+            for doc_id in doc_ids:
+                conn.execute("DELETE FROM buckets WHERE doc_id = ?", (str(doc_id),))
+                conn.execute("DELETE FROM signatures WHERE doc_id = ?", (str(doc_id),))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def sync(self, documents: Iterable[dict]) -> None:
+        """
+        Bring the index in line with the artist's stored documents
+        (dicts with id, filename, extracted_text): new ones are hashed,
+        removed ones dropped, unchanged ones left alone. Documents too
+        short to compare are not indexed.
+        """
+        documents = {str(d['id']): d for d in documents}
+        indexed = self.doc_ids()
+        stale = indexed - documents.keys()
+        if stale:
+            self.remove(*stale)
+        missing = [
+            (doc_id, d['filename'], minhash_signature(d.get('extracted_text') or ''))
+            for doc_id, d in documents.items() if doc_id not in indexed
+        ]
+        missing = [entry for entry in missing if is_comparable(entry[2])]
+        if missing:
+            self._add_signatures(missing)
+
+    def signatures(self) -> dict[str, tuple[int, ...]]:
+        """Every stored signature, keyed by document id."""
+        conn = self._connect()
+        try:
+            return {
+                r['doc_id']: tuple(array('q', r['signature']))
+                for r in conn.execute("SELECT doc_id, signature FROM signatures")
+            }
+        finally:
+            conn.close()
+
+    def query(self, text: str) -> list[dict]:
+        """
+        Indexed documents that are near-duplicates of text.
+
+        Returns:
+            List of dicts with doc_id, filename and similarity (estimated
+            Jaccard), most similar first; empty for text too short to
+            compare (see MIN_SHINGLES)
+        """
+        signature = minhash_signature(text)
+        if not is_comparable(signature):
+            return []
+        conn = self._connect()
+        try:
+            conn.execute("CREATE TEMP TABLE probe (band INTEGER, bucket INTEGER)")
+            conn.executemany("INSERT INTO probe VALUES (?, ?)", lsh_buckets(signature))
+            rows = conn.execute(
+                "SELECT DISTINCT s.doc_id, s.filename, s.signature FROM probe "
+                "JOIN buckets b USING (band, bucket) JOIN signatures s USING (doc_id)"
+            ).fetchall()
+        finally:
+            conn.close()
+
+        filenames = {r['doc_id']: r['filename'] for r in rows}
+        matches = _rank_matches(
+            ((r['doc_id'], tuple(array('q', r['signature']))) for r in rows),
+            signature, self.threshold,
+        )
+        return [
+            {'doc_id': doc_id, 'filename': filenames[doc_id], 'similarity': similarity}
+            for doc_id, similarity in matches
+        ]
@@ -0,0 +1,269 @@
+"""
+Legacy Word (.doc) Reader
+Extracts the main document text from Word 97-2003 binary files in-process,
+by reading the OLE2 compound file and the Word piece table directly.
+"""
+
+import re
+import struct
+from typing import Optional
+
+_OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_END_OF_CHAIN = 0xFFFFFFFE
+_NO_STREAM = 0xFFFFFFFF
+
+_WORD_IDENT = 0xA5EC
+_NFIB_WORD97 = 0x00C1
+_F_ENCRYPTED = 0x0100
+_F_WHICH_TBL_STM = 0x0200
+_FC_COMPRESSED = 0x40000000
+
+# Word control characters: structural breaks become newlines, the
+# non-breaking hyphen becomes '-', and other anchors/markers are dropped.
+_CONTROL_CHARS = {code: None for code in range(32) if chr(code) not in '\t\n'}
+_CONTROL_CHARS.update({
+    ord('\r'): '\n',     # paragraph end
+    ord('\x07'): '\n',   # table cell / row end
+    ord('\x0b'): '\n',   # manual line break
+    ord('\x0c'): '\n',   # page / section break
+    ord('\x1e'): '-',    # non-breaking hyphen
+})
+_FIELD_MARKS_RE = re.compile('([\x13\x14\x15])')
+
+
+class CompoundFile:
+    """
+    Minimal read-only OLE2 compound file (CFB) reader.
+    Works over bytes or a memoryview without copying the whole file.
+    """
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        if bytes(self.data[:8]) != _OLE_MAGIC:
+            raise ValueError("Not an OLE2 compound file")
+
+        (
+            sector_shift, mini_shift, _reserved, _num_dir_sectors, num_fat_sectors,
+            dir_start, _transaction, self.mini_cutoff, minifat_start, num_minifat,
+            difat_start, num_difat,
+        ) = struct.unpack_from('<HH6sIIIIIIIII', self.data, 0x1E)
+        self.sector_size = 1 << sector_shift
+        self.mini_sector_size = 1 << mini_shift
+
+        self.fat = self._read_fat(num_fat_sectors, difat_start, num_difat)
+        self.minifat = (
+            self._unpack_ids(self._read_chain(minifat_start))
+            if num_minifat else ()
+        )
+        self.entries = self._read_directory(dir_start)
+        root = self.entries[0]
+        self.mini_stream = self._read_chain(root['start'], root['size'])
+
+    # --- Sector plumbing ---
+
+    def _sector(self, sector_id: int) -> memoryview:
+        offset = (sector_id + 1) * self.sector_size
+        return self.data[offset:offset + self.sector_size]
+
+    @staticmethod
+    def _unpack_ids(data) -> tuple:
+        return struct.unpack(f'<{len(data) // 4}I', data[:len(data) // 4 * 4])
+
+    def _read_fat(self, num_fat_sectors: int, difat_start: int, num_difat: int) -> tuple:
+        fat_sectors = list(struct.unpack_from('<109I', self.data, 0x4C))
+        sector_id = difat_start
+        per_sector = self.sector_size // 4 - 1
+        for _ in range(num_difat):
+            if sector_id >= _END_OF_CHAIN:
+                break
+            ids = self._unpack_ids(self._sector(sector_id))
+            fat_sectors.extend(ids[:per_sector])
+            sector_id = ids[per_sector]
+
+        fat_sectors = [s for s in fat_sectors[:num_fat_sectors] if s < _END_OF_CHAIN]
+        return self._unpack_ids(b''.join(self._sector(s) for s in fat_sectors))
+
+    def _chain(self, start: int, table: tuple) -> list[int]:
+        chain = []
+        sector_id = start
+        while sector_id < _END_OF_CHAIN:
+            if sector_id >= len(table) or len(chain) > len(table):
+                raise ValueError("Corrupt sector chain in compound file")
+            chain.append(sector_id)
+            sector_id = table[sector_id]
+        return chain
+
+    def _read_chain(self, start: int, size: Optional[int] = None) -> bytes:
+        data = b''.join(self._sector(s) for s in self._chain(start, self.fat))
+        return data if size is None else data[:size]
+
+    def _read_mini_chain(self, start: int, size: int) -> bytes:
+        step = self.mini_sector_size
+        data = b''.join(
+            self.mini_stream[s * step:(s + 1) * step]
+            for s in self._chain(start, self.minifat)
+        )
+        return data[:size]
+
+    # --- Directory ---
+
+    def _read_directory(self, dir_start: int) -> list[dict]:
+        data = self._read_chain(dir_start)
+        entries = []
+        for offset in range(0, len(data) - 127, 128):
+            name_len, entry_type = struct.unpack_from('<HB', data, offset + 64)
+            left, right, child = struct.unpack_from('<III', data, offset + 68)
+            start, size_low, size_high = struct.unpack_from('<III', data, offset + 116)
+            name = bytes(data[offset:offset + max(name_len - 2, 0)]).decode('utf-16-le', 'ignore')
+            entries.append({
+                'name': name,
+                'type': entry_type,
+                'left': left,
+                'right': right,
+                'child': child,
+                'start': start,
+                # Version 3 files may leave garbage in the high size word
+                'size': size_low if self.sector_size == 512 else size_low | size_high << 32,
+            })
+        return entries
+
+    def root_streams(self) -> dict:
+        """Map of stream name to directory entry for the root storage."""
+        streams = {}
+        pending = [self.entries[0]['child']]
+        seen = set()
+        while pending:
+            index = pending.pop()
+            if index == _NO_STREAM or index in seen or index >= len(self.entries):
+                continue
+            seen.add(index)
+            entry = self.entries[index]
+            if entry['type'] == 2:
+                streams[entry['name']] = entry
+            pending.extend((entry['left'], entry['right']))
+        return streams
+
+    def open_stream(self, name: str) -> bytes:
+        """Read a root-level stream by name."""
+        entry = self.root_streams().get(name)
+        if entry is None:
+            raise KeyError(name)
+        if entry['size'] < self.mini_cutoff:
+            return self._read_mini_chain(entry['start'], entry['size'])
+        return self._read_chain(entry['start'], entry['size'])
+
+
+def _read_pieces(clx: bytes) -> list[tuple[int, int, int]]:
+    """
+    Parse the Clx structure into (cp_start, cp_end, fc) pieces.
+    Property modifiers (Prc) are skipped; only the piece table is needed.
+    """
+    pos = 0
+    while pos < len(clx):
+        clxt = clx[pos]
+        if clxt == 1:
+            (cb_grpprl,) = struct.unpack_from('<h', clx, pos + 1)
+            pos += 3 + cb_grpprl
+        elif clxt == 2:
+            (lcb,) = struct.unpack_from('<I', clx, pos + 1)
+            count = (lcb - 4) // 12
+            cps = struct.unpack_from(f'<{count + 1}I', clx, pos + 5)
+            pcd_base = pos + 5 + (count + 1) * 4
+            return [
+                (cps[i], cps[i + 1], struct.unpack_from('<I', clx, pcd_base + i * 8 + 2)[0])
+                for i in range(count)
+            ]
+        else:
+            break
+    raise ValueError("Word piece table not found")
+
+
+def _strip_field_codes(raw: str) -> str:
+    """
+    Keep field results but drop field codes. Fields are marked as
+    0x13 <code> 0x14 <result> 0x15 and may nest.
+    """
+    out = []
+    # One flag per open field: True while inside its code (before \x14)
+    fields = []
+    for segment in _FIELD_MARKS_RE.split(raw):
+        if segment == '\x13':
+            fields.append(True)
+        elif segment == '\x14':
+            if fields:
+                fields[-1] = False
+        elif segment == '\x15':
+            if fields:
+                fields.pop()
+        elif not (fields and fields[-1]):
+            out.append(segment)
+    return ''.join(out)
+
+
+def _clean_text(raw: str) -> str:
+    """Turn Word's character stream into plain paragraphs."""
+    if '\x13' in raw:
+        raw = _strip_field_codes(raw)
+    text = raw.translate(_CONTROL_CHARS)
+
+    paragraphs = (line.strip() for line in text.split('\n'))
+    return '\n\n'.join(p for p in paragraphs if p)
+
+
+def extract_doc_text(data) -> str:
+    """
+    Extract the main document text from a Word 97-2003 .doc file.
+
+    Args:
+        data: The file contents as bytes, bytearray or memoryview
+
+    Returns:
+        Paragraphs separated by blank lines (headers, footers, footnotes
+        and comments are not included)
+
+    Raises:
+        ValueError: If the file is not a readable Word 97+ document
+    """
+    ole = CompoundFile(data)
+    try:
+        word = ole.open_stream('WordDocument')
+    except KeyError:
+        raise ValueError("No WordDocument stream (not a Word file)")
+
+    ident, nfib = struct.unpack_from('<HH', word, 0)
+    (flags,) = struct.unpack_from('<H', word, 0x0A)
+    if ident != _WORD_IDENT:
+        raise ValueError("Invalid Word file header")
+    if nfib < _NFIB_WORD97:
+        raise ValueError("Word 6/95 documents are not supported")
+    if flags & _F_ENCRYPTED:
+        raise ValueError("Document is password protected")
+
+    # FIB: FibBase, then variable-length fibRgW, fibRgLw and fibRgFcLcb
+    (csw,) = struct.unpack_from('<H', word, 0x20)
+    rg_lw = 0x22 + csw * 2 + 2
+    (cslw,) = struct.unpack_from('<H', word, rg_lw - 2)
+    (ccp_text,) = struct.unpack_from('<i', word, rg_lw + 12)
+    rg_fc_lcb = rg_lw + cslw * 4 + 2
+    fc_clx, lcb_clx = struct.unpack_from('<II', word, rg_fc_lcb + 33 * 8)
+
+    table_name = '1Table' if flags & _F_WHICH_TBL_STM else '0Table'
+    try:
+        table = ole.open_stream(table_name)
+    except KeyError:
+        raise ValueError(f"Missing {table_name} stream")
+
+    parts = []
+    remaining = ccp_text
+    for cp_start, cp_end, fc in _read_pieces(table[fc_clx:fc_clx + lcb_clx]):
+        if remaining <= 0:
+            break
+        count = min(cp_end - cp_start, remaining)
+        remaining -= count
+        if fc & _FC_COMPRESSED:
+            offset = (fc & ~_FC_COMPRESSED) // 2
+            parts.append(word[offset:offset + count].decode('cp1252', errors='replace'))
+        else:
+            parts.append(word[fc:fc + count * 2].decode('utf-16-le', errors='replace'))
+
+    return _clean_text(''.join(parts))
@@ -6,13 +6,36 @@ Extracts text from DOCX, PDF, HTML, and DOC files for style analysis and RAG.
 import os
 import json
 import re
-import subprocess
-import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import repeat
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from docx import Document
 import pdfplumber
 
+from .dedupe import DEFAULT_THRESHOLD, LSHIndex, minhash_signature
+from .doc_reader import extract_doc_text
+from .document_store import ProcessedDocumentStore
+from .parse_cache import content_key, get_parse_cache
+from .parsed_document import ParsedDocument
+
+# Bump whenever extraction output changes, so cached text is not reused.
+PARSER_VERSION = '4'
+
+# Worker processes used by parse_documents_batch. Overridable per call or via
+# the COPYWRITER_INGEST_WORKERS environment variable.
+DEFAULT_INGEST_WORKERS = int(
+    os.getenv('COPYWRITER_INGEST_WORKERS', '0')
+) or min(4, os.cpu_count() or 1)
+
+# PDFs with at least this many pages are split into page ranges and parsed
+# across worker processes (see parse_pdf). Set COPYWRITER_PDF_PARALLEL_PAGES
+# to 0 to turn splitting off.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('COPYWRITER_PDF_PARALLEL_PAGES', '40'))
+
+# Cleared in parse_documents_batch's workers, which are already parallel
+_PDF_PAGE_SPLITTING = True
+
 
 def detect_document_type(filename: str) -> str:
     """
@@ -31,13 +54,131 @@ def detect_document_type(filename: str) -> str:
         return 'general'
 
 
-def parse_docx(file_input) -> str:
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+# Run children with a fixed text equivalent (as python-docx's Run.text)
+_RUN_SPECIAL_TEXT = {_W + 'tab': '\t', _W + 'ptab': '\t', _W + 'cr': '\n', _W + 'noBreakHyphen': '-'}
+_HEADING_STYLE_RE = re.compile(r'heading\s*(\d)$', re.IGNORECASE)
+
+
+def _docx_main_part(archive) -> str:
+    """Locate the main document part via the package relationships."""
+    from lxml import etree
+
+    rels = etree.fromstring(archive.read('_rels/.rels'))
+    for rel in rels:
+        if rel.get('Type') == _OFFICE_DOCUMENT_REL:
+            return rel.get('Target').lstrip('/')
+    raise ValueError("No main document part")
+
+
+def _docx_run_text(run) -> str:
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _W + 't':
+            parts.append(child.text or '')
+        elif tag == _W + 'br':
+            # Page and column breaks have no text equivalent
+            if child.get(_W + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag in _RUN_SPECIAL_TEXT:
+            parts.append(_RUN_SPECIAL_TEXT[tag])
+    return ''.join(parts)
+
+
+def _docx_heading_level(para) -> Optional[int]:
+    """Heading level from the paragraph's style or outline level, if any."""
+    ppr = para.find(_W + 'pPr')
+    if ppr is None:
+        return None
+    style = ppr.find(_W + 'pStyle')
+    if style is not None:
+        match = _HEADING_STYLE_RE.match(style.get(_W + 'val', ''))
+        if match:
+            return int(match.group(1))
+        if style.get(_W + 'val', '').lower() == 'title':
+            return 0
+    outline = ppr.find(_W + 'outlineLvl')
+    if outline is not None and outline.get(_W + 'val', '').isdigit():
+        level = int(outline.get(_W + 'val')) + 1
+        return level if level <= 9 else None
+    return None
+
+
+def iter_docx_paragraphs(file_input, with_headings: bool = False) -> Iterator:
+    """
+    Stream body paragraphs straight from word/document.xml, without building
+    python-docx's object model. Text matches python-docx's Paragraph.text:
+    runs and hyperlink runs of top-level paragraphs (not tables).
+
+    Args:
+        file_input: File path (str) or bytes
+        with_headings: Also yield each paragraph's heading level
+
+    Yields:
+        Paragraph text (including empty paragraphs), or (text, level) tuples
+        when with_headings is set; level is None for body text and 0 for
+        the Title style.
+
+    Raises:
+        ValueError / KeyError / zipfile.BadZipFile / lxml XMLSyntaxError for
+        packages this fast path can't read.
+    """
+    import zipfile
+    from io import BytesIO
+    from lxml import etree
+
+    source = BytesIO(file_input) if isinstance(file_input, bytes) else file_input
+    body_tag, para_tag = _W + 'body', _W + 'p'
+    run_tag, link_tag = _W + 'r', _W + 'hyperlink'
+
+    with zipfile.ZipFile(source) as archive:
+        with archive.open(_docx_main_part(archive)) as stream:
+            events = etree.iterparse(stream, events=('start', 'end'))
+            _, root = next(events)
+            if root.tag != _W + 'document':
+                raise ValueError(f"Unexpected document root {root.tag}")
+
+            for event, elem in events:
+                if event != 'end':
+                    continue
+                parent = elem.getparent()
+                if parent is None or parent.tag != body_tag:
+                    continue
+
+                if elem.tag == para_tag:
+                    parts = []
+                    for child in elem:
+                        if child.tag == run_tag:
+                            parts.append(_docx_run_text(child))
+                        elif child.tag == link_tag:
+                            parts.extend(_docx_run_text(r) for r in child.iterchildren(run_tag))
+                    text = ''.join(parts)
+                    yield (text, _docx_heading_level(elem)) if with_headings else text
+
+                # Drop finished top-level blocks so memory stays flat
+                elem.clear()
+                parent.remove(elem)
+
+
+def parse_docx(file_input, fast: bool = True) -> str:
     """
     Extract text from a DOCX file, preserving paragraph structure.
     Accepts either a file path (str) or bytes.
+
+    By default the document XML is streamed directly (iter_docx_paragraphs);
+    packages that path can't read fall back to python-docx.
     """
     from io import BytesIO
 
+    if fast:
+        try:
+            paragraphs = [p.strip() for p in iter_docx_paragraphs(file_input)]
+            return '\n\n'.join(p for p in paragraphs if p)
+        except Exception:
+            pass  # unusual package: let python-docx handle it
+
     if isinstance(file_input, bytes):
         doc = Document(BytesIO(file_input))
     else:
@@ -53,114 +194,294 @@ def parse_docx(file_input) -> str:
     return '\n\n'.join(paragraphs)
 
 
-def parse_pdf(file_input) -> str:
+def _open_pdf(file_input, pages=None):
+    from io import BytesIO
+
+    if isinstance(file_input, bytes):
+        file_input = BytesIO(file_input)
+    return pdfplumber.open(file_input, pages=pages)
+
+
+def iter_pdf_pages(
+    file_input,
+    max_pages: Optional[int] = None,
+    max_words: Optional[int] = None,
+    pages: Optional[Iterable[int]] = None,
+) -> Iterator[str]:
     """
-    Extract text from a PDF file using pdfplumber.
-    Accepts either a file path (str) or bytes.
+    Yield the text of a PDF one page at a time, with bounded memory.
+    Each page's layout cache is released as soon as its text is extracted,
+    and pages beyond max_pages are never loaded.
+
+    Args:
+        file_input: File path (str) or bytes
+        max_pages: Stop after this many pages
+        max_words: Stop once at least this many words have been yielded
+        pages: Only read these 1-based page numbers (overrides max_pages)
+
+    Yields:
+        Stripped text of each non-empty page
     """
-    from io import BytesIO
+    if pages is None and max_pages:
+        pages = range(1, max_pages + 1)
 
-    text_parts = []
+    with _open_pdf(file_input, pages=pages) as pdf:
+        yield from _pdf_page_texts(pdf, max_words)
 
-    if isinstance(file_input, bytes):
-        pdf_file = BytesIO(file_input)
-    else:
-        pdf_file = file_input
 
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
+def _pdf_page_texts(pdf, max_words: Optional[int] = None) -> Iterator[str]:
+    """Stripped text of each non-empty page of an open PDF (see iter_pdf_pages)."""
+    words = 0
+    for page in pdf.pages:
+        try:
             page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text.strip())
+        finally:
+            page.close()
 
-    return '\n\n'.join(text_parts)
+        if page_text:
+            page_text = page_text.strip()
+            yield page_text
+            words += len(page_text.split())
 
+        if max_words and words >= max_words:
+            return
 
-def parse_html(file_input) -> str:
-    """
-    Extract text from an HTML file, stripping tags and preserving structure.
-    Accepts either a file path (str) or bytes.
-    """
-    from io import BytesIO
 
-    if isinstance(file_input, bytes):
-        html_content = file_input.decode('utf-8', errors='ignore')
-    else:
-        with open(file_input, 'r', encoding='utf-8', errors='ignore') as f:
-            html_content = f.read()
+# The PDF a page-range worker process extracts from (set by _init_pdf_worker)
+_worker_pdf_input = None
 
-    # Remove script and style elements
-    html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-    html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
 
-    # Replace block-level elements with newlines
-    html_content = re.sub(r'</?(p|div|br|h[1-6]|article|section|blockquote|li)[^>]*>', '\n', html_content, flags=re.IGNORECASE)
+def _init_pdf_worker(file_input) -> None:
+    """Pool initializer: hand the PDF (path or bytes) to the worker once."""
+    global _worker_pdf_input
+    _worker_pdf_input = file_input
 
-    # Remove all remaining HTML tags
-    text = re.sub(r'<[^>]+>', '', html_content)
 
-    # Decode HTML entities
-    import html
-    text = html.unescape(text)
+def _pdf_page_range_text(first: int, last: int) -> list[str]:
+    """
+    Text of pages first..last (1-based, inclusive) of the worker's PDF.
+    Runs inside a worker process, so it must stay a module-level function.
+    """
+    return list(iter_pdf_pages(_worker_pdf_input, pages=range(first, last + 1)))
 
-    # Clean up whitespace
-    lines = [line.strip() for line in text.split('\n')]
-    paragraphs = []
-    current_para = []
 
-    for line in lines:
-        if line:
-            current_para.append(line)
-        elif current_para:
-            paragraphs.append(' '.join(current_para))
-            current_para = []
+def _pdf_page_ranges(page_count: int, workers: int) -> list[tuple[int, int]]:
+    """Split 1..page_count into contiguous ranges, a few per worker for balance."""
+    parts = min(page_count, workers * 3)
+    bounds = [round(i * page_count / parts) for i in range(parts + 1)]
+    return [(bounds[i] + 1, bounds[i + 1]) for i in range(parts)]
 
-    if current_para:
-        paragraphs.append(' '.join(current_para))
 
-    return '\n\n'.join(paragraphs)
+def parse_pdf(
+    file_input,
+    max_pages: Optional[int] = None,
+    max_words: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    parallel_min_pages: Optional[int] = None,
+) -> str:
+    """
+    Extract text from a PDF file using pdfplumber.
+    Accepts either a file path (str) or bytes; see iter_pdf_pages for the
+    optional page / word budget.
 
+    Without a budget, PDFs of at least parallel_min_pages pages (default
+    PDF_PARALLEL_MIN_PAGES) have their page ranges extracted across
+    max_workers processes (default DEFAULT_INGEST_WORKERS) and joined back
+    in page order. The output is the same either way.
+    """
+    if parallel_min_pages is None:
+        parallel_min_pages = PDF_PARALLEL_MIN_PAGES
+    workers = max_workers or DEFAULT_INGEST_WORKERS
+
+    if (
+        _PDF_PAGE_SPLITTING
+        and parallel_min_pages > 0
+        and workers > 1
+        and max_pages is None
+        and max_words is None
+        and isinstance(file_input, (str, Path, bytes))
+    ):
+        with _open_pdf(file_input) as pdf:
+            page_count = len(pdf.pages)
+            if page_count < parallel_min_pages:
+                # Small PDFs (the usual case) are read from this same handle
+                return '\n\n'.join(_pdf_page_texts(pdf))
+        ranges = _pdf_page_ranges(page_count, workers)
+        # The PDF goes to each worker once, not with every range
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(ranges)),
+            initializer=_init_pdf_worker,
+            initargs=(file_input,),
+        ) as pool:
+            parts = pool.map(_pdf_page_range_text, *zip(*ranges))
+            return '\n\n'.join(text for part in parts for text in part)
+
+    return '\n\n'.join(iter_pdf_pages(file_input, max_pages=max_pages, max_words=max_words))
+
+
+# One pass over the markup: a script/style element or a comment (dropped
+# with its contents), a block-level tag (captured, becomes a line break)
+# or any other tag (dropped).
+_HTML_TOKEN_RE = re.compile(
+    r'<(?:(/?(?i:p|div|br|h[1-6]|article|section|blockquote|li|pre)\b)[^>]*>'
+    r'|(?i:script\b[^>]*>[^<]*(?:<(?!/script\s*>)[^<]*)*</script\s*>)'
+    r'|(?i:style\b[^>]*>[^<]*(?:<(?!/style\s*>)[^<]*)*</style\s*>)'
+    r'|(?s:!--.*?-->)'
+    r'|[^>]+>)'
+)
+# Starts of markup a chunk must not be split inside: a comment, or a
+# script/style tag (group 1 is '/' for a closing tag)
+_HTML_HELD_RE = re.compile(r'<!--|<(/?)(?:script|style)\b', re.IGNORECASE)
+_BLANK_LINE_RE = re.compile(r'\n\s*\n')
+# Maps the captured block-tag group to its replacement (None = other token)
+_TOKEN_BREAKS = {None: ''}
+
+
+class HTMLTextExtractor:
+    """
+    Incremental HTML-to-paragraphs extractor.
 
-def parse_doc(file_input) -> str:
+    Feed markup in chunks of any size; each call returns the paragraphs
+    completed so far. Script and style contents are dropped, block-level
+    tags start a new line, and a blank line ends a paragraph (lines within
+    a paragraph are joined with spaces).
     """
-    Extract text from an old-style .doc file using macOS textutil.
-    Accepts either a file path (str) or bytes.
+
+    def __init__(self):
+        self._pending = ''  # unprocessed markup (may end mid-tag)
+        self._carry = ''    # text of the paragraph still being built
+
+    def feed(self, markup: str) -> list[str]:
+        """Add a chunk of markup and return any newly completed paragraphs."""
+        buffer = self._pending + markup
+
+        # Only process up to the last tag start, and never split a
+        # script/style element or a comment, so tokens and entities stay
+        # whole.
+        cut = buffer.rfind('<')
+        if cut == -1:
+            self._pending = buffer
+            return []
+        held, pos = None, 0
+        while match := _HTML_HELD_RE.search(buffer, pos, cut):
+            pos = match.end()
+            if match.group(1):
+                held = None
+            elif held is not None:
+                continue  # inside script/style, a comment is just content
+            elif match.group(1) is not None:
+                held = match.start()
+            else:
+                # A comment: skip it if it ends before the cut
+                end = buffer.find('-->', pos, cut)
+                if end == -1:
+                    held = match.start()
+                    break
+                pos = end + 3
+        if held is not None:
+            cut = held
+
+        self._pending = buffer[cut:]
+        return self._emit(buffer[:cut], final=False)
+
+    def close(self) -> list[str]:
+        """Flush remaining markup and return the final paragraphs."""
+        buffer, self._pending = self._pending, ''
+        return self._emit(buffer, final=True)
+
+    def _emit(self, markup: str, final: bool) -> list[str]:
+        import html
+
+        # split() interleaves text with the captured group; swap each
+        # captured block tag for a newline and every other token for ''
+        parts = _HTML_TOKEN_RE.split(markup)
+        parts[1::2] = map(_TOKEN_BREAKS.get, parts[1::2], repeat('\n'))
+        text = ''.join(parts)
+        if '&' in text:
+            text = html.unescape(text)
+
+        blocks = _BLANK_LINE_RE.split(self._carry + text)
+        # The last block may continue in the next chunk
+        self._carry = '' if final else blocks.pop()
+
+        paragraphs = []
+        for block in blocks:
+            block = block.strip()
+            if not block:
+                continue
+            if '\n' in block:
+                block = ' '.join(line.strip() for line in block.split('\n'))
+            paragraphs.append(block)
+        return paragraphs
+
+
+def iter_html_paragraphs(file_input, chunk_size: int = 1 << 20) -> Iterator[str]:
     """
-    from io import BytesIO
+    Yield the paragraphs of an HTML document in a single streaming pass.
 
-    if isinstance(file_input, bytes):
-        # Write bytes to a temporary file
-        with tempfile.NamedTemporaryFile(suffix='.doc', delete=False) as tmp:
-            tmp.write(file_input)
-            tmp_path = tmp.name
+    Args:
+        file_input: File path (str), bytes, or a binary / text file object
+        chunk_size: Characters read per chunk from paths and file objects
 
-        try:
-            result = subprocess.run(
-                ['textutil', '-convert', 'txt', '-stdout', tmp_path],
-                capture_output=True,
-                text=True
-            )
-            return result.stdout.strip()
-        finally:
-            os.unlink(tmp_path)
+    Yields:
+        Paragraph text with tags removed and entities decoded
+    """
+    import codecs
+
+    extractor = HTMLTextExtractor()
+
+    if isinstance(file_input, (bytes, bytearray, memoryview)):
+        markup = bytes(file_input).decode('utf-8', errors='ignore')
+        # Chunking keeps the intermediate strings small and cache-friendly
+        for start in range(0, len(markup), chunk_size):
+            yield from extractor.feed(markup[start:start + chunk_size])
+        yield from extractor.close()
+        return
+
+    if isinstance(file_input, (str, Path)):
+        stream = open(file_input, 'r', encoding='utf-8', errors='ignore')
     else:
-        result = subprocess.run(
-            ['textutil', '-convert', 'txt', '-stdout', file_input],
-            capture_output=True,
-            text=True
-        )
-        return result.stdout.strip()
+        stream = file_input
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk)
+            yield from extractor.feed(chunk)
+        yield from extractor.feed(decoder.decode(b'', final=True))
+        yield from extractor.close()
+    finally:
+        if stream is not file_input:
+            stream.close()
 
 
-def parse_document_bytes(filename: str, file_bytes: bytes) -> dict:
+def parse_html(file_input) -> str:
     """
-    Parse a document from bytes (for Streamlit uploads / Supabase).
+    Extract text from an HTML file, stripping tags and preserving structure.
+    Accepts a file path (str), bytes or a file object.
+    """
+    return '\n\n'.join(iter_html_paragraphs(file_input))
 
-    Returns:
-        dict with keys: filename, doc_type, full_text, paragraphs, word_count
+
+def parse_doc(file_input) -> str:
     """
-    extension = Path(filename).suffix.lower()
+    Extract text from an old-style Word 97-2003 .doc file.
+    Accepts a file path (str), bytes or a memoryview; read in-process, with
+    no temp file or external converter.
+    """
+    if isinstance(file_input, (bytes, bytearray, memoryview)):
+        return extract_doc_text(file_input)
 
+    with open(file_input, 'rb') as f:
+        return extract_doc_text(f.read())
+
+
+def _extract_text_bytes(extension: str, file_bytes: bytes) -> str:
+    """Run the extractor for extension over file_bytes."""
     if extension == '.docx':
         full_text = parse_docx(file_bytes)
     elif extension == '.pdf':
@@ -174,23 +495,46 @@ def parse_document_bytes(filename: str, file_bytes: bytes) -> dict:
     else:
         raise ValueError(f"Unsupported file type: {extension}")
 
-    paragraphs = [p.strip() for p in full_text.split('\n\n') if p.strip()]
+    return full_text
 
-    return {
-        'filename': filename,
-        'doc_type': detect_document_type(filename),
-        'full_text': full_text,
-        'paragraphs': paragraphs,
-        'word_count': len(full_text.split()),
-    }
 
+def parse_document_bytes(filename: str, file_bytes: bytes, use_cache: bool = True) -> ParsedDocument:
+    """
+    Parse a document from bytes (for Streamlit uploads / Supabase).
+
+    Extracted text is looked up in the parse cache by content hash first,
+    so a repeat upload of the same file skips extraction.
 
-def parse_document(file_path: str) -> dict:
+    Returns:
+        ParsedDocument, readable as a dict with keys: filename, doc_type,
+        full_text, paragraphs, word_count
+    """
+    extension = Path(filename).suffix.lower()
+
+    if use_cache:
+        cache = get_parse_cache()
+        key = content_key(file_bytes, extension, PARSER_VERSION)
+        full_text = cache.get(key)
+        if full_text is None:
+            full_text = _extract_text_bytes(extension, file_bytes)
+            cache.put(key, full_text)
+    else:
+        full_text = _extract_text_bytes(extension, file_bytes)
+
+    return _document_from_text(filename, full_text)
+
+
+def _document_from_text(filename: str, full_text: str) -> ParsedDocument:
+    """Build the parsed document for an uploaded file's text."""
+    return ParsedDocument(filename, detect_document_type(filename), full_text)
+
+
+def parse_document(file_path: str) -> ParsedDocument:
     """
     Parse a document and return structured data.
 
     Returns:
-        dict with keys:
+        ParsedDocument, readable as a dict with keys:
             - filename: str
             - file_path: str
             - doc_type: str ('press_release', 'bio', 'collection_overview', 'general')
@@ -214,120 +558,378 @@ def parse_document(file_path: str) -> dict:
     else:
         raise ValueError(f"Unsupported file type: {extension}")
 
-    # Split into paragraphs
-    paragraphs = [p.strip() for p in full_text.split('\n\n') if p.strip()]
+    return ParsedDocument(
+        filename,
+        detect_document_type(filename),
+        full_text,
+        file_path=str(path.absolute()),
+    )
 
-    # Count words
-    word_count = len(full_text.split())
 
-    return {
-        'filename': filename,
-        'file_path': str(path.absolute()),
-        'doc_type': detect_document_type(filename),
-        'full_text': full_text,
-        'paragraphs': paragraphs,
-        'word_count': word_count
-    }
-
-
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
+def iter_chunk_spans(text: str, chunk_size: int = 500, overlap: int = 50) -> Iterator[tuple[int, int]]:
     """
-    Split text into overlapping chunks for embedding.
+    Lazily split text into overlapping chunks, yielding (start, end) offsets
+    into the original string instead of copies.
+
+    Chunks prefer to end at a paragraph break, then a sentence break, as long
+    as that keeps them over half of chunk_size. Spans exclude the surrounding
+    whitespace, and whitespace-only chunks are skipped.
 
     Args:
         text: The text to chunk
         chunk_size: Target size of each chunk in characters
         overlap: Number of characters to overlap between chunks
 
-    Returns:
-        List of text chunks
+    Yields:
+        (start, end) such that text[start:end] is the chunk
     """
-    if len(text) <= chunk_size:
-        return [text]
+    length = len(text)
+    if length <= chunk_size:
+        yield 0, length
+        return
 
-    chunks = []
+    rfind = text.rfind
+    min_offset = chunk_size // 2
     start = 0
 
-    while start < len(text):
+    while start < length:
         end = start + chunk_size
 
-        # Try to break at a sentence or paragraph boundary
-        if end < len(text):
-            # Look for paragraph break first
-            para_break = text.rfind('\n\n', start, end)
-            if para_break > start + chunk_size // 2:
+        if end < length:
+            # Only breaks past the halfway point count, so search just there
+            floor = start + min_offset + 1
+            para_break = rfind('\n\n', floor, end)
+            if para_break != -1:
                 end = para_break
             else:
-                # Look for sentence break
                 sentence_break = max(
-                    text.rfind('. ', start, end),
-                    text.rfind('! ', start, end),
-                    text.rfind('? ', start, end)
+                    rfind('. ', floor, end),
+                    rfind('! ', floor, end),
+                    rfind('? ', floor, end),
                 )
-                if sentence_break > start + chunk_size // 2:
+                if sentence_break != -1:
                     end = sentence_break + 1
 
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
+        span_start, span_end = start, min(end, length)
+        while span_start < span_end and text[span_start].isspace():
+            span_start += 1
+        while span_end > span_start and text[span_end - 1].isspace():
+            span_end -= 1
+        if span_start < span_end:
+            yield span_start, span_end
+
+        # Always move forward, even if overlap exceeds the chunk just taken
+        start = max(end - overlap, start + 1) if end < length else length
 
-        start = end - overlap if end < len(text) else len(text)
 
-    return chunks
+def iter_chunks(text: str, chunk_size: int = 500, overlap: int = 50) -> Iterator[str]:
+    """Lazily yield chunk strings; see iter_chunk_spans for the rules."""
+    for start, end in iter_chunk_spans(text, chunk_size, overlap):
+        yield text[start:end]
 
 
-def load_all_documents(directory: str) -> list[dict]:
+def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
     """
-    Load and parse all supported documents from a directory.
+    Split text into overlapping chunks for embedding.
+
+    Args:
+        text: The text to chunk
+        chunk_size: Target size of each chunk in characters
+        overlap: Number of characters to overlap between chunks
+
+    Returns:
+        List of text chunks
+    """
+    return list(iter_chunks(text, chunk_size, overlap))
+
+
+def _parse_batch_item(index: int, item, use_cache: bool = True) -> dict:
+    """
+    Parse one batch item, capturing any error instead of raising.
+    Runs inside a worker process, so it must stay a module-level function.
+    """
+    if isinstance(item, tuple):
+        filename, file_bytes = item
+    else:
+        filename, file_bytes = Path(item).name, None
+
+    try:
+        if file_bytes is None:
+            document = parse_document(str(item))
+        else:
+            document = parse_document_bytes(filename, file_bytes, use_cache=use_cache)
+        return {'index': index, 'filename': filename, 'document': document, 'error': None}
+    except Exception as e:
+        return {'index': index, 'filename': filename, 'document': None, 'error': str(e)}
+
+
+def parse_documents_batch(
+    items: Iterable,
+    max_workers: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Parse many documents across a process pool, yielding each as it finishes.
+
+    Args:
+        items: File paths (str / Path) or (filename, file_bytes) tuples
+        max_workers: Number of worker processes (default DEFAULT_INGEST_WORKERS).
+            With one worker, or a single item, files are parsed in-process.
+
+    Yields:
+        dict with keys: index (position in items), filename,
+        document (parsed dict, or None on failure), error (str or None).
+        Results arrive in completion order, not input order; parse cache
+        hits are yielded first.
+    """
+    items = list(items)
+    workers = max_workers or DEFAULT_INGEST_WORKERS
+
+    # Serve byte items from the parse cache before dispatching to the pool;
+    # workers then skip the cache and the parent stores their results.
+    cache = get_parse_cache()
+    pending = []
+    for index, item in enumerate(items):
+        if isinstance(item, tuple):
+            filename, file_bytes = item
+            extension = Path(filename).suffix.lower()
+            full_text = cache.get(content_key(file_bytes, extension, PARSER_VERSION))
+            if full_text is not None:
+                document = _document_from_text(filename, full_text)
+                yield {'index': index, 'filename': filename, 'document': document, 'error': None}
+                continue
+        pending.append((index, item))
+
+    workers = min(workers, len(pending))
+    if workers <= 1:
+        results = (_parse_batch_item(index, item, False) for index, item in pending)
+        for result in results:
+            _cache_batch_result(cache, items[result['index']], result)
+            yield result
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_disable_pdf_page_splitting) as pool:
+        futures = [
+            pool.submit(_parse_batch_item, index, item, False)
+            for index, item in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            _cache_batch_result(cache, items[result['index']], result)
+            yield result
+
+
+def _disable_pdf_page_splitting() -> None:
+    """Pool initializer: don't start nested pools for large PDFs."""
+    global _PDF_PAGE_SPLITTING
+    _PDF_PAGE_SPLITTING = False
+
+
+def _cache_batch_result(cache, item, result: dict) -> None:
+    """Store a freshly parsed upload's text in the parse cache."""
+    if result['document'] is None or not isinstance(item, tuple):
+        return
+    extension = Path(result['filename']).suffix.lower()
+    key = content_key(item[1], extension, PARSER_VERSION)
+    cache.put(key, result['document']['full_text'])
+
+
+def collapse_near_duplicates(
+    documents: list[dict],
+    threshold: float = DEFAULT_THRESHOLD,
+    signatures: Optional[dict] = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Drop near-duplicate documents (MinHash / LSH, see src.dedupe), keeping
+    the longest version of each.
+
+    Args:
+        documents: Dicts with filename and full_text (and optionally id)
+        threshold: Estimated Jaccard similarity at which two documents are
+            treated as duplicates
+        signatures: Precomputed MinHash signatures keyed by document id,
+            e.g. ArtistDuplicateIndex.signatures(); others are computed
+
+    Returns:
+        (kept documents in their original order,
+         list of dicts with filename, duplicate_of and similarity)
+    """
+    signatures = signatures or {}
+    index = LSHIndex(threshold)
+    kept, duplicates = [], []
+
+    by_length = sorted(range(len(documents)), key=lambda i: -len(documents[i]['full_text']))
+    for i in by_length:
+        doc = documents[i]
+        signature = signatures.get(str(doc.get('id'))) or minhash_signature(doc['full_text'])
+        matches = index.query(signature)
+        if matches:
+            original, similarity = matches[0]
+            duplicates.append({
+                'filename': doc['filename'],
+                'duplicate_of': documents[int(original)]['filename'],
+                'similarity': similarity,
+            })
+        else:
+            index.add(str(i), signature)
+            kept.append(i)
+
+    return [documents[i] for i in sorted(kept)], duplicates
+
+
+# Extensions picked up when loading a whole directory
+_DIRECTORY_EXTENSIONS = {'.docx', '.pdf', '.html', '.htm', '.doc'}
+
+
+def _scan_directory(directory: str) -> dict[str, tuple[int, int]]:
+    """Map each supported file's absolute path to (size, mtime_ns), in one scandir pass."""
+    base = Path(directory).absolute()
+    found = {}
+    with os.scandir(base) as entries:
+        for entry in entries:
+            if Path(entry.name).suffix.lower() in _DIRECTORY_EXTENSIONS and entry.is_file():
+                stat = entry.stat()
+                found[str(base / entry.name)] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+def rescan_documents(
+    directory: str,
+    cache_dir: str,
+    max_workers: Optional[int] = None,
+) -> dict:
+    """
+    Incrementally re-sync a directory against the processed document store.
+
+    The directory is stat'ed and compared with the sizes / mtimes recorded
+    on the last run: only new or changed files are parsed, unchanged files
+    come back from the store, and deleted files are dropped from it. Files
+    stored by an older PARSER_VERSION count as changed.
 
     Args:
         directory: Path to directory containing documents
+        cache_dir: Directory holding the document store
+        max_workers: Worker processes for parsing new / changed files
 
     Returns:
-        List of parsed document dictionaries
+        dict with keys:
+            - documents: list[dict], every current document, in path order
+            - new, changed, unchanged, deleted: list[str] of absolute paths
+            - errors: dict of path -> error message for files that failed to parse
     """
-    documents = []
-    supported_extensions = {'.docx', '.pdf', '.html', '.htm', '.doc'}
+    current = _scan_directory(directory)
+    base = str(Path(directory).absolute())
+
+    store = ProcessedDocumentStore(cache_dir, PARSER_VERSION)
+    known = {
+        path: signature for path, signature in store.signatures().items()
+        if os.path.dirname(path) == base
+    }
 
-    for file_path in Path(directory).iterdir():
-        if file_path.suffix.lower() in supported_extensions:
-            try:
-                doc = parse_document(str(file_path))
-                documents.append(doc)
-                print(f"Parsed: {file_path.name} ({doc['word_count']} words)")
-            except Exception as e:
-                print(f"Error parsing {file_path.name}: {e}")
+    new = sorted(p for p in current if p not in known)
+    changed = sorted(p for p in current if p in known and known[p] != current[p])
+    unchanged = sorted(p for p in current if p in known and known[p] == current[p])
+    deleted = sorted(p for p in known if p not in current)
 
-    return documents
+    if deleted:
+        store.invalidate(*deleted)
 
+    to_parse = new + changed
+    parsed, errors = [], {}
+    for result in parse_documents_batch(to_parse, max_workers=max_workers):
+        path = to_parse[result['index']]
+        if result['error']:
+            errors[path] = result['error']
+        else:
+            parsed.append(result['document'])
+    if parsed:
+        store.put_many(parsed, [current[doc['file_path']] for doc in parsed])
 
-def save_processed_documents(documents: list[dict], output_dir: str) -> str:
+    documents = store.load(unchanged) + parsed
+    documents.sort(key=lambda doc: doc['file_path'])
+
+    return {
+        'documents': documents,
+        'new': new,
+        'changed': changed,
+        'unchanged': unchanged,
+        'deleted': deleted,
+        'errors': errors,
+    }
+
+
+def load_all_documents(
+    directory: str,
+    max_workers: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+) -> list[dict]:
     """
-    Save processed documents to JSON for caching.
+    Load and parse all supported documents from a directory.
+
+    Args:
+        directory: Path to directory containing documents
+        max_workers: Worker processes to parse with (see parse_documents_batch)
+        cache_dir: If given, rescan incrementally against the document store
+            there, parsing only new or changed files (see rescan_documents)
 
     Returns:
-        Path to the saved file
+        List of parsed document dictionaries, in directory order
     """
-    output_path = Path(output_dir) / 'processed_documents.json'
+    if cache_dir:
+        result = rescan_documents(directory, cache_dir, max_workers=max_workers)
+        for path, error in result['errors'].items():
+            print(f"Error parsing {Path(path).name}: {error}")
+        print(
+            f"Rescanned: {len(result['new'])} new, {len(result['changed'])} changed, "
+            f"{len(result['unchanged'])} unchanged, {len(result['deleted'])} deleted"
+        )
+        return result['documents']
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(documents, f, indent=2, ensure_ascii=False)
+    paths = sorted(_scan_directory(directory))
 
-    return str(output_path)
+    parsed = {}
+    for result in parse_documents_batch(paths, max_workers=max_workers):
+        if result['error']:
+            print(f"Error parsing {result['filename']}: {result['error']}")
+        else:
+            doc = result['document']
+            parsed[result['index']] = doc
+            print(f"Parsed: {result['filename']} ({doc['word_count']} words)")
+
+    return [parsed[i] for i in sorted(parsed)]
+
+
+def save_processed_documents(documents: list[dict], output_dir: str) -> str:
+    """
+    Save processed documents to the incremental document store for caching.
+    Only the given documents' rows are written; others are left untouched.
+
+    Returns:
+        Path to the store's database file
+    """
+    store = ProcessedDocumentStore(output_dir, PARSER_VERSION)
+    store.put_many(documents)
+    return str(store.db_path)
 
 
 def load_processed_documents(output_dir: str) -> Optional[list[dict]]:
     """
     Load previously processed documents from cache.
+    A legacy processed_documents.json is migrated into the store on first use.
 
     Returns:
         List of documents if cache exists, None otherwise
     """
-    cache_path = Path(output_dir) / 'processed_documents.json'
+    store = ProcessedDocumentStore(output_dir, PARSER_VERSION)
+    legacy_path = Path(output_dir) / 'processed_documents.json'
+
+    if not store.exists() and legacy_path.exists():
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        # No recorded size / mtime, so these never count as current in get()
+        store.put_many(legacy, [(None, None)] * len(legacy))
 
-    if cache_path.exists():
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    if store.exists():
+        return store.load_all()
 
     return None
 
@@ -0,0 +1,187 @@
+"""
+Processed Document Store
+Incremental on-disk cache of parsed documents, one SQLite row per source
+file keyed on path, size and mtime. A single document can be loaded,
+updated or invalidated without rewriting the others.
+"""
+
+import os
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .parsed_document import ParsedDocument
+
+DB_FILENAME = 'processed_documents.db'
+
+
+def file_signature(file_path: str) -> Optional[tuple[int, int]]:
+    """(size, mtime_ns) for a file, or None if it can't be stat'ed."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _row_to_document(row: sqlite3.Row) -> ParsedDocument:
+    return ParsedDocument(
+        row['filename'],
+        row['doc_type'],
+        zlib.decompress(row['text']).decode('utf-8'),
+        file_path=row['file_path'],
+        word_count=row['word_count'],
+    )
+
+
+class ProcessedDocumentStore:
+    """
+    SQLite-backed store of parsed documents for one output directory.
+
+    Rows carry the source file's size and mtime plus the parser version,
+    so get() only returns a document that is still current.
+    """
+
+    def __init__(self, output_dir: str, parser_version: str):
+        self.db_path = Path(output_dir) / DB_FILENAME
+        self.parser_version = parser_version
+
+    def exists(self) -> bool:
+        return self.db_path.exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (one per call, like local_storage)."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                file_path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                parser_version TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                doc_type TEXT NOT NULL,
+                word_count INTEGER NOT NULL,
+                text BLOB NOT NULL
+            )
+            """
+        )
+        return conn
+
+    # --- Single documents ---
+
+    def get(self, file_path: str, signature: Optional[tuple[int, int]] = None) -> Optional[dict]:
+        """
+        Return the stored document for file_path if it matches the file's
+        current size / mtime (or the given signature) and parser version.
+        """
+        signature = signature or file_signature(file_path)
+        if signature is None:
+            return None
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM documents WHERE file_path = ? AND size = ? "
+                "AND mtime_ns = ? AND parser_version = ?",
+                (str(file_path), signature[0], signature[1], self.parser_version),
+            ).fetchone()
+            return _row_to_document(row) if row else None
+        finally:
+            conn.close()
+
+    def put(self, document: dict, signature: Optional[tuple[int, int]] = None) -> None:
+        """Insert or replace one document (keyed on its file_path)."""
+        self.put_many([document], [signature])
+
+    def put_many(
+        self,
+        documents: Iterable[dict],
+        signatures: Optional[Iterable[Optional[tuple[int, int]]]] = None,
+    ) -> None:
+        """
+        Insert or replace several documents in one transaction. Signatures
+        default to a fresh stat of each document's file_path.
+        """
+        documents = list(documents)
+        signatures = list(signatures) if signatures is not None else [None] * len(documents)
+
+        rows = []
+        for doc, signature in zip(documents, signatures):
+            key = doc.get('file_path') or doc['filename']
+            size, mtime_ns = signature or file_signature(key) or (None, None)
+            rows.append((
+                key, size, mtime_ns, self.parser_version, doc['filename'],
+                doc['doc_type'], doc['word_count'],
+                zlib.compress(doc['full_text'].encode('utf-8')),
+            ))
+
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO documents "
+                "(file_path, size, mtime_ns, parser_version, filename, doc_type, word_count, text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def invalidate(self, *file_paths: str) -> None:
+        """Remove documents from the store."""
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "DELETE FROM documents WHERE file_path = ?",
+                [(str(p),) for p in file_paths],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- Whole store ---
+
+    def signatures(self) -> dict[str, Optional[tuple[int, int]]]:
+        """
+        Map of every stored file_path to its (size, mtime_ns), or None for
+        rows written by another parser version, which match no file and so
+        read as changed (or deleted, once the file is gone).
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT file_path, size, mtime_ns, parser_version FROM documents").fetchall()
+            return {
+                r['file_path']: (r['size'], r['mtime_ns']) if r['parser_version'] == self.parser_version else None
+                for r in rows
+            }
+        finally:
+            conn.close()
+
+    def load(self, file_paths: Iterable[str]) -> list[dict]:
+        """Load the given documents (in one query), skipping unknown paths."""
+        file_paths = [str(p) for p in file_paths]
+        if not file_paths:
+            return []
+        conn = self._connect()
+        try:
+            conn.execute("CREATE TEMP TABLE wanted (file_path TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", [(p,) for p in file_paths])
+            rows = conn.execute(
+                "SELECT documents.* FROM documents JOIN wanted USING (file_path)"
+            ).fetchall()
+            by_path = {r['file_path']: _row_to_document(r) for r in rows}
+            return [by_path[p] for p in file_paths if p in by_path]
+        finally:
+            conn.close()
+
+    def load_all(self) -> list[dict]:
+        """Every stored document, ordered by path."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT * FROM documents ORDER BY file_path").fetchall()
+            return [_row_to_document(r) for r in rows]
+        finally:
+            conn.close()
@@ -0,0 +1,300 @@
+"""
+Exemplar Index
+BM25 search over passages of an artist's own documents, so generation can
+show the model a few real passages in the artist's voice next to the
+abstract style guide. Documents are split with chunk_text; each chunk's
+term counts are stored in a per-artist SQLite file, so adding or removing
+a document only tokenises that document. Queries run in memory against a
+NumPy posting-list matrix built from the stored counts, with no network
+calls.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .document_parser import chunk_text
+
+DEFAULT_INDEX_DIR = Path(
+    os.getenv('COPYWRITER_EXEMPLAR_DIR')
+    or Path(__file__).resolve().parent.parent / 'cache' / 'exemplars'
+)
+
+# Passages returned per brief
+DEFAULT_EXEMPLARS = int(os.getenv('COPYWRITER_EXEMPLARS', '3'))
+
+# Passage size in characters, as passed to chunk_text
+EXEMPLAR_CHUNK_SIZE = 600
+EXEMPLAR_CHUNK_OVERLAP = 0
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _term_hash(term: str) -> int:
+    """Signed 64-bit hash of a term (what the index stores instead of the word)."""
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+
+def term_counts(text: str) -> Counter:
+    """Term hash counts for a passage or query (lower-cased words)."""
+    return Counter(_term_hash(word) for word in _WORD_RE.findall(text.lower()))
+
+
+class _Postings:
+    """
+    Term-major BM25 weights for every passage: the postings of vocab[t]
+    are chunk[indptr[t]:indptr[t + 1]] with precomputed weight[...]
+    (idf times the length-normalised term frequency), so a query only
+    adds up the slices for its own terms.
+    """
+
+    def __init__(self, rows: list[sqlite3.Row]):
+        self.doc_ids = [r['doc_id'] for r in rows]
+        self.filenames = [r['filename'] for r in rows]
+        self.texts = [r['text'] for r in rows]
+        n = len(rows)
+        terms = [np.frombuffer(r['terms'], dtype=np.int64) for r in rows]
+        counts = [np.frombuffer(r['counts'], dtype=np.int32) for r in rows]
+        lengths = np.array([r['length'] for r in rows], dtype=np.float32)
+
+        all_terms = np.concatenate(terms) if n else np.zeros(0, np.int64)
+        all_counts = np.concatenate(counts).astype(np.float32) if n else np.zeros(0, np.float32)
+        chunk = np.repeat(np.arange(n, dtype=np.int32), [len(t) for t in terms])
+
+        self.vocab, term_ids = np.unique(all_terms, return_inverse=True)
+        order = np.argsort(term_ids, kind='stable')
+        self.chunk = chunk[order]
+        df = np.bincount(term_ids, minlength=len(self.vocab))
+        self.indptr = np.concatenate([[0], np.cumsum(df)])
+
+        # Lucene's idf, which stays positive for terms in most passages
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        tf = all_counts[order]
+        average_length = max(float(lengths.mean()), 1.0) if n else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[self.chunk] / average_length)
+        self.weight = np.repeat(idf, df) * tf * (BM25_K1 + 1) / (tf + norm)
+
+    def scores(self, query: Counter) -> np.ndarray:
+        scores = np.zeros(len(self.texts), dtype=np.float32)
+        if not len(self.vocab):
+            return scores
+        hashes = np.fromiter(query.keys(), dtype=np.int64, count=len(query))
+        positions = np.searchsorted(self.vocab, hashes)
+        for position, term_hash, count in zip(positions, hashes, query.values()):
+            if position < len(self.vocab) and self.vocab[position] == term_hash:
+                start, end = self.indptr[position], self.indptr[position + 1]
+                # A term appears once per passage, so the indices are unique
+                scores[self.chunk[start:end]] += count * self.weight[start:end]
+        return scores
+
+
+# Postings loaded per index file, with the generation they were built at
+_loaded: dict[Path, tuple[int, _Postings]] = {}
+_loaded_lock = threading.Lock()
+
+
+class ArtistExemplarIndex:
+    """
+    Persistent BM25 passage index for one artist's documents.
+
+    Passages and their term counts live in <index_dir>/<artist_id>.db;
+    add(), remove() and sync() only touch the documents that changed.
+
+    Args:
+        artist_id: Artist whose documents are indexed
+        index_dir: Where the index file lives (default DEFAULT_INDEX_DIR)
+    """
+
+    def __init__(self, artist_id: str, index_dir: Optional[Path] = None):
+        index_dir = Path(index_dir or DEFAULT_INDEX_DIR)
+        safe_id = re.sub(r'[^\w.-]', '_', str(artist_id))
+        self.db_path = index_dir / f'{safe_id}.db'
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (one per call, like local_storage)."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS passages (
+                doc_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                chunk_no INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                terms BLOB NOT NULL,
+                counts BLOB NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (doc_id, chunk_no)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+            """
+        )
+        return conn
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection) -> None:
+        """Mark the index as changed, so loaded postings are rebuilt."""
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+    def doc_ids(self) -> set[str]:
+        conn = self._connect()
+        try:
+            return {r['doc_id'] for r in conn.execute("SELECT DISTINCT doc_id FROM passages")}
+        finally:
+            conn.close()
+
+    def add(self, doc_id: str, filename: str, text: str) -> int:
+        """Index a document's passages (replacing any already indexed); returns how many."""
+        return self._add_documents([(str(doc_id), filename, text)])
+
+    def _add_documents(self, documents: list[tuple[str, str, str]]) -> int:
+        rows = []
+        for doc_id, filename, text in documents:
+            for chunk_no, passage in enumerate(chunk_text(text or '', EXEMPLAR_CHUNK_SIZE, EXEMPLAR_CHUNK_OVERLAP)):
+                counts = term_counts(passage)
+                if not counts:
+                    continue
+                rows.append((
+                    doc_id, filename, chunk_no, passage,
+                    array('q', counts.keys()).tobytes(),
+                    array('i', counts.values()).tobytes(),
+                    sum(counts.values()),
+                ))
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "DELETE FROM passages WHERE doc_id = ?", [(doc_id,) for doc_id, _, _ in documents],
+            )
+            conn.executemany(
+                "INSERT INTO passages (doc_id, filename, chunk_no, text, terms, counts, length) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._bump(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    def remove(self, *doc_ids: str) -> None:
+        conn = self._connect()
+        try:
+            conn.executemany("DELETE FROM passages WHERE doc_id = ?", [(str(d),) for d in doc_ids])
+            self._bump(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def sync(self, documents: Iterable[dict]) -> None:
+        """
+        Bring the index in line with the artist's stored documents
+        (dicts with id, filename, extracted_text): new ones are indexed,
+        removed ones dropped, unchanged ones left alone.
+        """
+        documents = {str(d['id']): d for d in documents}
+        indexed = self.doc_ids()
+        stale = indexed - documents.keys()
+        if stale:
+            self.remove(*stale)
+        missing = [
+            (doc_id, d['filename'], d.get('extracted_text') or '')
+            for doc_id, d in documents.items() if doc_id not in indexed
+        ]
+        if missing:
+            self._add_documents(missing)
+
+    def _postings(self) -> _Postings:
+        """Postings for the current index contents, rebuilt only after a change."""
+        conn = self._connect()
+        try:
+            generation = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+            with _loaded_lock:
+                cached = _loaded.get(self.db_path)
+                if cached and cached[0] == generation:
+                    return cached[1]
+            rows = conn.execute(
+                "SELECT doc_id, filename, text, terms, counts, length FROM passages "
+                "ORDER BY doc_id, chunk_no"
+            ).fetchall()
+        finally:
+            conn.close()
+        postings = _Postings(rows)
+        with _loaded_lock:
+            _loaded[self.db_path] = (generation, postings)
+        return postings
+
+    def search(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        max_per_document: int = 1,
+    ) -> list[dict]:
+        """
+        Passages most relevant to query by BM25.
+
+        Args:
+            query: Text to match (usually the brief)
+            k: Passages to return (default DEFAULT_EXEMPLARS)
+            max_per_document: Passages taken from any one document, so the
+                examples show more than one piece of writing
+
+        Returns:
+            List of dicts with doc_id, filename, text and score, best first;
+            passages sharing no terms with the query are left out
+        """
+        k = DEFAULT_EXEMPLARS if k is None else k
+        postings = self._postings()
+        if k <= 0 or not postings.texts:
+            return []
+        scores = postings.scores(term_counts(query))
+
+        # Rank a few times k first (some documents may be over their quota),
+        # and only sort every passage if that doesn't fill k
+        candidates = min(len(scores), k * max(4, 2 * max_per_document))
+        while True:
+            if candidates < len(scores):
+                top = np.argpartition(-scores, candidates - 1)[:candidates]
+                top = top[np.argsort(-scores[top], kind='stable')]
+            else:
+                top = np.argsort(-scores, kind='stable')
+
+            results, per_document, seen = [], Counter(), set()
+            for i in top:
+                if scores[i] <= 0 or len(results) == k:
+                    break
+                doc_id, text = postings.doc_ids[i], postings.texts[i]
+                if per_document[doc_id] >= max_per_document or text in seen:
+                    continue
+                per_document[doc_id] += 1
+                seen.add(text)
+                results.append({
+                    'doc_id': doc_id,
+                    'filename': postings.filenames[i],
+                    'text': text,
+                    'score': float(scores[i]),
+                })
+            if len(results) == k or candidates >= len(scores) or scores[top[-1]] <= 0:
+                return results
+            candidates = len(scores)
+
+    def stats(self) -> dict:
+        """Documents and passages indexed."""
+        postings = self._postings()
+        return {'documents': len(set(postings.doc_ids)), 'passages': len(postings.texts)}
@@ -2,78 +2,73 @@
 Generator V2 - Style analysis and copy generation.
 """
 
+import asyncio
 import base64
-from openai import OpenAI
-from typing import Optional
-
-
-def encode_image_to_base64(image_bytes: bytes) -> str:
-    """Convert image bytes to base64 string."""
-    return base64.b64encode(image_bytes).decode('utf-8')
-
-
-class StyleAnalyzerV2:
-    """
-    Analyzes documents and produces natural language style guidance.
-    """
-
-    def __init__(self, api_key: str):
-        self.openai = OpenAI(api_key=api_key)
-
-    def analyze(self, documents: list[dict], artist_name: str = "the artist") -> str:
-        """
-        Analyze documents and return a production-ready style system.
-
-        Args:
-            documents: List of document dicts with 'filename' and 'full_text' keys
-            artist_name: Display name of the artist
-
-        Returns:
-            Operational style guide specific to this artist's voice
-        """
-        # Combine all document text
-        combined_text = ""
-        for doc in documents:
-            combined_text += f"\n\n--- {doc['filename']} ---\n"
-            combined_text += doc['full_text']
-
-        system_message = (
-            "You are a senior editorial copywriter and brand-voice strategist "
-            "for a fine art gallery.\n\n"
-            "You do NOT summarise documents. You reverse-engineer how the writing "
-            "works, then turn it into an operational style system that a team "
-            "(and an AI) can reliably reuse.\n\n"
-            "Your job:\n"
-            "1) Identify the unique voice, tone, and persuasion tactics used to "
-            "write about the artist.\n"
-            "2) Extract repeatable structures, phrase patterns, and narrative moves.\n"
-            "3) Produce a practical style guide that can be used to generate new "
-            "copy in the same voice.\n\n"
-            "Constraints:\n"
-            "- Be specific to THIS artist and THIS corpus (no generic "
-            "'art writing' advice).\n"
-            "- Prefer rules and patterns over description.\n"
-            "- Give do/don't rules that are enforceable.\n"
-            "- Include a reusable template and a phrase bank that matches the corpus.\n"
-            "- Include 2 short example paragraphs written in the style "
-            "(not about new facts — just stylistic demonstration).\n"
-            "- If the corpus contains multiple sub-styles (press release vs product "
-            "page vs training notes), describe each and how to switch between them.\n\n"
-            "Write with the same directness as a copy chief giving instructions.\n"
-            "Avoid academic language.\n"
-            "Prefer clear, punchy bullets and short explanations."
-        )
-
-        user_message = f"""Analyse the attached documents about {artist_name} and build a reusable writing style system.
-
-Treat the attached documents as the only source of truth for style cues.
-If different docs conflict, prioritise: press release copy > product copy > training notes.
-
---- DOCUMENTS ---
-{combined_text}
---- END DOCUMENTS ---
-
-Output with these exact headings:
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from openai import AsyncOpenAI
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from .corpus_assembler import (
+    DEFAULT_CORPUS_TOKEN_BUDGET,
+    assemble_corpus,
+    batch_corpus,
+    document_tier,
+    estimate_tokens,
+)
+from .openai_clients import get_openai_client, new_async_openai_client
+from .guide_sections import NO_CHANGES, is_sectioned, merge_guide_update
+from .prompt_layout import layered_messages, usage_tokens
+from .rate_limiter import RequestScheduler, estimate_request_tokens, get_scheduler
+from .response_cache import ResponseCache, request_key
+from .telemetry import CallRecorder, track_call
+from .text_cache import TextCache
+
+# Map-reduce analysis settings. Style notes for each batch are cached on
+# disk (keyed by the whole notes request: model, sampling settings and
+# prompt), so a failed run resumes where it stopped.
+MAP_BATCH_TOKENS = int(os.getenv('COPYWRITER_ANALYSIS_BATCH_TOKENS', '20000'))
+DEFAULT_ANALYSIS_WORKERS = int(os.getenv('COPYWRITER_ANALYSIS_WORKERS', '4'))
+NOTES_CACHE_DIR = Path(
+    os.getenv('COPYWRITER_ANALYSIS_CACHE_DIR')
+    or Path(__file__).resolve().parent.parent / 'cache' / 'analysis'
+)
+
+# How many formats generate_formats() requests at once
+DEFAULT_FORMAT_CONCURRENCY = int(os.getenv('COPYWRITER_FORMAT_CONCURRENCY', '3'))
+
+
+ANALYSIS_SYSTEM_MESSAGE = (
+    "You are a senior editorial copywriter and brand-voice strategist "
+    "for a fine art gallery.\n\n"
+    "You do NOT summarise documents. You reverse-engineer how the writing "
+    "works, then turn it into an operational style system that a team "
+    "(and an AI) can reliably reuse.\n\n"
+    "Your job:\n"
+    "1) Identify the unique voice, tone, and persuasion tactics used to "
+    "write about the artist.\n"
+    "2) Extract repeatable structures, phrase patterns, and narrative moves.\n"
+    "3) Produce a practical style guide that can be used to generate new "
+    "copy in the same voice.\n\n"
+    "Constraints:\n"
+    "- Be specific to THIS artist and THIS corpus (no generic "
+    "'art writing' advice).\n"
+    "- Prefer rules and patterns over description.\n"
+    "- Give do/don't rules that are enforceable.\n"
+    "- Include a reusable template and a phrase bank that matches the corpus.\n"
+    "- Include 2 short example paragraphs written in the style "
+    "(not about new facts — just stylistic demonstration).\n"
+    "- If the corpus contains multiple sub-styles (press release vs product "
+    "page vs training notes), describe each and how to switch between them.\n\n"
+    "Write with the same directness as a copy chief giving instructions.\n"
+    "Avoid academic language.\n"
+    "Prefer clear, punchy bullets and short explanations."
+)
+
+# The nine-section guide format, shared by analyze() and the map-reduce merge
+STYLE_GUIDE_SPEC = """Output with these exact headings:
 
 1) Voice Snapshot (5-8 bullets)
 - What it feels like
@@ -129,17 +124,564 @@ CRITICAL RULES:
 - Everything else (subjects, collections, prices, charity tie-ins, exhibition details) changes with every release and must be provided fresh by the user.
 - When in doubt, use a bracket placeholder rather than a specific fact."""
 
-        response = self.openai.chat.completions.create(
+
+NOTES_SYSTEM_MESSAGE = (
+    "You are a senior editorial copywriter for a fine art gallery, taking "
+    "working notes on how a body of writing works so a colleague can later "
+    "merge them into a style guide.\n\n"
+    "Capture patterns, not content: voice, structure, narrative devices, "
+    "cadence, vocabulary and reusable phrase stems. Use bracket "
+    "placeholders for any specific facts. Be terse: bullets only."
+)
+
+
+def _notes_prompt(artist_name: str, text: str, source: str) -> str:
+    """Map-step prompt: style notes for one batch of documents or of earlier notes."""
+    if source == 'notes':
+        intro = (
+            f"Below are style notes taken from several batches of documents about {artist_name}. "
+            "Consolidate them into one set of notes: merge duplicates, keep every distinct "
+            "pattern, and keep examples of phrasing stems."
+        )
+        label = 'NOTES'
+    else:
+        intro = f"Take style notes on the attached documents about {artist_name}."
+        label = 'DOCUMENTS'
+
+    return f"""{intro}
+
+If different docs conflict, note which kind of document each pattern comes from
+(press release copy > product copy > training notes).
+
+--- {label} ---
+{text}
+--- END {label} ---
+
+Cover, as short bullets (600 words at most):
+- Voice and tone; what it avoids
+- Structural skeleton: how pieces open, develop and close
+- Narrative devices and persuasion tactics, with phrasing patterns
+- Sentence rhythm and vocabulary clusters; words that break the voice
+- Reusable phrase stems with [placeholders]
+- Differences between sub-styles (press release / product / training notes)
+
+Never copy specific facts (names of collections, charities, prices, dates)."""
+
+
+def _update_prompt(artist_name: str, style_guide: str, documents_text: str, sectioned: bool) -> str:
+    """
+    Incremental update prompt: the current guide, then only the documents
+    added since it was built. A guide in the nine-section format gets back
+    just the sections that change; any other guide is rewritten in full.
+    """
+    if sectioned:
+        output = f"""Return ONLY the sections that need to change, each complete and under its exact
+heading from the current guide (e.g. "2) Non-Negotiables"), in guide order. Sections
+you leave out are kept as they are. If nothing needs to change, reply with exactly:
+{NO_CHANGES}"""
+    else:
+        output = STYLE_GUIDE_SPEC.split('\n\nCRITICAL RULES:')[0].replace(
+            "Output with these exact headings:", "Return the complete updated guide with these exact headings:",
+        )
+
+    return f"""Below is the current writing style system for {artist_name}, followed by documents added since it was built.
+
+Update the guide so it also reflects the new documents:
+- The guide was built from many more documents than these. Keep every rule and pattern it has
+  unless the new documents clearly contradict it; don't drop anything just because they don't show it.
+- Add voice traits, structures, devices, cadence patterns and phrase stems the new documents introduce.
+- If different docs conflict, prioritise: press release copy > product copy > training notes.
+
+--- CURRENT STYLE GUIDE ---
+{style_guide}
+--- END CURRENT STYLE GUIDE ---
+
+--- NEW DOCUMENTS ---
+{documents_text}
+--- END NEW DOCUMENTS ---
+
+{output}
+
+CRITICAL RULES:{STYLE_GUIDE_SPEC.split('CRITICAL RULES:')[1]}"""
+
+
+def encode_image_to_base64(image_bytes: bytes) -> str:
+    """Convert image bytes to base64 string."""
+    return base64.b64encode(image_bytes).decode('utf-8')
+
+
+def _image_parts(images: Optional[list[dict]]) -> list[dict]:
+    """
+    Message content parts for images. Each image dict has 'bytes' and, once
+    through image_prep.prepare_images, 'mime_type' and 'detail'; raw uploads
+    are sent as JPEG at high detail.
+    """
+    parts = []
+    for img in images or []:
+        base64_image = encode_image_to_base64(img['bytes'])
+        parts.append({
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:{img.get('mime_type', 'image/jpeg')};base64,{base64_image}",
+                "detail": img.get('detail', 'high'),
+            }
+        })
+    return parts
+
+
+def _exemplar_sections(exemplars: Optional[list[dict]]) -> list[str]:
+    """
+    Prompt section quoting example passages (dicts with filename and text,
+    see exemplar_index.ArtistExemplarIndex.search), or none without any.
+    """
+    if not exemplars:
+        return []
+    passages = "\n\n".join(f"[From: {e['filename']}]\n{e['text'].strip()}" for e in exemplars)
+    return [f"""--- EXAMPLE PASSAGES (voice reference only; do not reuse their facts) ---
+{passages}
+--- END EXAMPLE PASSAGES ---"""]
+
+
+def _complete(create: Callable, timing: dict, **request) -> str:
+    """
+    Run a chat completion and return its stripped text. timing is filled
+    in place (create adds retries and queue time): with no streaming, the
+    first token arrives with the last.
+    """
+    timing.clear()
+    start = time.perf_counter()
+    response = create(report=timing, **request)
+    elapsed = time.perf_counter() - start
+    text = response.choices[0].message.content.strip()
+    timing.update(streamed=False, time_to_first_token=elapsed, total_time=elapsed, chars=len(text))
+    timing.update(usage_tokens(getattr(response, 'usage', None)))
+    return text
+
+
+def _stream_deltas(
+    create: Callable,
+    timing: dict,
+    settle: Optional[Callable[[int, Optional[int]], None]] = None,
+    **request,
+) -> Iterator[str]:
+    """
+    Run a chat completion with streaming and yield its text deltas.
+    timing is filled in place with time_to_first_token and, once the
+    stream ends, total_time (seconds) and token usage. settle (the
+    scheduler's) gets the tokens reserved for the call and the real total
+    from the final usage chunk.
+    """
+    timing.clear()
+    timing.update(streamed=True, time_to_first_token=None, total_time=None, chars=0)
+    start = time.perf_counter()
+    # include_usage adds a final chunk with no choices carrying the usage
+    stream = create(report=timing, stream=True, stream_options={"include_usage": True}, **request)
+    try:
+        for chunk in stream:
+            if getattr(chunk, 'usage', None):
+                timing.update(usage_tokens(chunk.usage))
+                if settle and 'reserved_tokens' in timing:
+                    settle(timing['reserved_tokens'], chunk.usage.total_tokens)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if timing['time_to_first_token'] is None:
+                    timing['time_to_first_token'] = time.perf_counter() - start
+                timing['chars'] += len(delta)
+                yield delta
+    finally:
+        # Frees the pooled connection straight away if the reader stops early
+        stream.close()
+    timing['total_time'] = time.perf_counter() - start
+
+
+class StyleAnalyzerV2:
+    """
+    Analyzes documents and produces natural language style guidance.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        session_id: str = 'default',
+        scheduler: Optional[RequestScheduler] = None,
+        telemetry: Optional[CallRecorder] = None,
+    ):
+        # Shared per API key, so connections are reused across instances;
+        # retries are left to the scheduler, which also paces them
+        self.openai = get_openai_client(api_key)
+        # Requests queue in the shared scheduler under session_id
+        self.scheduler = scheduler or get_scheduler()
+        self.session_id = session_id
+        # Optional recorder for per-call latency and token metrics
+        self.telemetry = telemetry
+        # Report from the last analyze() call (see assemble_corpus)
+        self.last_corpus_report: Optional[dict] = None
+        # Latency of the last completion (see _complete / _stream_deltas)
+        self.last_timing: dict = {}
+        # Result of the last update() / update_stream(): guide, mode
+        # ('sections' or 'full') and changed_sections
+        self.last_update: Optional[dict] = None
+
+    def _create(self, report: Optional[dict] = None, **request):
+        """chat.completions.create, admitted and retried by the rate-limit scheduler."""
+        return self.scheduler.call(
+            self.openai.chat.completions.create,
+            session=self.session_id, tokens=estimate_request_tokens(request),
+            report=report, **request,
+        )
+
+    def analyze(
+        self,
+        documents: list[dict],
+        artist_name: str = "the artist",
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """
+        Analyze documents and return a production-ready style system.
+
+        Args:
+            documents: List of document dicts with 'filename' and 'full_text' keys
+                (and optionally 'created_at', to prefer recent documents)
+            artist_name: Display name of the artist
+            token_budget: Estimated token budget for the documents; the most
+                relevant documents are kept and trimmed to fit
+                (default DEFAULT_CORPUS_TOKEN_BUDGET)
+
+        Returns:
+            Operational style guide specific to this artist's voice
+        """
+        request = self._analysis_request(documents, artist_name, token_budget)
+        with track_call(self.telemetry, 'analyze', request['model'], self.last_timing):
+            return _complete(self._create, self.last_timing, **request)
+
+    def analyze_stream(
+        self,
+        documents: list[dict],
+        artist_name: str = "the artist",
+        token_budget: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming analyze(): yields the style guide as text deltas.
+        The joined deltas, stripped, equal analyze()'s return value.
+        """
+        request = self._analysis_request(documents, artist_name, token_budget)
+        with track_call(self.telemetry, 'analyze', request['model'], self.last_timing):
+            yield from _stream_deltas(self._create, self.last_timing, self.scheduler.settle, **request)
+
+    def _analysis_request(
+        self,
+        documents: list[dict],
+        artist_name: str,
+        token_budget: Optional[int],
+    ) -> dict:
+        """Chat completion arguments for a single-prompt analysis."""
+        combined_text, self.last_corpus_report = assemble_corpus(
+            documents, token_budget=token_budget,
+        )
+
+        user_message = f"""Analyse the attached documents about {artist_name} and build a reusable writing style system.
+
+Treat the attached documents as the only source of truth for style cues.
+If different docs conflict, prioritise: press release copy > product copy > training notes.
+
+--- DOCUMENTS ---
+{combined_text}
+--- END DOCUMENTS ---
+
+{STYLE_GUIDE_SPEC}"""
+
+        return dict(
             model="gpt-4o",
             messages=[
-                {"role": "system", "content": system_message},
+                {"role": "system", "content": ANALYSIS_SYSTEM_MESSAGE},
                 {"role": "user", "content": user_message}
             ],
             temperature=0.7,
             max_tokens=6000
         )
 
-        return response.choices[0].message.content.strip()
+    # --- Incremental update ---
+
+    def update(
+        self,
+        style_guide: str,
+        new_documents: list[dict],
+        artist_name: str = "the artist",
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """
+        Update an existing guide from documents added since it was built,
+        instead of re-analysing the whole corpus. A guide in the nine-section
+        format only has its changed sections rewritten.
+
+        Args:
+            style_guide: The current guide
+            new_documents: Only the documents added since the guide was
+                built, with 'filename' and 'full_text' keys
+            artist_name: Display name of the artist
+            token_budget: Estimated token budget for the new documents
+                (default DEFAULT_CORPUS_TOKEN_BUDGET)
+
+        Returns:
+            The updated style guide (see last_update for what changed)
+        """
+        request = self._update_request(style_guide, new_documents, artist_name, token_budget)
+        with track_call(self.telemetry, 'analyze_update', request['model'], self.last_timing):
+            reply = _complete(self._create, self.last_timing, **request)
+        return self._apply_update(style_guide, reply)
+
+    def update_stream(
+        self,
+        style_guide: str,
+        new_documents: list[dict],
+        artist_name: str = "the artist",
+        token_budget: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming update(): yields the reply (the revised sections, or the
+        whole guide) as text deltas. Once the stream ends, last_update
+        holds the updated guide.
+        """
+        request = self._update_request(style_guide, new_documents, artist_name, token_budget)
+        deltas = []
+        with track_call(self.telemetry, 'analyze_update', request['model'], self.last_timing):
+            for delta in _stream_deltas(self._create, self.last_timing, self.scheduler.settle, **request):
+                deltas.append(delta)
+                yield delta
+        self._apply_update(style_guide, ''.join(deltas).strip())
+
+    def _update_request(
+        self,
+        style_guide: str,
+        new_documents: list[dict],
+        artist_name: str,
+        token_budget: Optional[int],
+    ) -> dict:
+        """Chat completion arguments for an incremental update."""
+        documents_text, report = assemble_corpus(new_documents, token_budget=token_budget)
+        self.last_corpus_report = dict(report, mode='incremental')
+        return dict(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": ANALYSIS_SYSTEM_MESSAGE},
+                {"role": "user", "content": _update_prompt(
+                    artist_name, style_guide, documents_text, is_sectioned(style_guide),
+                )}
+            ],
+            temperature=0.7,
+            max_tokens=6000
+        )
+
+    def _apply_update(self, style_guide: str, reply: str) -> str:
+        """Merge an update reply into the guide and fill last_update."""
+        if is_sectioned(style_guide):
+            guide, changed = merge_guide_update(style_guide, reply)
+            self.last_update = {'guide': guide, 'mode': 'sections', 'changed_sections': changed}
+        else:
+            self.last_update = {'guide': reply, 'mode': 'full', 'changed_sections': None}
+        return self.last_update['guide']
+
+    # --- Map-reduce analysis ---
+
+    def _notes_request(self, artist_name: str, text: str, source: str) -> dict:
+        """Chat completion arguments for one batch's style notes."""
+        return dict(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": NOTES_SYSTEM_MESSAGE},
+                {"role": "user", "content": _notes_prompt(artist_name, text, source)}
+            ],
+            temperature=0.3,
+            max_tokens=1500
+        )
+
+    def _style_notes(self, request: dict) -> str:
+        # Runs in worker threads: records are flushed by _map_notes
+        timing = {}
+        with track_call(self.telemetry, 'analyze_notes', request['model'], timing, flush=False):
+            return _complete(self._create, timing, **request)
+
+    def _map_notes(
+        self,
+        artist_name: str,
+        texts: list[str],
+        source: str,
+        cache: TextCache,
+        max_workers: int,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> tuple[list[str], int]:
+        """
+        Style notes for each text, requested concurrently, reusing cached notes.
+
+        Returns:
+            (notes in input order, how many came from the cache)
+        """
+        requests = [self._notes_request(artist_name, text, source) for text in texts]
+        keys = [request_key(request) for request in requests]
+        notes = [cache.get(key) for key in keys]
+        pending = [i for i, note in enumerate(notes) if note is None]
+        cached = len(texts) - len(pending)
+        if on_progress:
+            on_progress(cached, len(texts))
+
+        errors = []
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+                futures = {
+                    pool.submit(self._style_notes, requests[i]): i
+                    for i in pending
+                }
+                for done, future in enumerate(as_completed(futures), start=cached + 1):
+                    i = futures[future]
+                    try:
+                        notes[i] = future.result()
+                        cache.put(keys[i], notes[i])
+                    except Exception as e:
+                        errors.append(e)
+                    if on_progress:
+                        on_progress(done, len(texts))
+            if self.telemetry:
+                self.telemetry.flush()
+
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} of {len(texts)} analysis batches failed ({errors[0]}); "
+                "finished batches are cached, so running again resumes"
+            ) from errors[0]
+        return notes, cached
+
+    def analyze_map_reduce(
+        self,
+        documents: list[dict],
+        artist_name: str = "the artist",
+        batch_tokens: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        cache_dir: Optional[Path] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> str:
+        """
+        Analyze a corpus too large for one prompt. Batches of documents are
+        turned into style notes concurrently (map), then the notes are merged
+        into the same nine-section guide as analyze() (reduce). Notes too long
+        for one merge prompt are consolidated in further rounds first.
+
+        Args:
+            documents: List of document dicts with 'filename' and 'full_text' keys
+                (and optionally 'created_at')
+            artist_name: Display name of the artist
+            batch_tokens: Estimated tokens per batch (default MAP_BATCH_TOKENS)
+            max_workers: Concurrent requests (default DEFAULT_ANALYSIS_WORKERS)
+            cache_dir: Where batch notes are cached (default NOTES_CACHE_DIR)
+            on_progress: Called with (batches done, total batches) during the map step
+
+        Returns:
+            Operational style guide specific to this artist's voice
+
+        Raises:
+            RuntimeError: If any batch fails (finished batches stay cached)
+        """
+        batch_tokens = batch_tokens or MAP_BATCH_TOKENS
+        max_workers = max_workers or DEFAULT_ANALYSIS_WORKERS
+        cache = TextCache(cache_dir or NOTES_CACHE_DIR)
+
+        batches = batch_corpus(documents, batch_tokens)
+        notes, cached = self._map_notes(
+            artist_name, batches, 'documents', cache, max_workers, on_progress,
+        )
+
+        # Keep the merge prompt within the same budget as a direct analysis
+        rounds = 1
+        while len(notes) > 1 and estimate_tokens('\n\n'.join(notes)) > DEFAULT_CORPUS_TOKEN_BUDGET:
+            groups = batch_corpus(
+                [{'filename': f'Notes {i}', 'full_text': n} for i, n in enumerate(notes, start=1)],
+                batch_tokens,
+            )
+            if len(groups) >= len(notes):
+                break  # batches too small to combine notes; merge as they are
+            notes, _ = self._map_notes(artist_name, groups, 'notes', cache, max_workers)
+            rounds += 1
+
+        self.last_corpus_report = {
+            'mode': 'map_reduce',
+            'budget': None,
+            'tokens': sum(estimate_tokens(batch) for batch in batches),
+            'batches': len(batches),
+            'cached_batches': cached,
+            'rounds': rounds,
+            'included': [
+                {
+                    'filename': doc['filename'],
+                    'tier': document_tier(doc['filename']),
+                    'tokens': estimate_tokens(doc['full_text']),
+                    'trimmed': False,
+                    'paragraphs': None,
+                    'total_paragraphs': None,
+                }
+                for doc in documents if (doc['full_text'] or '').strip()
+            ],
+            'excluded': [],
+        }
+
+        combined_notes = '\n\n'.join(
+            f"--- Notes {i} ---\n{note}" for i, note in enumerate(notes, start=1)
+        )
+        user_message = f"""Build a reusable writing style system for {artist_name} from the style notes below.
+
+The notes were taken from batches of the artist's documents and are the only source of truth for style cues.
+If notes conflict, prioritise: press release copy > product copy > training notes.
+
+--- STYLE NOTES ---
+{combined_notes}
+--- END STYLE NOTES ---
+
+{STYLE_GUIDE_SPEC}"""
+
+        with track_call(self.telemetry, 'analyze_merge', 'gpt-4o', self.last_timing):
+            return _complete(
+                self._create, self.last_timing,
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": ANALYSIS_SYSTEM_MESSAGE},
+                    {"role": "user", "content": user_message}
+                ],
+                temperature=0.7,
+                max_tokens=6000
+            )
+
+
+# Instructions shared by every generate() request; kept in the system
+# message so they lead the cacheable prefix
+GENERATE_SYSTEM_MESSAGE = """You are writing copy for Castle Fine Art gallery.
+
+You will be given a STYLE GUIDE, OUTPUT REQUIREMENTS and a USER BRIEF.
+
+The STYLE GUIDE describes HOW to write — the voice, tone, structure,
+cadence, and narrative devices to use. It was derived from previous documents about
+this artist.
+
+The USER BRIEF is the ONLY source of facts for the copy you write.
+Every specific detail (collection name, artwork titles, subjects depicted, prices,
+charity information, exhibition dates) must come from the brief or from
+the attached images. Do NOT recycle specific facts, charity amounts, collection
+names, or event details from the style guide — those are from past campaigns.
+
+The OUTPUT REQUIREMENTS are mandatory — do not ignore them.
+
+Additional rules:
+1. Follow the style guide for voice, tone, and cadence
+2. Use ONLY facts from the user brief and images — do not invent details
+3. If key facts are missing, write around them with general language rather than placeholders or invented details
+4. Refer to the gallery as "Castle Fine Art" (never "Castle Galleries")
+5. Use British English throughout (colour, favour, centre, catalogue)
+6. No generic filler ("stunning", "amazing", "check out", "awesome")
+7. For pricing, use "priced at £X" or "available at £X" (only if prices are in the brief)
+8. If the output reads like a short marketing blurb, it is wrong — expand with narrative detail"""
+
+CONVERSATION_SYSTEM_MESSAGE = """I've previously analyzed an artist's writing style; it is given below as a STYLE GUIDE. Write what I ask for in that style.
+
+IMPORTANT: Use British English and refer to the gallery as "Castle Fine Art"."""
 
 
 FORMAT_RULES = {
@@ -249,15 +791,113 @@ class CopyGeneratorV2:
     Generates copy with vision support.
     """
 
-    def __init__(self, api_key: str):
-        self.openai = OpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        response_cache: Optional[ResponseCache] = None,
+        session_id: str = 'default',
+        scheduler: Optional[RequestScheduler] = None,
+        telemetry: Optional[CallRecorder] = None,
+    ):
+        # Shared per API key, so connections are reused across instances;
+        # retries are left to the scheduler, which also paces them
+        self.openai = get_openai_client(api_key)
+        # Requests queue in the shared scheduler under session_id
+        self.scheduler = scheduler or get_scheduler()
+        self.session_id = session_id
+        # Optional recorder for per-call latency and token metrics
+        self.telemetry = telemetry
+        # Optional cache of finished responses; None sends every request
+        self.response_cache = response_cache
+        # Latency of the last completion (see _complete / _stream_deltas);
+        # 'cached' is True when it was served from response_cache
+        self.last_timing: dict = {}
+
+    def _create(self, report: Optional[dict] = None, **request):
+        """chat.completions.create, admitted and retried by the rate-limit scheduler."""
+        return self.scheduler.call(
+            self.openai.chat.completions.create,
+            session=self.session_id, tokens=estimate_request_tokens(request),
+            report=report, **request,
+        )
+
+    def _cache_lookup(self, request: dict, fresh: bool) -> tuple[Optional[str], Optional[str]]:
+        """
+        (cache key, cached text) for a request. The key is None when there
+        is no response cache; the text is None on a miss or when fresh
+        asks for a new variant. A hit fills last_timing.
+        """
+        if self.response_cache is None:
+            return None, None
+        key = request_key(request)
+        if fresh:
+            return key, None
+        start = time.perf_counter()
+        hit = self.response_cache.get(key)
+        if hit is None:
+            return key, None
+        text, saved = hit
+        elapsed = time.perf_counter() - start
+        self.last_timing.clear()
+        self.last_timing.update(
+            streamed=False, cached=True, time_to_first_token=elapsed,
+            total_time=elapsed, chars=len(text), saved_time=saved,
+        )
+        return key, text
+
+    def _cached_complete(
+        self,
+        request: dict,
+        fresh: bool,
+        operation: str,
+        doc_type: Optional[str] = None,
+    ) -> str:
+        """
+        _complete() through the response cache (fresh skips the lookup but
+        still stores). Calls that reach the API are recorded as operation.
+        """
+        key, text = self._cache_lookup(request, fresh)
+        if text is not None:
+            return text
+        with track_call(self.telemetry, operation, request['model'], self.last_timing, doc_type):
+            text = _complete(self._create, self.last_timing, **request)
+        self.last_timing['cached'] = False
+        if key is not None:
+            self.response_cache.put(key, text, self.last_timing['total_time'])
+        return text
+
+    def _cached_stream(
+        self,
+        request: dict,
+        fresh: bool,
+        operation: str,
+        doc_type: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        _stream_deltas() through the response cache. A hit arrives as a
+        single delta; a miss is stored once the stream has finished.
+        """
+        key, text = self._cache_lookup(request, fresh)
+        if text is not None:
+            yield text
+            return
+        deltas = []
+        with track_call(self.telemetry, operation, request['model'], self.last_timing, doc_type):
+            for delta in _stream_deltas(self._create, self.last_timing, self.scheduler.settle, **request):
+                deltas.append(delta)
+                yield delta
+        self.last_timing['cached'] = False
+        if key is not None:
+            self.response_cache.put(key, ''.join(deltas).strip(), self.last_timing['total_time'])
 
     def generate(
         self,
         style_guide: str,
         doc_type: str,
         context: str,
-        images: list[dict] = None
+        images: list[dict] = None,
+        fresh: bool = False,
+        exemplars: Optional[list[dict]] = None,
     ) -> str:
         """
         Generate copy in the analyzed style.
@@ -267,88 +907,215 @@ class CopyGeneratorV2:
             doc_type: Type of document (press_release, bio, collection_overview, paid_ads)
             context: User-provided context about what to write
             images: List of dicts with 'bytes' and 'description' keys
+            fresh: Ask for a new variant even if this request is cached
+            exemplars: Passages from the artist's documents to show as voice
+                examples (dicts with filename and text)
 
         Returns:
             Generated copy
         """
-        format_rules = FORMAT_RULES.get(doc_type, FORMAT_RULES["general"])
-
-        # Build the message content
-        content = []
+        return self._cached_complete(
+            self._generate_request(style_guide, doc_type, context, images, exemplars), fresh,
+            'generate', doc_type,
+        )
 
-        # Text prompt
-        prompt = f"""You are writing copy for Castle Fine Art gallery.
+    def generate_stream(
+        self,
+        style_guide: str,
+        doc_type: str,
+        context: str,
+        images: list[dict] = None,
+        fresh: bool = False,
+        exemplars: Optional[list[dict]] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming generate(): yields the copy as text deltas.
+        The joined deltas, stripped, equal generate()'s return value.
+        """
+        yield from self._cached_stream(
+            self._generate_request(style_guide, doc_type, context, images, exemplars), fresh,
+            'generate', doc_type,
+        )
 
-Below is a STYLE GUIDE that describes HOW to write — the voice, tone, structure,
-cadence, and narrative devices to use. It was derived from previous documents about
-this artist.
+    def _generate_request(
+        self,
+        style_guide: str,
+        doc_type: str,
+        context: str,
+        images: Optional[list[dict]],
+        exemplars: Optional[list[dict]] = None,
+    ) -> dict:
+        """
+        Chat completion arguments for generate(), laid out for prefix
+        caching: shared instructions, style guide, format rules, then any
+        example passages, the brief and images.
+        """
+        format_rules = FORMAT_RULES.get(doc_type, FORMAT_RULES["general"])
 
---- STYLE GUIDE (voice and structure rules only) ---
+        style_section = f"""--- STYLE GUIDE (voice and structure rules only) ---
 {style_guide}
---- END STYLE GUIDE ---
+--- END STYLE GUIDE ---"""
 
-Below is the USER BRIEF — this is the ONLY source of facts for the copy you write.
-Every specific detail (collection name, artwork titles, subjects depicted, prices,
-charity information, exhibition dates) must come from the brief below or from
-the attached images. Do NOT recycle specific facts, charity amounts, collection
-names, or event details from the style guide — those are from past campaigns.
+        format_section = f"""--- OUTPUT REQUIREMENTS (mandatory — do not ignore) ---
+{format_rules}
+--- END OUTPUT REQUIREMENTS ---"""
 
---- USER BRIEF ---
+        brief_section = f"""--- USER BRIEF ---
 {context}
 --- END USER BRIEF ---
 
---- OUTPUT REQUIREMENTS (mandatory — do not ignore) ---
-{format_rules}
---- END OUTPUT REQUIREMENTS ---
+Write now."""
 
-Additional rules:
-1. Follow the style guide for voice, tone, and cadence
-2. Use ONLY facts from the user brief and images — do not invent details
-3. If key facts are missing, write around them with general language rather than placeholders or invented details
-4. Refer to the gallery as "Castle Fine Art" (never "Castle Galleries")
-5. Use British English throughout (colour, favour, centre, catalogue)
-6. No generic filler ("stunning", "amazing", "check out", "awesome")
-7. For pricing, use "priced at £X" or "available at £X" (only if prices are in the brief)
-8. If the output reads like a short marketing blurb, it is wrong — expand with narrative detail
+        return dict(
+            model="gpt-4o",
+            messages=layered_messages(
+                GENERATE_SYSTEM_MESSAGE,
+                [style_section, format_section],
+                _exemplar_sections(exemplars) + [brief_section],
+                _image_parts(images),
+            ),
+            temperature=0.7,
+            max_tokens=4000
+        )
 
-Write now."""
+    async def agenerate_formats(
+        self,
+        style_guide: str,
+        briefs: dict[str, str],
+        images: list[dict] = None,
+        max_concurrency: Optional[int] = None,
+        fresh: bool = False,
+        exemplars: Optional[dict[str, list[dict]]] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Generate several formats for one brief concurrently.
 
-        content.append({
-            "type": "text",
-            "text": prompt
-        })
+        Each format sends the same request generate() would. Results are
+        yielded in the order they finish; a failed format is reported in
+        its result rather than cancelling the others.
 
-        # Add images if provided
-        if images:
-            for img in images:
-                base64_image = encode_image_to_base64(img['bytes'])
-                content.append({
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{base64_image}",
-                        "detail": "high"
+        Args:
+            style_guide: Natural language style guide from analysis
+            briefs: Context to write from, keyed by doc type
+            images: List of dicts with 'bytes' and 'description' keys
+            max_concurrency: Requests in flight at once
+                (default DEFAULT_FORMAT_CONCURRENCY)
+            fresh: Ask for new variants even if these requests are cached
+            exemplars: Example passages for each doc type's brief, keyed
+                like briefs (see generate())
+
+        Yields:
+            Dicts with doc_type, copy (None on failure), error (None on
+            success), cached, total_time (seconds) and, for completed
+            requests, the token usage (see usage_tokens)
+        """
+        limit = asyncio.Semaphore(max_concurrency or DEFAULT_FORMAT_CONCURRENCY)
+
+        async with self._async_client() as client:
+            async def run(doc_type: str, context: str) -> dict:
+                start = time.perf_counter()
+                request = self._generate_request(
+                    style_guide, doc_type, context, images, (exemplars or {}).get(doc_type),
+                )
+                key = request_key(request) if self.response_cache else None
+                hit = self.response_cache.get(key) if key and not fresh else None
+                if hit:
+                    return {
+                        'doc_type': doc_type,
+                        'copy': hit[0],
+                        'error': None,
+                        'cached': True,
+                        'total_time': time.perf_counter() - start,
                     }
-                })
 
-        response = self.openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": content
+                async with limit:
+                    start = time.perf_counter()
+                    timing = {'streamed': False}
+                    try:
+                        # Recorded here, written once by the loop below
+                        with track_call(self.telemetry, 'generate', request['model'], timing, doc_type, flush=False):
+                            try:
+                                response = await self.scheduler.acall(
+                                    client.chat.completions.create,
+                                    session=self.session_id,
+                                    tokens=estimate_request_tokens(request),
+                                    report=timing,
+                                    **request,
+                                )
+                            finally:
+                                timing['total_time'] = timing['time_to_first_token'] = time.perf_counter() - start
+                            usage = usage_tokens(getattr(response, 'usage', None))
+                            timing.update(usage)
+                        copy, error = response.choices[0].message.content.strip(), None
+                    except Exception as e:
+                        copy, error, usage = None, str(e), {}
+                    elapsed = timing['total_time']
+                if key and copy is not None:
+                    self.response_cache.put(key, copy, elapsed)
+                return {
+                    'doc_type': doc_type,
+                    'copy': copy,
+                    'error': error,
+                    'cached': False,
+                    'total_time': elapsed,
+                    **usage,
                 }
-            ],
-            temperature=0.7,
-            max_tokens=4000
-        )
 
-        return response.choices[0].message.content.strip()
+            tasks = [asyncio.ensure_future(run(doc_type, context)) for doc_type, context in briefs.items()]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                # The caller stopped early: don't leave requests running
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if self.telemetry:
+                    self.telemetry.flush()
+
+    def generate_formats(
+        self,
+        style_guide: str,
+        briefs: dict[str, str],
+        images: list[dict] = None,
+        max_concurrency: Optional[int] = None,
+        fresh: bool = False,
+        exemplars: Optional[dict[str, list[dict]]] = None,
+    ) -> Iterator[dict]:
+        """
+        Blocking agenerate_formats() for callers without an event loop
+        (such as Streamlit): yields each format's result as it finishes.
+        last_timing gets the wall time for the whole set.
+        """
+        loop = asyncio.new_event_loop()
+        results = self.agenerate_formats(style_guide, briefs, images, max_concurrency, fresh, exemplars)
+        self.last_timing.clear()
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.close()
+            self.last_timing.update(streamed=False, formats=len(briefs), total_time=time.perf_counter() - start)
+
+    def _async_client(self) -> AsyncOpenAI:
+        """
+        A fresh async client for one agenerate_formats() run. Its connection
+        pool belongs to the event loop it is used on, so it is not shared.
+        """
+        return new_async_openai_client(self.openai.api_key)
 
     def generate_with_conversation(
         self,
         style_guide: str,
         user_prompt: str,
-        images: list[dict] = None
+        images: list[dict] = None,
+        fresh: bool = False,
+        exemplars: Optional[list[dict]] = None,
     ) -> str:
         """
         Even simpler - just pass through a natural prompt.
@@ -357,52 +1124,51 @@ Write now."""
             style_guide: Natural language style guide
             user_prompt: The user's natural language request
             images: Optional images to include
+            fresh: Ask for a new variant even if this request is cached
+            exemplars: Example passages to show as voice reference
 
         Returns:
             Generated copy
         """
-        content = []
+        return self._cached_complete(
+            self._conversation_request(style_guide, user_prompt, images, exemplars), fresh,
+            'conversation',
+        )
 
-        # Combine style guide with user prompt
-        full_prompt = f"""I've previously analyzed an artist's writing style. Here it is:
+    def generate_with_conversation_stream(
+        self,
+        style_guide: str,
+        user_prompt: str,
+        images: list[dict] = None,
+        fresh: bool = False,
+        exemplars: Optional[list[dict]] = None,
+    ) -> Iterator[str]:
+        """Streaming generate_with_conversation(): yields the copy as text deltas."""
+        yield from self._cached_stream(
+            self._conversation_request(style_guide, user_prompt, images, exemplars), fresh,
+            'conversation',
+        )
 
---- STYLE GUIDE ---
+    def _conversation_request(
+        self,
+        style_guide: str,
+        user_prompt: str,
+        images: Optional[list[dict]],
+        exemplars: Optional[list[dict]] = None,
+    ) -> dict:
+        """Chat completion arguments for generate_with_conversation() (same layout as generate)."""
+        style_section = f"""--- STYLE GUIDE ---
 {style_guide}
---- END STYLE GUIDE ---
-
-Now here's my request:
-
-{user_prompt}
-
-IMPORTANT: Use British English and refer to the gallery as "Castle Fine Art"."""
+--- END STYLE GUIDE ---"""
 
-        content.append({
-            "type": "text",
-            "text": full_prompt
-        })
-
-        # Add images if provided
-        if images:
-            for img in images:
-                base64_image = encode_image_to_base64(img['bytes'])
-                content.append({
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{base64_image}",
-                        "detail": "high"
-                    }
-                })
-
-        response = self.openai.chat.completions.create(
+        return dict(
             model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": content
-                }
-            ],
+            messages=layered_messages(
+                CONVERSATION_SYSTEM_MESSAGE,
+                [style_section],
+                _exemplar_sections(exemplars) + [f"Now here's my request:\n\n{user_prompt}"],
+                _image_parts(images),
+            ),
             temperature=0.7,
             max_tokens=3000
         )
-
-        return response.choices[0].message.content.strip()
@@ -0,0 +1,91 @@
+"""
+Guide Sections Module
+Splits a style guide into its nine numbered sections (see
+generator_v2.STYLE_GUIDE_SPEC) and merges revised sections back in, so an
+incremental update only has to write the sections that change.
+"""
+
+import re
+
+# Section titles in guide order, as they appear in STYLE_GUIDE_SPEC
+GUIDE_SECTIONS = [
+    'Voice Snapshot',
+    'Non-Negotiables',
+    'Structural Formula',
+    'Narrative Devices',
+    'Language and Cadence',
+    'Phrase Bank',
+    'Reusable Templates',
+    'Style Stress Test',
+    'Two mini sample paragraphs',
+]
+
+# Reply meaning the guide needs no changes
+NO_CHANGES = 'NO CHANGES'
+
+# A heading line: optional markdown (#, *, _), the section number, then its
+# title. Requiring both keeps numbered lists inside a section (steps of the
+# structural formula, say) from being read as headings.
+_HEADING = re.compile(
+    r'^[ \t#*_>]*(\d)\s*[).:]\s*[*_ \t]*(' + '|'.join(
+        re.escape(title) for title in GUIDE_SECTIONS
+    ) + r')\b.*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def split_guide(guide: str) -> tuple[str, dict[int, str]]:
+    """
+    Split a guide into the text before the first section and its sections.
+
+    Args:
+        guide: Style guide text
+
+    Returns:
+        (preamble, {section number (1-9): section text from its heading
+        line up to the next heading}), sections in guide order
+    """
+    headings = []
+    for match in _HEADING.finditer(guide):
+        number = [t.lower() for t in GUIDE_SECTIONS].index(match.group(2).lower()) + 1
+        if int(match.group(1)) != number:
+            continue
+        # Only a title's first appearance in order counts as its heading
+        if not headings or number > headings[-1][0]:
+            headings.append((number, match.start()))
+
+    if not headings:
+        return guide, {}
+    sections = {}
+    for i, (number, start) in enumerate(headings):
+        end = headings[i + 1][1] if i + 1 < len(headings) else len(guide)
+        sections[number] = guide[start:end].strip('\n')
+    return guide[:headings[0][1]].strip('\n'), sections
+
+
+def is_sectioned(guide: str) -> bool:
+    """True if the guide has all nine sections, so it can be updated section by section."""
+    return len(split_guide(guide)[1]) == len(GUIDE_SECTIONS)
+
+
+def merge_guide_update(guide: str, revision: str) -> tuple[str, list[int]]:
+    """
+    Apply revised sections to a guide.
+
+    Args:
+        guide: Current style guide (see is_sectioned)
+        revision: Reply to an incremental update: revised sections under
+            their headings, or NO_CHANGES
+
+    Returns:
+        (updated guide, numbers of the sections replaced). A revision with
+        no recognisable sections leaves the guide unchanged.
+    """
+    revised = split_guide(revision.strip())[1]
+    if not revised:
+        return guide, []
+    preamble, sections = split_guide(guide)
+    sections.update(revised)
+    parts = [preamble] if preamble else []
+    parts.extend(sections[number] for number in sorted(sections))
+    return '\n\n'.join(parts), sorted(revised)
@@ -0,0 +1,178 @@
+"""
+Image Preparation Module
+Shrinks uploaded artwork images before they are sent to the vision model.
+The model scales every image down on its side anyway, so anything larger
+only adds upload size; images are resized to the resolution the model
+actually looks at, re-encoded compactly and labelled with their real type.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Threads used by prepare_images (Pillow releases the GIL while resizing
+# and encoding). Overridable via COPYWRITER_IMAGE_WORKERS.
+DEFAULT_IMAGE_WORKERS = int(
+    os.getenv('COPYWRITER_IMAGE_WORKERS', '0')
+) or min(4, os.cpu_count() or 1)
+
+# Detail level for images that don't choose one: "high" or "low"
+DEFAULT_IMAGE_DETAIL = os.getenv('COPYWRITER_IMAGE_DETAIL', 'high')
+
+JPEG_QUALITY = 85
+# zlib level for PNGs with transparency: level 1 is ~10x faster to write
+# than optimize=True and only a few percent larger at model resolution
+PNG_COMPRESS_LEVEL = 1
+
+# How gpt-4o sizes vision input. At "high" the image is fitted inside
+# 2048x2048, then its shorter side is brought down to 768, and it costs
+# 85 tokens plus 170 per 512px tile. At "low" it is 512x512 for 85 tokens.
+_HIGH_FIT = 2048
+_HIGH_SHORT_SIDE = 768
+_LOW_FIT = 512
+_TILE = 512
+_BASE_TOKENS = 85
+_TILE_TOKENS = 170
+
+_EXIF_ORIENTATION = 0x0112
+_MIME_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp', 'GIF': 'image/gif'}
+
+
+def model_size(width: int, height: int, detail: str = 'high') -> tuple[int, int]:
+    """Size the model scales an image to at the given detail level (never upscaled)."""
+    fit = _LOW_FIT if detail == 'low' else _HIGH_FIT
+    scale = min(1.0, fit / max(width, height))
+    if detail != 'low':
+        scale = min(scale, _HIGH_SHORT_SIDE / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def estimate_image_tokens(width: int, height: int, detail: str = 'high') -> int:
+    """Vision tokens for an image of this size at the given detail level."""
+    if detail == 'low':
+        return _BASE_TOKENS
+    width, height = model_size(width, height, detail)
+    tiles = -(-width // _TILE) * -(-height // _TILE)
+    return _BASE_TOKENS + _TILE_TOKENS * tiles
+
+
+def prepare_image(image_bytes: bytes, detail: Optional[str] = None) -> dict:
+    """
+    Resize and re-encode one image for a vision request.
+
+    Opaque images become JPEG; images with transparency stay PNG. If the
+    image is already small enough and re-encoding would not shrink it, the
+    original bytes are kept. Unreadable images are passed through as-is.
+
+    Args:
+        image_bytes: Uploaded file contents
+        detail: "high" or "low" (default DEFAULT_IMAGE_DETAIL)
+
+    Returns:
+        Dict with bytes, mime_type, detail, width, height, tokens, and
+        original_bytes / original_tokens (size and cost if sent unchanged
+        at high detail)
+    """
+    detail = detail or DEFAULT_IMAGE_DETAIL
+    try:
+        image = Image.open(BytesIO(image_bytes))
+        source_format = image.format
+        orientation = image.getexif().get(_EXIF_ORIENTATION, 1)
+        # Size as displayed: EXIF orientations 5-8 swap width and height
+        full_size = image.size if orientation < 5 else image.size[::-1]
+        target = model_size(*full_size, detail)
+        if source_format == 'JPEG' and image.mode in ('RGB', 'L'):
+            # Let the JPEG decoder scale down by 1/2, 1/4 or 1/8 while
+            # decoding (never below the target), which is far cheaper than
+            # a full-size decode followed by a resize
+            image.draft(image.mode, model_size(*image.size, detail))
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError):
+        return {
+            'bytes': image_bytes,
+            'mime_type': 'image/jpeg',
+            'detail': detail,
+            'width': None,
+            'height': None,
+            'tokens': None,
+            'original_bytes': len(image_bytes),
+            'original_tokens': None,
+        }
+
+    if image.size != target:
+        image = image.resize(target, Image.Resampling.LANCZOS)
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    out = BytesIO()
+    if has_alpha:
+        image.save(out, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+        data, mime_type = out.getvalue(), 'image/png'
+    else:
+        image.convert('RGB').save(out, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+        data, mime_type = out.getvalue(), 'image/jpeg'
+
+    # Already model-sized and upright: keep the upload if it is smaller
+    unchanged = target == full_size and orientation == 1
+    if unchanged and len(data) >= len(image_bytes) and source_format in _MIME_TYPES:
+        data, mime_type = image_bytes, _MIME_TYPES[source_format]
+
+    return {
+        'bytes': data,
+        'mime_type': mime_type,
+        'detail': detail,
+        'width': image.width,
+        'height': image.height,
+        'tokens': estimate_image_tokens(image.width, image.height, detail),
+        'original_bytes': len(image_bytes),
+        'original_tokens': estimate_image_tokens(*full_size, 'high'),
+    }
+
+
+def prepare_images(
+    images: list[dict],
+    detail: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> tuple[list[dict], dict]:
+    """
+    Prepare a set of images in parallel threads.
+
+    Args:
+        images: Dicts with 'bytes' and optionally 'detail' (per-image
+            override) and any other keys (such as 'name'), which are kept
+        detail: Detail level for images without their own
+        max_workers: Threads to use (default DEFAULT_IMAGE_WORKERS)
+
+    Returns:
+        (prepared images in input order, report) where each prepared image
+        is the input dict with bytes, mime_type and detail replaced, and the
+        report totals original_bytes, bytes, original_tokens and tokens
+    """
+    if not images:
+        return [], {'images': 0, 'original_bytes': 0, 'bytes': 0, 'original_tokens': 0, 'tokens': 0}
+
+    def prepare(img: dict) -> dict:
+        return prepare_image(img['bytes'], img.get('detail') or detail)
+
+    workers = min(max_workers or DEFAULT_IMAGE_WORKERS, len(images))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(prepare, images))
+    else:
+        results = [prepare(img) for img in images]
+
+    prepared = [
+        dict(img, bytes=r['bytes'], mime_type=r['mime_type'], detail=r['detail'])
+        for img, r in zip(images, results)
+    ]
+    report = {
+        'images': len(results),
+        'original_bytes': sum(r['original_bytes'] for r in results),
+        'bytes': sum(len(r['bytes']) for r in results),
+        # Unreadable images have no estimate; they count as unchanged
+        'original_tokens': sum(r['original_tokens'] or 0 for r in results),
+        'tokens': sum(r['tokens'] or 0 for r in results),
+    }
+    return prepared, report
@@ -0,0 +1,156 @@
+"""
+OpenAI Clients Module
+Process-wide registry of OpenAI clients, one per API key. Each client
+owns an HTTP connection pool, so sharing it lets every request after the
+first reuse a kept-alive connection instead of opening a new one (TCP and
+TLS handshakes) and building a new client on every button press.
+
+Clients are keyed by a hash of the API key, so keys typed in as a session
+override are never held as registry keys. Those clients are shared only
+by sessions using the same key, and the least recently used client is
+dropped once more than MAX_CLIENTS keys are in use.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# Connections kept per client: up to POOL_SIZE open at once, all of them
+# kept alive for KEEPALIVE_SECONDS after use
+DEFAULT_POOL_SIZE = int(os.getenv('COPYWRITER_OPENAI_POOL_SIZE', '20'))
+DEFAULT_KEEPALIVE_SECONDS = float(os.getenv('COPYWRITER_OPENAI_KEEPALIVE', '60'))
+
+# Seconds allowed to connect, and for a whole response (long analyses
+# stream for minutes, so the overall timeout stays generous)
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv('COPYWRITER_OPENAI_CONNECT_TIMEOUT', '10'))
+DEFAULT_TIMEOUT = float(os.getenv('COPYWRITER_OPENAI_TIMEOUT', '600'))
+
+# Distinct API keys with a live client (the configured key plus session overrides)
+MAX_CLIENTS = int(os.getenv('COPYWRITER_OPENAI_MAX_CLIENTS', '16'))
+
+
+def _key_hash(api_key: str, base_url: Optional[str]) -> str:
+    return hashlib.sha256(f"{base_url or ''}\0{api_key}".encode('utf-8')).hexdigest()
+
+
+def _timeout(timeout: Optional[float], connect_timeout: Optional[float]) -> httpx.Timeout:
+    return httpx.Timeout(timeout or DEFAULT_TIMEOUT, connect=connect_timeout or DEFAULT_CONNECT_TIMEOUT)
+
+
+def _limits(pool_size: Optional[int]) -> httpx.Limits:
+    pool_size = pool_size or DEFAULT_POOL_SIZE
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=DEFAULT_KEEPALIVE_SECONDS,
+    )
+
+
+def new_openai_client(
+    api_key: str,
+    base_url: Optional[str] = None,
+    pool_size: Optional[int] = None,
+    timeout: Optional[float] = None,
+    connect_timeout: Optional[float] = None,
+) -> OpenAI:
+    """
+    A new OpenAI client with its own connection pool. Retries are left to
+    the rate-limit scheduler, so the client makes none.
+
+    Args:
+        api_key: OpenAI API key
+        base_url: API base URL (default: OpenAI's)
+        pool_size: Connections kept (default DEFAULT_POOL_SIZE)
+        timeout: Seconds for a whole response (default DEFAULT_TIMEOUT)
+        connect_timeout: Seconds to connect (default DEFAULT_CONNECT_TIMEOUT)
+    """
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,
+        timeout=_timeout(timeout, connect_timeout),
+        http_client=DefaultHttpxClient(limits=_limits(pool_size)),
+    )
+
+
+def new_async_openai_client(
+    api_key: str,
+    base_url: Optional[str] = None,
+    pool_size: Optional[int] = None,
+    timeout: Optional[float] = None,
+    connect_timeout: Optional[float] = None,
+) -> AsyncOpenAI:
+    """
+    new_openai_client() for asyncio. Not pooled across calls: an async
+    connection pool belongs to the event loop it was first used on.
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,
+        timeout=_timeout(timeout, connect_timeout),
+        http_client=DefaultAsyncHttpxClient(limits=_limits(pool_size)),
+    )
+
+
+class ClientRegistry:
+    """
+    Shared OpenAI clients keyed by a hash of (base URL, API key), least
+    recently used first. Thread-safe.
+
+    Args:
+        max_clients: Clients kept; older ones are dropped and closed by the
+            garbage collector once no request is using them
+    """
+
+    def __init__(self, max_clients: int = MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._clients: OrderedDict[str, OpenAI] = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def get(self, api_key: str, base_url: Optional[str] = None) -> OpenAI:
+        """The shared client for this key, created on first use."""
+        key = _key_hash(api_key, base_url)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.reused += 1
+                return client
+            client = new_openai_client(api_key, base_url)
+            self._clients[key] = client
+            self.created += 1
+            while len(self._clients) > self.max_clients:
+                # Not closed here: another thread may be mid-request on it
+                self._clients.popitem(last=False)
+            return client
+
+    def stats(self) -> dict:
+        """Clients held, created and reused."""
+        with self._lock:
+            return {'clients': len(self._clients), 'created': self.created, 'reused': self.reused}
+
+
+_default_registry: Optional[ClientRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Process-wide client registry (created on first use)."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+        return _default_registry
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None) -> OpenAI:
+    """The process-wide shared client for this API key."""
+    return get_client_registry().get(api_key, base_url)
@@ -0,0 +1,56 @@
+"""
+Parse Cache Module
+Content-addressed cache of extracted document text, so re-uploading the same
+file skips extraction. Two tiers (see text_cache): an in-memory LRU and an
+on-disk store with size-based eviction.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .text_cache import TextCache
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv('COPYWRITER_PARSE_CACHE_DIR')
+    or Path(__file__).resolve().parent.parent / 'cache' / 'parse'
+)
+
+
+def content_key(file_bytes: bytes, extension: str, parser_version: str) -> str:
+    """
+    Cache key for a file: SHA-256 of its bytes plus the parser version.
+    The extension is included because it selects the parser.
+    """
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    return f"{digest}-{extension.lstrip('.').lower()}-v{parser_version}"
+
+
+class ParseCache(TextCache):
+    """
+    Extracted document text keyed by content_key() (see TextCache for the
+    memory and disk tiers).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+        memory_entries: int = 128,
+        disk_max_bytes: int = 200 * 1024 * 1024,
+    ):
+        super().__init__(cache_dir, memory_entries, disk_max_bytes)
+
+
+_default_cache: Optional[ParseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """Process-wide parse cache (created on first use)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache()
+        return _default_cache
@@ -0,0 +1,127 @@
+"""
+Parsed Document
+Compact record for one parsed document. The extracted text is stored once;
+paragraphs, word count and chunks are derived from it on first use and
+cached as offsets rather than copies of the text.
+"""
+
+from array import array
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+_PARAGRAPH_BREAK = '\n\n'
+
+
+class ParsedDocument(Mapping):
+    """
+    A parsed document with a read-only dict view, so existing callers can
+    keep using doc['full_text'], doc['paragraphs'], doc.get('file_path') etc.
+
+    Keys: filename, file_path (only when set), doc_type, full_text,
+    paragraphs, word_count.
+    """
+
+    __slots__ = (
+        'filename', 'file_path', 'doc_type', 'full_text',
+        '_word_count', '_paragraph_spans', '_chunk_spans',
+    )
+
+    def __init__(
+        self,
+        filename: str,
+        doc_type: str,
+        full_text: str,
+        file_path: Optional[str] = None,
+        word_count: Optional[int] = None,
+    ):
+        self.filename = filename
+        self.file_path = file_path
+        self.doc_type = doc_type
+        self.full_text = full_text
+        self._word_count = word_count
+        self._paragraph_spans = None
+        self._chunk_spans = None
+
+    # --- Derived fields ---
+
+    @property
+    def word_count(self) -> int:
+        if self._word_count is None:
+            self._word_count = len(self.full_text.split())
+        return self._word_count
+
+    @property
+    def paragraph_spans(self) -> array:
+        """Flat (start, end) offsets of each stripped, non-empty paragraph."""
+        if self._paragraph_spans is None:
+            spans = array('q')
+            pos = 0
+            for part in self.full_text.split(_PARAGRAPH_BREAK):
+                stripped = part.strip()
+                if stripped:
+                    start = pos + len(part) - len(part.lstrip())
+                    spans.append(start)
+                    spans.append(start + len(stripped))
+                pos += len(part) + len(_PARAGRAPH_BREAK)
+            self._paragraph_spans = spans
+        return self._paragraph_spans
+
+    @property
+    def paragraph_count(self) -> int:
+        return len(self.paragraph_spans) // 2
+
+    @property
+    def paragraphs(self) -> list[str]:
+        """Paragraphs split on blank lines (built from cached offsets on each call)."""
+        text, spans = self.full_text, self.paragraph_spans
+        return [text[spans[i]:spans[i + 1]] for i in range(0, len(spans), 2)]
+
+    def chunk_spans(self, chunk_size: int = 500, overlap: int = 50) -> array:
+        """Flat (start, end) chunk offsets, cached for the last chunk settings used."""
+        from .document_parser import iter_chunk_spans
+
+        key = (chunk_size, overlap)
+        if self._chunk_spans is None or self._chunk_spans[0] != key:
+            spans = array('q')
+            for start, end in iter_chunk_spans(self.full_text, chunk_size, overlap):
+                spans.append(start)
+                spans.append(end)
+            self._chunk_spans = (key, spans)
+        return self._chunk_spans[1]
+
+    def chunks(self, chunk_size: int = 500, overlap: int = 50) -> list[str]:
+        """Same chunks as chunk_text(full_text, chunk_size, overlap)."""
+        text, spans = self.full_text, self.chunk_spans(chunk_size, overlap)
+        return [text[spans[i]:spans[i + 1]] for i in range(0, len(spans), 2)]
+
+    # --- Dict view ---
+
+    def _keys(self) -> tuple[str, ...]:
+        if self.file_path is None:
+            return ('filename', 'doc_type', 'full_text', 'paragraphs', 'word_count')
+        return ('filename', 'file_path', 'doc_type', 'full_text', 'paragraphs', 'word_count')
+
+    def __getitem__(self, key: str):
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def as_dict(self) -> dict:
+        """A plain dict with every field materialised (e.g. for JSON)."""
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"ParsedDocument({self.filename!r}, {self.doc_type!r}, {len(self.full_text)} chars)"
+
+    # __slots__ classes need explicit pickling support for the process pools
+    def __getstate__(self):
+        return (self.filename, self.doc_type, self.full_text, self.file_path, self._word_count)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
@@ -0,0 +1,60 @@
+"""
+Prompt Layout
+Orders chat messages so the parts that repeat between requests come first.
+OpenAI reuses a cached prompt prefix (1,024 tokens or more, matched in
+128-token steps) at a discount and with lower latency, but only up to the
+first token that differs; a brief placed between the style guide and the
+format rules means nothing after it is ever reused.
+
+Layout: system instructions (the same for every request), then the
+static sections (style guide, then format rules: the same for an artist
+and format), then the variable sections (the brief), then any images.
+"""
+
+from typing import Sequence
+
+
+def layered_messages(
+    system: str,
+    static_sections: list[str],
+    variable_sections: list[str],
+    attachments: Sequence[dict] = (),
+) -> list[dict]:
+    """
+    Chat messages with stable content first.
+
+    Args:
+        system: Instructions shared by every request of this kind
+        static_sections: Text that repeats across requests, most widely
+            shared first (e.g. style guide, then format rules)
+        variable_sections: Text specific to this request (e.g. the brief)
+        attachments: Extra content parts (e.g. images), placed last
+
+    Returns:
+        A system message and one user message whose content parts are the
+        static text, the variable text, then the attachments
+    """
+    content = [{"type": "text", "text": "\n\n".join(static_sections)}]
+    if variable_sections:
+        content.append({"type": "text", "text": "\n\n".join(variable_sections)})
+    content.extend(attachments)
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": content},
+    ]
+
+
+def usage_tokens(usage) -> dict:
+    """
+    Token counts from a response's usage block: prompt_tokens,
+    completion_tokens and cached_tokens (the part of the prompt served
+    from the provider's prefix cache). Empty if the response had none.
+    """
+    if usage is None:
+        return {}
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {
+        'prompt_tokens': usage.prompt_tokens,
+        'completion_tokens': usage.completion_tokens,
+        'cached_tokens': getattr(details, 'cached_tokens', None) or 0,
+    }
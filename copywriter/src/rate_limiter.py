@@ -0,0 +1,404 @@
+"""
+Rate Limiter Module
+Shared scheduler for OpenAI requests. Requests and tokens per minute are
+tracked with token buckets so bursts (map-reduce analysis, several formats
+at once, several users) queue locally instead of hitting 429s; waiting
+work is served round-robin across sessions, and failed requests are
+retried with jittered backoff, honouring Retry-After.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import openai
+
+from .corpus_assembler import estimate_tokens
+
+# Organisation limits for the model in use (the defaults are gpt-4o at
+# usage tier 2). 0 turns a limit off.
+DEFAULT_REQUESTS_PER_MINUTE = int(os.getenv('COPYWRITER_OPENAI_RPM', '5000'))
+DEFAULT_TOKENS_PER_MINUTE = int(os.getenv('COPYWRITER_OPENAI_TPM', '450000'))
+DEFAULT_MAX_RETRIES = int(os.getenv('COPYWRITER_OPENAI_RETRIES', '5'))
+
+# OpenAI enforces per-minute limits over shorter windows, so a full
+# minute's allowance can't be spent at once; buckets hold this many
+# seconds' worth
+BURST_SECONDS = 2.0
+
+# Backoff for retries without a Retry-After: full jitter up to
+# base * 2^attempt, capped at max
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+# Gap between admissions after a 429 (on top of any Retry-After pause):
+# starts at SPACING_STEP, doubles on each further 429 up to SPACING_MAX
+# and halves every SPACING_HALF_LIFE seconds
+SPACING_STEP = 0.05
+SPACING_MAX = 2.0
+SPACING_HALF_LIFE = 10.0
+
+# Rough vision cost of an image at high detail, for token estimates
+_IMAGE_TOKENS = 765
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def estimate_request_tokens(request: dict) -> int:
+    """
+    Tokens a chat completion request counts against the per-minute limit:
+    the prompt (estimated locally) plus max_tokens, as OpenAI reserves the
+    full completion allowance up front.
+    """
+    tokens = 0
+    for message in request.get('messages', ()):
+        content = message['content']
+        parts = [{'type': 'text', 'text': content}] if isinstance(content, str) else content
+        for part in parts:
+            if part['type'] == 'text':
+                tokens += estimate_tokens(part['text'])
+            elif part.get('image_url', {}).get('detail') == 'low':
+                tokens += 85
+            else:
+                tokens += _IMAGE_TOKENS
+    return tokens + (request.get('max_tokens') or 0)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay asked for by a failed response's Retry-After headers, if any."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, dropped connections and server errors are retried."""
+    if isinstance(error, openai.APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+class TokenBucket:
+    """
+    Bucket refilled continuously at per_minute / 60 units a second, holding
+    up to burst_seconds of refill (at least one unit). Not thread-safe on
+    its own (RequestScheduler holds its lock around it).
+    """
+
+    def __init__(self, per_minute: int, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # larger requests wait for a full bucket
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Ticket:
+    """A request's place in its session's queue (see RequestScheduler._admit)."""
+
+    __slots__ = ('admitted', 'cancelled')
+
+    def __init__(self):
+        self.admitted = False
+        self.cancelled = False
+
+
+class RequestScheduler:
+    """
+    Admits requests under per-minute request and token limits, one
+    session at a time in round-robin order, and retries failures.
+
+    Args:
+        requests_per_minute: Request limit (0 for none)
+        tokens_per_minute: Token limit (0 for none)
+        max_retries: Retries after the first attempt
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        # Waiting tickets per session; the session at the front goes next
+        self._queues: OrderedDict[str, deque] = OrderedDict()
+        self._paused_until = 0.0
+        # After a 429, admissions are spaced out so waiting requests don't
+        # all retry at the same instant (see SPACING_STEP); _spacing is the
+        # gap as of _spacing_at, decaying from there
+        self._spacing = 0.0
+        self._spacing_at = 0.0
+        self._last_admitted = 0.0
+
+        self.admitted = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.queued_seconds = 0.0
+
+    # --- Admission ---
+
+    def _next_ticket(self):
+        for queue in self._queues.values():
+            if queue:
+                return queue[0]
+        return None
+
+    def _admit(self, session: str, tokens: int, ticket: Optional[_Ticket] = None) -> float:
+        """
+        Block until it is this request's turn and both buckets allow it.
+        Returns the seconds spent waiting. A ticket withdrawn with
+        _withdraw() leaves the queue without taking anything.
+        """
+        ticket = ticket or _Ticket()
+        start = time.monotonic()
+        with self._cond:
+            self._queues.setdefault(session, deque()).append(ticket)
+            while True:
+                if ticket.cancelled:
+                    queue = self._queues[session]
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._queues[session]
+                    self._cond.notify_all()
+                    return time.monotonic() - start
+                timeout = None
+                if self._next_ticket() is ticket:
+                    now = time.monotonic()
+                    timeout = max(
+                        self._paused_until - now,
+                        self._last_admitted + self._current_spacing(now) - now,
+                        self.requests.wait_time(1, now) if self.requests else 0.0,
+                        self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+                    )
+                    if timeout <= 0:
+                        if self.requests:
+                            self.requests.take(1, now)
+                        if self.tokens:
+                            self.tokens.take(tokens, now)
+                        queue = self._queues.pop(session)
+                        queue.popleft()
+                        if queue:
+                            self._queues[session] = queue  # back of the rotation
+                        self._last_admitted = now
+                        ticket.admitted = True
+                        self.admitted += 1
+                        self.queued_seconds += now - start
+                        self._cond.notify_all()
+                        return now - start
+                self._cond.wait(timeout)
+
+    def _withdraw(self, ticket: _Ticket, tokens: int) -> None:
+        """
+        Cancel a ticket handed to _admit() in another thread: it leaves the
+        queue if still waiting, or its request and tokens are returned if
+        it was admitted meanwhile.
+        """
+        with self._cond:
+            if ticket.admitted:
+                if self.requests:
+                    self.requests.give_back(1)
+                if self.tokens:
+                    self.tokens.give_back(tokens)
+            else:
+                ticket.cancelled = True
+            self._cond.notify_all()
+
+    def settle(self, reserved: int, total_tokens: Optional[int]) -> None:
+        """
+        Return the unused part of a token reservation once the call's real
+        total is known. call() does this itself, except for streams, whose
+        usage only arrives with the last chunk (see
+        generator_v2._stream_deltas).
+
+        Args:
+            reserved: Tokens the call was admitted with
+            total_tokens: usage.total_tokens from the response (None if unknown)
+        """
+        with self._cond:
+            if self.tokens and isinstance(total_tokens, int) and total_tokens < reserved:
+                self.tokens.give_back(reserved - total_tokens)
+            self._cond.notify_all()
+
+    def _settle(self, reserved: int, response) -> None:
+        """After a success: return unused reserved tokens."""
+        self.settle(reserved, getattr(getattr(response, 'usage', None), 'total_tokens', None))
+
+    def _current_spacing(self, now: float) -> float:
+        """Gap between admissions now (call with self._cond held)."""
+        if not self._spacing:
+            return 0.0
+        return self._spacing * 0.5 ** ((now - self._spacing_at) / SPACING_HALF_LIFE)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Delay before the next attempt; a 429 with Retry-After pauses everyone."""
+        retry_after = retry_after_seconds(error)
+        rate_limited = isinstance(error, openai.APIStatusError) and error.status_code == 429
+        with self._cond:
+            self.retries += 1
+            if rate_limited:
+                self.rate_limited += 1
+                now = time.monotonic()
+                self._spacing = min(SPACING_MAX, max(self._current_spacing(now) * 2, SPACING_STEP))
+                self._spacing_at = now
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, 0.1 * retry_after + 0.05)
+                if rate_limited:
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    self._cond.notify_all()
+                return delay
+        return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+    # --- Running requests ---
+
+    def call(
+        self,
+        fn: Callable,
+        *args,
+        session: str = 'default',
+        tokens: int = 0,
+        report: Optional[dict] = None,
+        **kwargs,
+    ):
+        """
+        Run fn(*args, **kwargs) once admitted, retrying retryable errors.
+
+        Args:
+            fn: Usually client.chat.completions.create
+            session: Queue to wait in (one per user session)
+            tokens: Estimated tokens (see estimate_request_tokens)
+            report: If given, filled with this call's retries and
+                queued_seconds (time spent waiting for admission); for
+                stream=True also reserved_tokens, for settle()
+
+        Returns:
+            fn's return value
+        """
+        report = {} if report is None else report
+        report.update(retries=0, queued_seconds=0.0)
+        for attempt in range(self.max_retries + 1):
+            report['retries'] = attempt
+            report['queued_seconds'] += self._admit(session, tokens)
+            try:
+                response = fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    with self._cond:
+                        self.failures += 1
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+                continue
+            if kwargs.get('stream'):
+                # Usage comes with the stream's last chunk; its reader settles
+                report['reserved_tokens'] = tokens
+            else:
+                self._settle(tokens, response)
+            return response
+
+    async def acall(
+        self,
+        fn: Callable,
+        *args,
+        session: str = 'default',
+        tokens: int = 0,
+        report: Optional[dict] = None,
+        **kwargs,
+    ):
+        """
+        call() for coroutine functions such as AsyncOpenAI's create
+        (without streaming). Admission waits in a worker thread; if the
+        task is cancelled meanwhile, its place in the queue is given up,
+        or its tokens returned if the thread was admitted anyway.
+        """
+        report = {} if report is None else report
+        report.update(retries=0, queued_seconds=0.0)
+        for attempt in range(self.max_retries + 1):
+            report['retries'] = attempt
+            ticket = _Ticket()
+            try:
+                queued = await asyncio.to_thread(self._admit, session, tokens, ticket)
+            except asyncio.CancelledError:
+                self._withdraw(ticket, tokens)
+                raise
+            report['queued_seconds'] += queued
+            try:
+                response = await fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    with self._cond:
+                        self.failures += 1
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                continue
+            self._settle(tokens, response)
+            return response
+
+    def stats(self) -> dict:
+        """Requests admitted, retries, 429s, final failures and time spent queued."""
+        with self._cond:
+            return {
+                'admitted': self.admitted,
+                'retries': self.retries,
+                'rate_limited': self.rate_limited,
+                'failures': self.failures,
+                'queued_seconds': self.queued_seconds,
+                'waiting': sum(len(q) for q in self._queues.values()),
+            }
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Process-wide scheduler shared by every session (created on first use)."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
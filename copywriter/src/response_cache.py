@@ -0,0 +1,168 @@
+"""
+Response Cache Module
+Opt-in cache of completed copy-generation responses, so repeating a brief
+(or clicking regenerate) doesn't pay for another completion. Backed by a
+SQLite file with TTL expiry and least-recently-used eviction; counts hits
+and the completion time they saved.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_PATH = Path(
+    os.getenv('COPYWRITER_RESPONSE_CACHE')
+    or Path(__file__).resolve().parent.parent / 'cache' / 'responses.db'
+)
+# Cached copy older than this is regenerated (seconds, default 7 days)
+DEFAULT_TTL_SECONDS = int(os.getenv('COPYWRITER_RESPONSE_CACHE_TTL', str(7 * 24 * 3600)))
+# Entries kept before the least recently used are evicted
+DEFAULT_MAX_ENTRIES = int(os.getenv('COPYWRITER_RESPONSE_CACHE_ENTRIES', '500'))
+
+
+def request_key(request: dict) -> str:
+    """
+    Cache key for a chat completion request: SHA-256 over the model,
+    sampling settings and every message part. Text parts (which carry the
+    assembled prompt, style guide included) are hashed as-is; images are
+    reduced to a hash of their content.
+    """
+    h = hashlib.sha256()
+    for field in ('model', 'temperature', 'max_tokens'):
+        h.update(f"{field}={request.get(field)!r}\0".encode('utf-8'))
+    for message in request['messages']:
+        h.update(f"role={message['role']}\0".encode('utf-8'))
+        content = message['content']
+        parts = [{'type': 'text', 'text': content}] if isinstance(content, str) else content
+        for part in parts:
+            if part['type'] == 'text':
+                h.update(b"text\0" + part['text'].encode('utf-8') + b"\0")
+            else:
+                url = part['image_url']['url'].encode('utf-8')
+                h.update(b"image\0" + hashlib.sha256(url).digest())
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache keyed by request_key().
+
+    Entries expire ttl_seconds after they were stored; beyond max_entries
+    the least recently used are evicted. Hit / miss counts and the
+    completion time saved by hits are kept in the same file, so they
+    accumulate across sessions.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.db_path = Path(db_path or DEFAULT_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (one per call, like local_storage)."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                latency REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+            CREATE TABLE IF NOT EXISTS cache_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                saved_seconds REAL NOT NULL DEFAULT 0
+            );
+            INSERT OR IGNORE INTO cache_stats (id) VALUES (1);
+            """
+        )
+        return conn
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        """
+        Cached response for key.
+
+        Returns:
+            (response text, seconds the original completion took), or None
+            on a miss (including an expired entry)
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT response, latency FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                conn.execute("UPDATE cache_stats SET misses = misses + 1")
+            else:
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                conn.execute(
+                    "UPDATE cache_stats SET hits = hits + 1, saved_seconds = saved_seconds + ?",
+                    (row['latency'],),
+                )
+            conn.commit()
+        finally:
+            conn.close()
+        return (row['response'], row['latency']) if row else None
+
+    def put(self, key: str, response: str, latency: float) -> None:
+        """Store a response and the time its completion took, then evict."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, latency, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, latency, now, now),
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM responses")
+            conn.execute("UPDATE cache_stats SET hits = 0, misses = 0, saved_seconds = 0")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        """Hits, misses, hit rate, completion seconds saved and entries held."""
+        conn = self._connect()
+        try:
+            counters = conn.execute("SELECT hits, misses, saved_seconds FROM cache_stats").fetchone()
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        finally:
+            conn.close()
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'hit_rate': counters['hits'] / lookups if lookups else 0.0,
+            'saved_seconds': counters['saved_seconds'],
+            'entries': entries,
+        }
@@ -0,0 +1,209 @@
+"""
+Telemetry Module
+Records one row per OpenAI call: which operation and model, token usage,
+time to first token, total latency, retries and an estimated cost. Rows
+are buffered and written in one batch, so recording adds no round trip
+to the request itself, and summarised into p50 / p95 latency and token
+spend for the Settings page.
+"""
+
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (input, cached input, output)
+MODEL_PRICES = {
+    'gpt-4o': (2.50, 1.25, 10.00),
+    'gpt-4o-mini': (0.15, 0.075, 0.60),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimated USD cost of a call (None for models without a price)."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    input_price, cached_price, output_price = prices
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1e6
+
+
+class CallRecorder:
+    """
+    Collects call records and hands them to a storage sink in batches.
+
+    Args:
+        sink: Called with a list of record dicts (e.g. save_llm_calls)
+        artist_id: Artist the calls are made for, stored on every record
+    """
+
+    def __init__(self, sink: Callable[[list[dict]], None], artist_id: Optional[str] = None):
+        self.sink = sink
+        self.artist_id = artist_id
+        self._pending: list[dict] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        operation: str,
+        model: str,
+        timing: dict,
+        doc_type: Optional[str] = None,
+        status: str = 'ok',
+        error: Optional[str] = None,
+    ) -> dict:
+        """
+        Buffer a record for one call.
+
+        Args:
+            operation: What the call was for (analyze, generate, ...)
+            model: Model requested
+            timing: The call's timing dict (see generator_v2._complete):
+                time_to_first_token, total_time, token usage, retries and
+                queued_seconds, whichever are known
+            doc_type: Format generated, if any
+            status: "ok", "error" or "cancelled"
+            error: Error message for failed calls
+
+        Returns:
+            The buffered record
+        """
+        prompt_tokens = timing.get('prompt_tokens')
+        cached_tokens = timing.get('cached_tokens') or 0
+        completion_tokens = timing.get('completion_tokens')
+        record = {
+            'artist_id': self.artist_id,
+            'operation': operation,
+            'doc_type': doc_type,
+            'model': model,
+            'status': status,
+            'error': (error or '')[:500] or None,
+            'streamed': bool(timing.get('streamed')),
+            'prompt_tokens': prompt_tokens,
+            'cached_tokens': cached_tokens if prompt_tokens is not None else None,
+            'completion_tokens': completion_tokens,
+            'time_to_first_token': timing.get('time_to_first_token'),
+            'total_time': timing.get('total_time'),
+            'queued_seconds': timing.get('queued_seconds'),
+            'retries': timing.get('retries', 0),
+            'cost_usd': (
+                estimate_cost(model, prompt_tokens, cached_tokens, completion_tokens)
+                if prompt_tokens is not None and completion_tokens is not None else None
+            ),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self._pending.append(record)
+        return record
+
+    def flush(self) -> int:
+        """
+        Write buffered records. A failed write is logged as a warning and
+        dropped: telemetry never fails the call it describes.
+
+        Returns:
+            Number of records handed to the sink
+        """
+        with self._lock:
+            records, self._pending = self._pending, []
+        if not records:
+            return 0
+        try:
+            self.sink(records)
+        except Exception as e:
+            logger.warning("Could not save %d call metric(s): %s", len(records), e)
+            return 0
+        return len(records)
+
+
+@contextmanager
+def track_call(
+    recorder: Optional[CallRecorder],
+    operation: str,
+    model: str,
+    timing: dict,
+    doc_type: Optional[str] = None,
+    flush: bool = True,
+) -> Iterator[None]:
+    """
+    Record the call made inside the block once it ends, successfully or
+    not. timing is read at the end, so it can be filled during the block.
+    No-op without a recorder.
+
+    Args:
+        flush: Write the record straight away; pass False from worker
+            threads and flush once from the caller instead
+    """
+    if recorder is None:
+        yield
+        return
+    try:
+        yield
+    except (GeneratorExit, asyncio.CancelledError):
+        # A stream abandoned by its reader, or a cancelled task
+        recorder.record(operation, model, timing, doc_type, status='cancelled')
+        raise
+    except Exception as e:
+        recorder.record(operation, model, timing, doc_type, status='error', error=str(e))
+        raise
+    else:
+        recorder.record(operation, model, timing, doc_type)
+    finally:
+        if flush:
+            recorder.flush()
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (pct from 0 to 100); None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize_calls(calls: list[dict], group_by: tuple[str, ...]) -> list[dict]:
+    """
+    Latency percentiles and token spend per group of call records.
+
+    Args:
+        calls: Records as saved by CallRecorder
+        group_by: Record fields to group on (e.g. ('artist_id',) or ('doc_type',))
+
+    Returns:
+        One dict per group, busiest first, with the group fields, calls,
+        errors, p50 / p95 total latency and time to first token (seconds),
+        prompt, cached and completion tokens, and cost_usd
+    """
+    groups: dict[tuple, list[dict]] = {}
+    for call in calls:
+        groups.setdefault(tuple(call.get(field) for field in group_by), []).append(call)
+
+    rows = []
+    for key, group in groups.items():
+        ok = [c for c in group if c['status'] == 'ok']
+        latencies = [c['total_time'] for c in ok if c.get('total_time') is not None]
+        first_tokens = [c['time_to_first_token'] for c in ok if c.get('time_to_first_token') is not None]
+        rows.append({
+            **dict(zip(group_by, key)),
+            'calls': len(group),
+            'errors': len(group) - len(ok),
+            'p50_latency': percentile(latencies, 50),
+            'p95_latency': percentile(latencies, 95),
+            'p50_first_token': percentile(first_tokens, 50),
+            'p95_first_token': percentile(first_tokens, 95),
+            'prompt_tokens': sum(c.get('prompt_tokens') or 0 for c in group),
+            'cached_tokens': sum(c.get('cached_tokens') or 0 for c in group),
+            'completion_tokens': sum(c.get('completion_tokens') or 0 for c in group),
+            'cost_usd': sum(c.get('cost_usd') or 0 for c in group),
+        })
+    rows.sort(key=lambda row: row['calls'], reverse=True)
+    return rows
@@ -0,0 +1,161 @@
+"""
+Text Cache Module
+Two-tier (memory LRU plus size-bounded disk) cache for text values keyed by
+a hash, shared by the parse cache (extracted document text) and map-reduce
+analysis (style notes per batch).
+"""
+
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class TextCache:
+    """
+    Two-tier cache of text under caller-chosen keys (hashes, as keys also
+    name the disk files).
+
+    The memory tier holds up to memory_entries texts in LRU order. The disk
+    tier stores zlib-compressed text files and evicts the least recently
+    used ones once their total size exceeds disk_max_bytes. Without a
+    cache_dir only the memory tier is used.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path],
+        memory_entries: int = 128,
+        disk_max_bytes: int = 200 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # computed on first disk write
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # --- Public API ---
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached text for key, or None on a miss."""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return text
+
+        text = self._disk_get(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._memory_put(key, text)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store text under key in both tiers."""
+        with self._lock:
+            self._memory_put(key, text)
+        self._disk_put(key, text)
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers (counters are kept)."""
+        with self._lock:
+            self._memory.clear()
+            for path in self._disk_files():
+                path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        """Hit / miss counters and current tier sizes."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_bytes,
+            }
+
+    # --- Memory tier ---
+
+    def _memory_put(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # --- Disk tier ---
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt.z"
+
+    def _disk_files(self) -> list[Path]:
+        if not self.cache_dir or not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob('*/*.txt.z'))
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used for eviction
+            return zlib.decompress(data).decode('utf-8')
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None
+
+    def _disk_put(self, key: str, text: str) -> None:
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        data = zlib.compress(text.encode('utf-8'))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return  # disk tier is best-effort
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(p.stat().st_size for p in self._disk_files())
+            else:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until under disk_max_bytes."""
+        entries = []
+        for path in self._disk_files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._disk_bytes = total
@@ -0,0 +1,28 @@
+-- Run this in the Supabase SQL Editor to add the LLM call metrics table.
+-- One row per OpenAI request (see src/telemetry.py).
+
+CREATE TABLE llm_calls (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    artist_id UUID REFERENCES artists(id) ON DELETE CASCADE,
+    operation TEXT NOT NULL,
+    doc_type TEXT,
+    model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    streamed BOOLEAN NOT NULL DEFAULT false,
+    prompt_tokens INTEGER,
+    cached_tokens INTEGER,
+    completion_tokens INTEGER,
+    time_to_first_token DOUBLE PRECISION,
+    total_time DOUBLE PRECISION,
+    queued_seconds DOUBLE PRECISION,
+    retries INTEGER NOT NULL DEFAULT 0,
+    cost_usd DOUBLE PRECISION,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX llm_calls_created_at ON llm_calls (created_at);
+
+ALTER TABLE llm_calls ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow all on llm_calls" ON llm_calls FOR ALL TO anon USING (true) WITH CHECK (true);
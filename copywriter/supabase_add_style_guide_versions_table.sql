@@ -0,0 +1,18 @@
+-- Run this in the Supabase SQL Editor to add style guide version tracking.
+-- Each row is a generated guide and the document ids it was built from, so
+-- "Update Style Guide" can send only documents added since.
+
+CREATE TABLE style_guide_versions (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    artist_id UUID REFERENCES artists(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    document_ids JSONB NOT NULL DEFAULT '[]',
+    mode TEXT NOT NULL DEFAULT 'full',
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX style_guide_versions_artist ON style_guide_versions (artist_id, created_at DESC);
+
+ALTER TABLE style_guide_versions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow all on style_guide_versions" ON style_guide_versions FOR ALL TO anon USING (true) WITH CHECK (true);
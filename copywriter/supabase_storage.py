@@ -61,8 +61,17 @@ def get_style_guide(artist_id: str) -> str | None:
     return response.data[0]["content"] if response.data else None
 
 
-def save_style_guide(artist_id: str, content: str) -> None:
-    """Save or update style guide for an artist (upsert)."""
+def save_style_guide(
+    artist_id: str,
+    content: str,
+    document_ids: list[str] | None = None,
+    mode: str = "full",
+) -> None:
+    """
+    Save or update style guide for an artist (upsert). With document_ids
+    (the documents it was built from), also records a version; mode is
+    "full" for a complete analysis or "incremental" for an update.
+    """
     existing = (
         get_supabase().table("style_guides")
         .select("id")
@@ -86,6 +95,30 @@ def save_style_guide(artist_id: str, content: str) -> None:
             .insert({"artist_id": artist_id, "content": content})
             .execute()
         )
+    if document_ids is not None:
+        (
+            get_supabase().table("style_guide_versions")
+            .insert({
+                "artist_id": artist_id,
+                "content": content,
+                "document_ids": list(document_ids),
+                "mode": mode,
+            })
+            .execute()
+        )
+
+
+def get_style_guide_version(artist_id: str) -> dict | None:
+    """Get the latest recorded style guide version (with its document_ids) for an artist."""
+    response = (
+        get_supabase().table("style_guide_versions")
+        .select("*")
+        .eq("artist_id", artist_id)
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return response.data[0] if response.data else None
 
 
 # --- Documents ---
@@ -161,6 +194,21 @@ def save_generated_copy(artist_id: str, doc_type: str, user_brief: str, content:
     return response.data[0]
 
 
+def save_generated_copies(records: list[dict]) -> list[dict]:
+    """Save several pieces of generated copy (one insert for the batch)."""
+    if not records:
+        return []
+    response = (
+        get_supabase().table("generated_copy")
+        .insert([
+            {k: r[k] for k in ("artist_id", "doc_type", "user_brief", "content")}
+            for r in records
+        ])
+        .execute()
+    )
+    return response.data
+
+
 def get_generated_copy(artist_id: str) -> list[dict]:
     """Get all generated copy for an artist, newest first."""
     response = (
@@ -178,6 +226,23 @@ def delete_generated_copy(copy_id: str) -> None:
     get_supabase().table("generated_copy").delete().eq("id", copy_id).execute()
 
 
+# --- LLM Call Metrics ---
+
+def save_llm_calls(records: list[dict]) -> None:
+    """Save call metrics from src.telemetry (one insert for the batch)."""
+    if records:
+        get_supabase().table("llm_calls").insert(records).execute()
+
+
+def get_llm_calls(since: str | None = None, limit: int = 5000) -> list[dict]:
+    """Get call metrics, newest first, optionally since an ISO timestamp."""
+    query = get_supabase().table("llm_calls").select("*")
+    if since:
+        query = query.gte("created_at", since)
+    response = query.order("created_at", desc=True).limit(limit).execute()
+    return response.data
+
+
 # --- Local-testing backend override ---------------------------------------
 # When USE_LOCAL_DB is truthy (env var or Streamlit secret), all storage
 # operations are served by local_storage.py (SQLite + local folder) instead
@@ -199,10 +264,14 @@ if _use_local_db():
         create_artist,
         get_style_guide,
         save_style_guide,
+        get_style_guide_version,
         get_documents,
         upload_document,
         delete_document,
         save_generated_copy,
+        save_generated_copies,
         get_generated_copy,
         delete_generated_copy,
+        save_llm_calls,
+        get_llm_calls,
     )